@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Media Rights Licensing persistence and service layers.
+
+Each module can be run on its own from the project root, for example:
+
+    python -m benchmarks.bench_connection_pool
+"""
@@ -0,0 +1,88 @@
+"""
+I keep the helpers that every benchmark script needs in this module:
+- a throw-away database so benchmarks never touch db/media.db
+- a tiny timing helper that reports operations per second
+"""
+
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from src.persistence import db
+
+
+@contextmanager
+def temp_database() -> Iterator[Path]:
+    """
+    I point db.DB_PATH at a fresh file in a temporary directory, create
+    the schema there, and put everything back when the block exits.
+    """
+    original_path = db.DB_PATH
+    with tempfile.TemporaryDirectory(prefix="media_bench_") as tmp_dir:
+        db.DB_PATH = Path(tmp_dir) / "bench.db"
+        try:
+            db.init_db()
+            yield db.DB_PATH
+        finally:
+            db.close_pool()
+            db.DB_PATH = original_path
+
+
+def seed_content(count: int) -> None:
+    """I insert `count` simple content rows in one transaction."""
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO content (title, genre, content_type, release_year, notes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (f"Title {i}", "Drama", "Movie", 1950 + i % 75, None)
+                for i in range(count)
+            ),
+        )
+
+
+def measure(label: str, operations: int, func: Callable[[], None]) -> float:
+    """
+    I run `func` once, print how long it took and the throughput, and
+    return the operations per second so callers can compare runs.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    rate = operations / elapsed if elapsed else float("inf")
+    print(f"{label:<40} {elapsed:8.3f}s  {rate:12,.0f} ops/s")
+    return rate
+
+
+def seed_licenses(count: int, content_count: int = 1_000, distributor_count: int = 50) -> None:
+    """
+    I insert `count` license rows spread over `content_count` titles and
+    `distributor_count` distributors (the referenced rows are not created).
+    """
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date, terms) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    i % content_count + 1,
+                    i % distributor_count + 1,
+                    f"20{10 + i % 15}-01-01",
+                    f"20{12 + i % 15}-12-31",
+                    "Exclusive SVOD, worldwide",
+                )
+                for i in range(count)
+            ),
+        )
+
+
+def seed_distributors(count: int) -> None:
+    """I insert `count` distributors spread over a few regions in one transaction."""
+    regions = ("NA", "EU", "APAC", "LATAM")
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO distributor (name, contact_email, region) VALUES (?, ?, ?)",
+            ((f"Distributor {i}", None, regions[i % len(regions)]) for i in range(count)),
+        )
@@ -0,0 +1,124 @@
+"""
+I wrote this benchmark to measure request throughput through the async
+facade in src/services/async_service.py.
+
+It replays the same list of requests (mostly get_content/get_license by
+id, plus a few page listings, with a handful of "hot" ids that many
+clients ask for at once) in three ways:
+- one after another with the blocking service functions
+- through the async facade with `--concurrency` requests in flight
+- the same, with one write mixed in for every 50 reads
+
+For the async runs it also reports the worst event-loop stall seen by a
+heartbeat task, which is what the facade is for: plain blocking calls
+made from a coroutine would stall the loop for the whole query.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_async_service --requests 20000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks._common import seed_content, seed_distributors, seed_licenses, temp_database
+from src.persistence.cache import clear_caches
+from src.services import async_service, content_service, license_service
+
+
+def _workload(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    hot = [rng.randint(1, 10_000) for _ in range(20)]
+    requests = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.45:
+            requests.append(("get_content", (rng.choice(hot) if rng.random() < 0.5 else rng.randint(1, 10_000),)))
+        elif roll < 0.9:
+            requests.append(("get_license", (rng.randint(1, 50_000),)))
+        else:
+            requests.append(("list_contents_page", ()))
+    return requests
+
+
+_SYNC = {
+    "get_content": content_service.get_content,
+    "get_license": license_service.get_license,
+    "list_contents_page": content_service.list_contents_page,
+}
+
+
+def _run_sync(requests: list) -> None:
+    for name, args in requests:
+        _SYNC[name](*args)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + 0.001
+        await asyncio.sleep(0.001)
+        lags.append(loop.time() - expected)
+
+
+async def _run_async(requests: list, concurrency: int, write_every: int | None) -> str:
+    queue = list(reversed(requests))
+    stop, lags = asyncio.Event(), []
+    heartbeat = asyncio.ensure_future(_heartbeat(stop, lags))
+
+    async def client(number: int) -> None:
+        done = 0
+        while queue:
+            name, args = queue.pop()
+            await getattr(async_service, name)(*args)
+            done += 1
+            if write_every and done % write_every == 0:
+                await async_service.add_content(f"Benchmark title {number}-{done}")
+
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    stop.set()
+    await heartbeat
+    return f"worst loop stall {max(lags, default=0.0) * 1_000:6.1f} ms"
+
+
+def _report(label: str, count: int, func) -> None:
+    clear_caches()
+    start = time.perf_counter()
+    extra = func() or ""
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {count / elapsed:12,.0f} requests/s   {extra}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    requests = _workload(args.requests, args.seed)
+
+    with temp_database():
+        seed_content(10_000)
+        seed_distributors(50)
+        seed_licenses(50_000, content_count=10_000)
+
+        _report("blocking calls, one at a time", args.requests, lambda: _run_sync(requests))
+        _report(
+            f"async facade, {args.concurrency} in flight",
+            args.requests,
+            lambda: asyncio.run(_run_async(requests, args.concurrency, None)),
+        )
+        _report(
+            f"async facade, {args.concurrency} in flight, 2% writes",
+            args.requests,
+            lambda: asyncio.run(_run_async(requests, args.concurrency, 50)),
+        )
+        print(async_service.get_executor().stats())
+        async_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+I wrote this benchmark to measure time-to-backup for the online backup,
+VACUUM INTO snapshot and restore, and how many commits a writer thread
+still gets through while the backup runs.
+
+Run it from the project root (the catalog is generated first; about
+260 MB of database file per 1M licenses):
+
+    python -m benchmarks.bench_backup --licenses 10000000
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks._common import temp_database
+from benchmarks.synthetic import CatalogSize, generate_catalog
+from src.services import backup_service, content_service
+
+
+class _Writer(threading.Thread):
+    # Commits one small row after another until stopped.
+    def __init__(self) -> None:
+        super().__init__(daemon=True)
+        self.commits = 0
+        self.stop = threading.Event()
+
+    def run(self) -> None:
+        while not self.stop.is_set():
+            content_service.add_content(f"Written during backup {self.commits}")
+            self.commits += 1
+            time.sleep(0.001)
+
+
+def _report(label: str, summary: dict, writer: _Writer | None = None) -> None:
+    line = (f"{label:<26} {summary['seconds']:7.2f}s {summary['bytes'] / 1e6:9.1f} MB "
+            f"{summary['mb_per_second']:8.1f} MB/s")
+    if writer is not None:
+        line += f"  writer: {writer.commits / summary['seconds']:,.0f} commits/s"
+    if "restarts" in summary:
+        line += f"  restarts: {summary['restarts']}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=backup_service.BACKUP_PAGES)
+    parser.add_argument("--pause", type=float, default=backup_service.BACKUP_PAUSE)
+    args = parser.parse_args()
+
+    with temp_database(), tempfile.TemporaryDirectory(prefix="media_backup_") as out:
+        out = Path(out)
+        print(f"Catalog: {generate_catalog(CatalogSize.for_licenses(args.licenses))}")
+
+        _report("backup (idle)", backup_service.backup_database(out / "idle.db", args.pages, args.pause))
+
+        writer = _Writer()
+        writer.start()
+        try:
+            summary = backup_service.backup_database(out / "busy.db", args.pages, args.pause)
+        finally:
+            writer.stop.set()
+            writer.join()
+        _report("backup (with a writer)", summary, writer)
+
+        _report("snapshot (VACUUM INTO)", backup_service.snapshot_database(out / "compact.db"))
+        _report("restore to a fresh file", backup_service.restore_database(out / "compact.db", out / "restored.db"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+I wrote this benchmark to compare get_content_by_id throughput when every
+call opens its own connection (the old behaviour) against borrowing a
+connection from the pool.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_connection_pool --lookups 20000
+"""
+
+import argparse
+import random
+
+from benchmarks._common import measure, seed_content, temp_database
+from src.models.content import Content
+from src.persistence import content_repo
+from src.persistence.db import get_connection
+
+
+def _get_content_unpooled(content_id: int) -> Content | None:
+    # This mirrors the original repository code: a new connection per call.
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT id, title, genre, content_type, release_year, notes "
+            "FROM content WHERE id = ?",
+            (content_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+    return None if row is None else Content(**dict(row))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    ids = [rng.randint(1, args.rows) for _ in range(args.lookups)]
+
+    with temp_database():
+        seed_content(args.rows)
+
+        before = measure(
+            "new connection per lookup",
+            args.lookups,
+            lambda: [_get_content_unpooled(i) for i in ids],
+        )
+        after = measure(
+            "pooled connection()",
+            args.lookups,
+            lambda: [content_repo.get_content_by_id(i) for i in ids],
+        )
+
+    print(f"speed-up: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+I wrote this benchmark to measure content_service.search_content() on
+a large catalog (1,000,000 titles by default).
+
+It seeds titles built from a fixed word list (the same catalog on every
+run), then reports the median and p95 latency for:
+- a common word
+- a rare two-word phrase
+- a prefix query, as typed into a search box
+- a word that only appears in license terms
+and the time a LIKE '%word%' scan takes to find the same matches.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_content_search --titles 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._common import temp_database
+from src.persistence import db
+from src.services import content_service
+
+
+WORDS = (
+    "star night river city ghost winter summer empire lost silent dark "
+    "golden last return secret island storm fire ocean shadow king queen "
+    "road dream heart broken wild blue iron glass garden mirror"
+).split()
+GENRES = ("Drama", "Comedy", "Documentary", "Thriller", "Animation", "Sci-Fi")
+
+
+def _seed(titles: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO content (title, genre, content_type, release_year, notes) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 4))) + f" {i}",
+                    rng.choice(GENRES),
+                    "Movie",
+                    1950 + i % 75,
+                    " ".join(rng.choice(WORDS) for _ in range(8)),
+                )
+                for i in range(titles)
+            ),
+        )
+        # Every 1,000th title gets a license whose terms mention a festival.
+        conn.executemany(
+            "INSERT INTO license_xref (content_id, distributor_id, terms) VALUES (?, 1, ?)",
+            ((i, "Festival screening rights only") for i in range(1, titles + 1, 1_000)),
+        )
+
+
+def _latency(label: str, func, repeats: int) -> None:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<40} median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with temp_database():
+        start = time.perf_counter()
+        _seed(args.titles, args.seed)
+        print(f"seeded {args.titles:,} titles (FTS kept in sync by triggers) in {time.perf_counter() - start:.1f}s")
+
+        _latency("common word: 'night'", lambda: content_service.search_content("night"), args.repeats)
+        _latency("two words: 'silent mirror'", lambda: content_service.search_content("silent mirror"), args.repeats)
+        _latency("prefix as typed: 'gold'", lambda: content_service.search_content("gold"), args.repeats)
+        _latency("license terms: 'festival'", lambda: content_service.search_content("festival"), args.repeats)
+
+        def like_scan():
+            # Without an index every row has to be read to find all matches.
+            with db.connection() as conn:
+                conn.execute(
+                    "SELECT id FROM content WHERE (title || ' ' || COALESCE(notes, '')) LIKE ? "
+                    "AND (title || ' ' || COALESCE(notes, '')) LIKE ?",
+                    ("%silent%", "%mirror%"),
+                ).fetchall()
+
+        _latency("LIKE scan for 'silent mirror'", like_scan, max(1, args.repeats // 10))
+
+
+if __name__ == "__main__":
+    main()
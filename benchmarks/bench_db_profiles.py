@@ -0,0 +1,58 @@
+"""
+I wrote this benchmark to show read and write throughput for each of the
+database performance profiles in src.persistence.db.PROFILES.
+
+For every profile it:
+- creates a fresh synthetic catalog database
+- writes content rows one commit at a time (the create_content path)
+- reads them back by id through the repository
+
+Run it from the project root:
+
+    python -m benchmarks.bench_db_profiles --writes 2000 --reads 20000
+"""
+
+import argparse
+import random
+
+from benchmarks._common import measure, seed_content, temp_database
+from src.models.content import Content
+from src.persistence import content_repo, db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--catalog", type=int, default=50_000, help="rows seeded before reading")
+    parser.add_argument("--writes", type=int, default=2_000)
+    parser.add_argument("--reads", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    read_ids = [rng.randint(1, args.catalog) for _ in range(args.reads)]
+    original_profile = db.get_profile()
+
+    try:
+        for name in db.PROFILES:
+            db.set_profile(name)
+            print(f"\n== profile: {name} ==")
+            with temp_database():
+                seed_content(args.catalog)
+                measure(
+                    "write (one commit per row)",
+                    args.writes,
+                    lambda: [
+                        content_repo.create_content(Content(id=0, title=f"New {i}"))
+                        for i in range(args.writes)
+                    ],
+                )
+                measure(
+                    "read get_content_by_id",
+                    args.reads,
+                    lambda: [content_repo.get_content_by_id(i) for i in read_ids],
+                )
+    finally:
+        db.set_profile(original_profile)
+
+
+if __name__ == "__main__":
+    main()
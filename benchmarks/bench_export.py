@@ -0,0 +1,42 @@
+"""
+I wrote this benchmark to measure catalog export throughput (MB/s and
+rows/s) for each format, with and without gzip, on a synthetic catalog.
+
+Run it from the project root (the request's reference size is 10M
+licenses; generating that takes a while, so 1M is the default):
+
+    python -m benchmarks.bench_export --licenses 10000000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks._common import temp_database
+from benchmarks.synthetic import CatalogSize, generate_catalog
+from src.services import export_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=1_000_000)
+    parser.add_argument("--gzip-level", type=int, default=export_service.GZIP_LEVEL)
+    args = parser.parse_args()
+
+    with temp_database(), tempfile.TemporaryDirectory(prefix="media_export_") as out:
+        size = generate_catalog(CatalogSize.for_licenses(args.licenses))
+        print(f"Catalog: {size}")
+        for fmt in export_service.FORMATS:
+            for compress in (False, True):
+                label = f"{fmt}{' + gzip' if compress else ''}"
+                manifest = export_service.export_catalog(
+                    Path(out) / label.replace(" + ", "-"), fmt, compress, gzip_level=args.gzip_level
+                )
+                print(
+                    f"{label:<14} {manifest['seconds']:7.2f}s {manifest['bytes'] / 1e6:9.1f} MB "
+                    f"{manifest['mb_per_second']:8.1f} MB/s {manifest['rows_per_second']:12,.0f} rows/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+I wrote this benchmark to compare the dashboard counts read from the
+trigger-maintained summary tables with the same counts computed from
+license_xref on every call, and to time a full verify and rebuild.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_license_counts --licenses 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._common import measure, temp_database
+from benchmarks.synthetic import CatalogSize, generate_catalog
+from src.persistence import db
+from src.services import license_counts_service
+
+
+def _counted_from_scratch(content_ids: list[int], distributor_ids: list[int]) -> None:
+    with db.connection() as conn:
+        for content_id, distributor_id in zip(content_ids, distributor_ids):
+            conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT distributor_id) FROM license_xref WHERE content_id = ?",
+                (content_id,),
+            ).fetchone()
+            conn.execute(
+                "SELECT COUNT(*) FROM license_xref WHERE distributor_id = ?", (distributor_id,)
+            ).fetchone()
+
+
+def _read_from_summaries(content_ids: list[int], distributor_ids: list[int]) -> None:
+    for content_id, distributor_id in zip(content_ids, distributor_ids):
+        license_counts_service.get_content_license_counts(content_id)
+        license_counts_service.count_licenses_for_distributor(distributor_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with temp_database():
+        start = time.perf_counter()
+        size = generate_catalog(CatalogSize.for_licenses(args.licenses))
+        print(f"Catalog: {size} (generated with triggers in {time.perf_counter() - start:.1f}s)")
+
+        rng = random.Random(3)
+        content_ids = [rng.randint(1, size.content) for _ in range(args.lookups)]
+        distributor_ids = [rng.randint(1, size.distributors) for _ in range(args.lookups)]
+
+        measure("computed from license_xref", args.lookups, lambda: _counted_from_scratch(content_ids, distributor_ids))
+        measure("read from summary tables", args.lookups, lambda: _read_from_summaries(content_ids, distributor_ids))
+        measure("verify (full recount + diff)", 1, license_counts_service.verify_license_counts)
+        measure("rebuild", 1, license_counts_service.rebuild_license_counts)
+
+
+if __name__ == "__main__":
+    main()
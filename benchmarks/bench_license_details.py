@@ -0,0 +1,53 @@
+"""
+I wrote this benchmark to show what the joined license listing saves
+over the N+1 pattern, where each license is followed by
+get_content_by_id() and get_distributor_by_id() calls.
+
+It times three ways of building the same rows:
+- N+1 with the read cache cleared first (every lookup goes to SQLite)
+- N+1 again with the cache warm
+- iter_license_details(), one JOIN query streamed in batches
+
+Run it from the project root:
+
+    python -m benchmarks.bench_license_details --licenses 200000
+"""
+
+import argparse
+
+from benchmarks._common import measure, seed_content, seed_distributors, seed_licenses, temp_database
+from src.persistence import content_repo, distributor_repo, license_repo
+from src.persistence.cache import clear_caches
+
+
+def _n_plus_one() -> None:
+    for lic in license_repo.iter_all_licenses():
+        content = content_repo.get_content_by_id(lic.content_id)
+        distributor = distributor_repo.get_distributor_by_id(lic.distributor_id)
+        (content.title, content.content_type, content.release_year, distributor.name, distributor.region)
+
+
+def _joined() -> None:
+    for detail in license_repo.iter_license_details():
+        (detail.content_title, detail.content_type, detail.release_year,
+         detail.distributor_name, detail.distributor_region)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_content(1_000)
+        seed_distributors(50)
+        seed_licenses(args.licenses)
+
+        clear_caches()
+        measure("N+1 lookups (cold cache)", args.licenses, _n_plus_one)
+        measure("N+1 lookups (warm cache)", args.licenses, _n_plus_one)
+        measure("JOIN (iter_license_details)", args.licenses, _joined)
+
+
+if __name__ == "__main__":
+    main()
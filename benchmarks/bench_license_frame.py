@@ -0,0 +1,104 @@
+"""
+I wrote this benchmark to compare two ways of answering catalog-wide
+questions about licenses:
+- the row path: list_all_licenses() into LicenseXref objects, then
+  plain Python loops over them
+- the columnar path: one LicenseFrame.load() and array operations
+
+For each path it reports load time, peak memory, and the time for:
+- licenses per distributor
+- titles with zero active licenses today
+- expirations by month
+
+Run it from the project root:
+
+    python -m benchmarks.bench_license_frame --licenses 500000
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date
+
+from benchmarks._common import seed_licenses, temp_database
+from src.persistence import license_repo
+from src.services.license_frame import LicenseFrame, np
+
+
+def _timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"  {label:<36} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def _load(label: str, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: load {elapsed:.3f}s, peak {peak / 1_048_576:,.1f} MiB")
+    return loaded
+
+
+def _row_path(content_ids: range, today: str) -> tuple:
+    licenses = _load("LicenseXref objects", license_repo.list_all_licenses)
+
+    per_distributor = _timed(
+        "licenses per distributor", lambda: Counter(lic.distributor_id for lic in licenses)
+    )
+
+    def zero_active():
+        active = {
+            lic.content_id
+            for lic in licenses
+            if (lic.start_date or "") <= today and (lic.end_date is None or lic.end_date >= today)
+        }
+        return [c for c in content_ids if c not in active]
+
+    missing = _timed("titles with zero active licenses", zero_active)
+    by_month = _timed(
+        "expirations by month",
+        lambda: dict(sorted(Counter(lic.end_date[:7] for lic in licenses if lic.end_date).items())),
+    )
+    return dict(per_distributor), missing, by_month
+
+
+def _frame_path(content_ids: range, today: str, use_numpy: bool) -> tuple:
+    backend = "numpy" if use_numpy else "array"
+    frame = _load(f"LicenseFrame ({backend})", lambda: LicenseFrame.load(use_numpy=use_numpy))
+
+    per_distributor = _timed("licenses per distributor", lambda: frame.count_by("distributor_id"))
+    missing = _timed(
+        "titles with zero active licenses",
+        lambda: frame.active_on(today).missing("content_id", content_ids),
+    )
+    by_month = _timed("expirations by month", frame.count_by_end_month)
+    return per_distributor, missing, by_month
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=200_000)
+    parser.add_argument("--content", type=int, default=5_000)
+    args = parser.parse_args()
+
+    today = date.today().isoformat()
+    content_ids = range(1, args.content + 1)
+
+    with temp_database():
+        # Only the first 1,000 titles get licenses, so some titles have none.
+        seed_licenses(args.licenses)
+        expected = _row_path(content_ids, today)
+
+        backends = [False] + ([True] if np is not None else [])
+        for use_numpy in backends:
+            if _frame_path(content_ids, today, use_numpy) != expected:
+                raise SystemExit("LicenseFrame disagrees with the row path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+I wrote this benchmark to compare the active-window query paths:
+- in memory: LicenseWindowIndex against a linear scan of every window
+- in SQLite: the license_window R*Tree against a plain date comparison
+
+Run it from the project root (10M windows needs a few GB of RAM):
+
+    python -m benchmarks.bench_license_windows --windows 10000000 --sql-licenses 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._common import temp_database
+from src.persistence import db, license_repo
+from src.services.license_windows import LicenseWindowIndex
+from src.utils import from_epoch_day, to_epoch_day
+
+FIRST_DAY = to_epoch_day("2000-01-01", 0)
+LAST_DAY = to_epoch_day("2030-12-31", 0)
+
+
+def _synthetic_windows(count: int, seed: int = 11):
+    # Most deals run 1-3 years; a few are open-ended on one side.
+    rng = random.Random(seed)
+    for license_id in range(1, count + 1):
+        start = rng.randint(FIRST_DAY, LAST_DAY)
+        end = start + rng.choice((365, 730, 1095)) + rng.randint(-30, 30)
+        if rng.random() < 0.02:
+            end = 3_000_000
+        yield license_id, start, end
+
+
+def _timed(label: str, queries: int, func) -> None:
+    start = time.perf_counter()
+    hits = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed / queries * 1000:9.3f} ms/query  ({hits:,} hits)")
+
+
+def _bench_memory(count: int, days: list[int]) -> None:
+    windows = list(_synthetic_windows(count))
+    start = time.perf_counter()
+    index = LicenseWindowIndex(windows)
+    print(f"built LicenseWindowIndex over {count:,} windows in {time.perf_counter() - start:.1f}s")
+
+    _timed("index.active_on(D)", len(days), lambda: sum(len(index.active_on(d)) for d in days))
+    _timed(
+        "index.overlapping(D, D + 30)",
+        len(days),
+        lambda: sum(len(index.overlapping(d, d + 30)) for d in days),
+    )
+    _timed(
+        "index.ending_between(D, D + 30)",
+        len(days),
+        lambda: sum(len(index.ending_between(d, d + 30)) for d in days),
+    )
+    scan_days = days[:3]
+    _timed(
+        "linear scan active on D",
+        len(scan_days),
+        lambda: sum(sum(1 for _, s, e in windows if s <= d <= e) for d in scan_days),
+    )
+
+
+def _bench_sql(count: int, days: list[int]) -> None:
+    with temp_database():
+        with db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (i % 5_000 + 1, i % 40 + 1, from_epoch_day(s).isoformat(),
+                     None if e == 3_000_000 else from_epoch_day(e).isoformat())
+                    for i, s, e in _synthetic_windows(count)
+                ),
+            )
+
+        iso_days = [from_epoch_day(d).isoformat() for d in days]
+        _timed(
+            "R*Tree list_licenses_in_window(D, D)",
+            len(iso_days),
+            lambda: sum(len(license_repo.list_licenses_in_window(d, d)) for d in iso_days),
+        )
+
+        def plain_sql() -> int:
+            hits = 0
+            with db.connection() as conn:
+                for d in iso_days:
+                    rows = conn.execute(
+                        "SELECT id, content_id, distributor_id, start_date, end_date, terms "
+                        "FROM license_xref WHERE start_date <= ? "
+                        "AND (end_date IS NULL OR end_date >= ?) ORDER BY id",
+                        (d, d),
+                    ).fetchall()
+                    hits += len([license_repo._row_to_license(row) for row in rows])
+            return hits
+
+        _timed("plain start_date/end_date comparison", len(iso_days), plain_sql)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=int, default=1_000_000)
+    parser.add_argument("--sql-licenses", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    days = [rng.randint(FIRST_DAY, LAST_DAY) for _ in range(args.queries)]
+
+    print("== in memory ==")
+    _bench_memory(args.windows, days)
+    if args.sql_licenses:
+        print("\n== SQLite ==")
+        _bench_sql(args.sql_licenses, days[:50])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+I wrote this benchmark to measure what the compact models save:
+- bytes per object for a __dict__-based LicenseXref against the
+  __slots__ version in src.models
+- rows per second for list_all_licenses() when every row goes through
+  sqlite3.Row and is copied by column name (the old repo code) against
+  the model row_factory the repos use now
+
+Run it from the project root:
+
+    python -m benchmarks.bench_model_footprint --licenses 500000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from benchmarks._common import seed_licenses, temp_database
+from src.models.license_xref import LicenseXref
+from src.persistence import db, license_repo
+
+
+class DictLicenseXref:
+    # The model as it was before __slots__: same fields, one __dict__ each.
+    def __init__(self, id, content_id, distributor_id, start_date=None, end_date=None, terms=None):
+        self.id = id
+        self.content_id = content_id
+        self.distributor_id = distributor_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.terms = terms
+
+
+def _bytes_per_object(cls, count: int) -> float:
+    tracemalloc.start()
+    objects = [cls(i, i, i, "2025-01-01", "2025-12-31", "SVOD") for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list itself costs 8 bytes per entry either way; leave it out.
+    return (size - 8 * len(objects)) / count
+
+
+def _list_all_licenses_by_name() -> list:
+    with db.connection() as conn:
+        rows = conn.execute(
+            "SELECT id, content_id, distributor_id, start_date, end_date, terms "
+            "FROM license_xref ORDER BY id"
+        ).fetchall()
+    return [
+        DictLicenseXref(
+            id=row["id"],
+            content_id=row["content_id"],
+            distributor_id=row["distributor_id"],
+            start_date=row["start_date"],
+            end_date=row["end_date"],
+            terms=row["terms"],
+        )
+        for row in rows
+    ]
+
+
+def _rows_per_second(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    loaded = len(func())
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {loaded / elapsed:12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=200_000)
+    args = parser.parse_args()
+
+    # Strings are shared between objects here, so this is the per-object overhead.
+    print(f"{'__dict__ LicenseXref':<44} {_bytes_per_object(DictLicenseXref, 100_000):8.0f} bytes/object")
+    print(f"{'__slots__ LicenseXref':<44} {_bytes_per_object(LicenseXref, 100_000):8.0f} bytes/object")
+
+    with temp_database():
+        seed_licenses(args.licenses)
+        _rows_per_second("sqlite3.Row + copy by column name", args.licenses, _list_all_licenses_by_name)
+        _rows_per_second("model row_factory (list_all_licenses)", args.licenses, license_repo.list_all_licenses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+I wrote this benchmark to check what query instrumentation costs: the
+same point lookups and page reads are run with query stats off and on,
+and the busiest statements are printed at the end.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_query_stats --lookups 50000
+"""
+
+import argparse
+import random
+
+from benchmarks._common import measure, seed_content, temp_database
+from src.persistence import content_repo, db
+
+
+def _workload(ids: list[int]) -> None:
+    for i in ids:
+        content_repo.get_content_by_id(i)
+    token = None
+    for _ in range(len(ids) // 100):
+        token = content_repo.list_content_page(token, limit=50).next_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    ids = [rng.randint(1, args.rows) for _ in range(args.lookups)]
+    cache = content_repo._cache
+    original_size = cache.max_size
+    was_enabled = db.query_stats_enabled()
+
+    with temp_database():
+        seed_content(args.rows)
+        try:
+            # The cache would hide most lookups from SQLite, so it is off here.
+            cache.max_size = 0
+            db.disable_query_stats()
+            measure("query stats off", args.lookups, lambda: _workload(ids))
+            db.enable_query_stats(slow_ms=None)
+            db.reset_query_stats()
+            measure("query stats on", args.lookups, lambda: _workload(ids))
+        finally:
+            cache.max_size = original_size
+            if not was_enabled:
+                db.disable_query_stats()
+
+    for stats in db.query_stats(top=3):
+        print(f"{stats['calls']:>8} calls {stats['total_ms']:10.1f} ms "
+              f"p50 {stats['p50_ms']:.3f} ms  p95 {stats['p95_ms']:.3f} ms  {stats['sql'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
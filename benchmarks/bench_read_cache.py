@@ -0,0 +1,46 @@
+"""
+I wrote this benchmark to show what the read-through cache buys for
+hot-title lookups: the same skewed stream of get_content_by_id calls
+is run with the cache turned off and on.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_read_cache --lookups 50000
+"""
+
+import argparse
+import random
+
+from benchmarks._common import measure, seed_content, temp_database
+from src.persistence import content_repo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # A few hundred titles get most of the traffic.
+    rng = random.Random(5)
+    ids = [min(int(rng.paretovariate(1.2)), args.rows) for _ in range(args.lookups)]
+    cache = content_repo._cache
+    original_size = cache.max_size
+
+    with temp_database():
+        seed_content(args.rows)
+        try:
+            cache.max_size = 0
+            measure("cache off", args.lookups, lambda: [content_repo.get_content_by_id(i) for i in ids])
+            cache.max_size = original_size
+            cache.clear()
+            cache.reset_stats()
+            measure("cache on", args.lookups, lambda: [content_repo.get_content_by_id(i) for i in ids])
+        finally:
+            cache.max_size = original_size
+
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
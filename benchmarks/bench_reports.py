@@ -0,0 +1,71 @@
+"""
+I wrote this benchmark to show how the process-pool reports scale with
+the number of worker processes, from 1 (everything in this process) up
+to the number of cores, against the same report built on top of
+license_service.iter_licenses() in one process.
+
+Speed-up is relative to 1 worker. Expect it to stop growing at the
+number of physical cores and to be capped by the merge in the parent
+when the report has many rows (the availability matrix).
+
+Run it from the project root:
+
+    python -m benchmarks.bench_reports --licenses 1000000 --max-workers 8
+"""
+
+import argparse
+import os
+import time
+from datetime import date
+
+from benchmarks._common import temp_database
+from benchmarks.synthetic import CatalogSize, generate_catalog
+from src.services import license_service, report_service
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, to_epoch_day
+
+
+def _availability_from_models(on_date: str) -> int:
+    # The straightforward version: stream models, count in one process.
+    on_day = to_epoch_day(on_date, 0)
+    pairs: dict[tuple, list] = {}
+    for lic in license_service.iter_licenses():
+        start = to_epoch_day(lic.start_date, OPEN_START_DAY)
+        end = to_epoch_day(lic.end_date, OPEN_END_DAY)
+        entry = pairs.setdefault((lic.content_id, lic.distributor_id), [0, 0])
+        entry[0] += 1
+        entry[1] += start <= on_day <= end
+    return len(pairs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=1_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    on_date = date.today().isoformat()
+    with temp_database():
+        size = generate_catalog(CatalogSize.for_licenses(args.licenses))
+        print(f"Catalog: {size}, {os.cpu_count()} CPU(s) visible")
+
+        start = time.perf_counter()
+        _availability_from_models(on_date)
+        print(f"{'availability via iter_licenses()':<36} {time.perf_counter() - start:8.2f}s")
+
+        for name, run in (
+            ("availability", lambda workers: report_service.availability_report(on_date, workers=workers)),
+            ("expiring 365 days", lambda workers: report_service.expiring_report(365, workers=workers)),
+        ):
+            baseline = None
+            for workers in range(1, args.max_workers + 1):
+                result = run(workers)
+                baseline = baseline or result.seconds
+                print(
+                    f"{name + f' x{workers}':<36} {result.seconds:8.2f}s  "
+                    f"speed-up {baseline / result.seconds:4.1f}x  "
+                    f"{result.licenses / result.seconds:12,.0f} licenses/s  {len(result.rows):,} rows"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+I wrote this benchmark to compare the single license_xref table with
+the same licenses split over N shard files: point lookups by id (one
+directory lookup plus one shard read), the conflict check for one
+title (one shard), and the scatter-gather listings (every shard, then
+a merge), plus how long a rebalance to twice the shards takes.
+
+SQLite allows one writer per file, so the win from sharding is mostly
+in write concurrency and file size; on one machine the listings pay
+for the extra queries and the merge. This shows how much.
+
+Run it from the project root:
+
+    python -m benchmarks.bench_sharding --licenses 1000000 --shards 4
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._common import measure, temp_database
+from benchmarks.synthetic import CatalogSize, generate_catalog
+from src.persistence import sharding
+from src.services import conflict_service, license_service, shard_service
+
+
+def _workload(label: str, content_ids: list[int], license_ids: list[int], pages: int) -> None:
+    def lookups() -> None:
+        for license_id in license_ids:
+            license_service.get_license(license_id)
+
+    def conflict_checks() -> None:
+        for content_id in content_ids:
+            conflict_service.find_conflicting_licenses(content_id, 1, "2024-01-01", "2024-12-31")
+
+    def page_walk() -> None:
+        page = license_service.list_licenses_page(limit=100)
+        for _ in range(pages - 1):
+            page = license_service.list_licenses_page(page.next_token, limit=100)
+
+    def active_today() -> None:
+        license_service.list_active_licenses("2024-06-01")
+
+    def full_scan() -> None:
+        for _ in license_service.iter_licenses():
+            pass
+
+    print(f"-- {label}")
+    measure("get_license by id", len(license_ids), lookups)
+    measure("conflict check for one title", len(content_ids), conflict_checks)
+    measure("page walk (100 per page)", pages, page_walk)
+    measure("active on one day", 1, active_today)
+    measure("stream every license in id order", 1, full_scan)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=1_000_000)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    with temp_database() as path:
+        size = generate_catalog(CatalogSize.for_licenses(args.licenses))
+        print(f"Catalog: {size}")
+
+        rng = random.Random(5)
+        license_ids = [rng.randint(1, size.licenses) for _ in range(args.lookups)]
+        content_ids = [rng.randint(1, size.content) for _ in range(args.lookups)]
+        _workload("single file", content_ids, license_ids, args.pages)
+
+        directory = path.parent / "shards"
+        start = time.perf_counter()
+        shard_service.create_shards(directory, args.shards, copy_existing=True)
+        print(f"Copied into {args.shards} shards in {time.perf_counter() - start:.1f}s")
+        sharding.enable_sharding(directory)
+        try:
+            _workload(f"{args.shards} shards (hash)", content_ids, license_ids, args.pages)
+            summary = shard_service.rebalance_shards(args.shards * 2, "range")
+            print(f"Rebalanced to {args.shards * 2} range shards in {summary['seconds']:.1f}s")
+            _workload(f"{args.shards * 2} shards (range)", content_ids, license_ids, args.pages)
+        finally:
+            sharding.disable_sharding()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+I wrote this benchmark to compare the peak Python memory of
+list_all_licenses() against streaming the same rows through
+iter_all_licenses().
+
+Run it from the project root:
+
+    python -m benchmarks.bench_streaming_memory --licenses 500000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks._common import seed_licenses, temp_database
+from src.persistence import license_repo
+
+
+def _peak_memory(label: str, func: Callable[[], int]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} rows={rows:<10,} peak={peak / 1_048_576:9.1f} MiB  {elapsed:7.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--licenses", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with temp_database():
+        seed_licenses(args.licenses)
+
+        _peak_memory("list_all_licenses()", lambda: len(license_repo.list_all_licenses()))
+        _peak_memory(
+            "iter_all_licenses()",
+            lambda: sum(1 for _ in license_repo.iter_all_licenses(args.batch_size)),
+        )
+
+
+if __name__ == "__main__":
+    main()
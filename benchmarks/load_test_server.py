@@ -0,0 +1,153 @@
+"""
+I wrote this script to load-test the HTTP/JSON server in src/server.py
+and report requests per second and latency percentiles (p50/p99).
+
+Each client thread keeps one HTTP/1.1 connection open and sends a mix
+of requests:
+- GET /content/<id> and GET /licenses/<id>
+- GET /licenses?content_id=<id> listings, half of them repeated with
+  If-None-Match so the 304 path is exercised
+- one POST /content in every 100 requests
+
+With no --url it starts a server on a free port with a throw-away,
+seeded database; with --url it targets a server that is already running.
+
+Run it from the project root:
+
+    python -m benchmarks.load_test_server --clients 16 --seconds 10
+    python -m benchmarks.load_test_server --url http://127.0.0.1:8080
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from benchmarks._common import seed_content, seed_distributors, seed_licenses, temp_database
+
+
+@contextmanager
+def _local_server(workers: int):
+    from src import server
+
+    with temp_database():
+        seed_content(10_000)
+        seed_distributors(50)
+        seed_licenses(50_000, content_count=10_000)
+        srv = server.make_server(port=0, workers=workers)
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        try:
+            host, port = srv.server_address[:2]
+            yield f"http://{host}:{port}"
+        finally:
+            srv.shutdown()
+            srv.server_close()
+
+
+def _client(base_url: str, deadline: float, seed: int, latencies: list, errors: list) -> None:
+    rng = random.Random(seed)
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    etags: dict[str, str] = {}
+    sent = 0
+
+    while time.perf_counter() < deadline:
+        sent += 1
+        headers, body, method = {}, None, "GET"
+        roll = rng.random()
+        if sent % 100 == 0:
+            method, path = "POST", "/content"
+            body = json.dumps({"title": f"Load test {seed}-{sent}", "genre": "Drama"})
+            headers["Content-Type"] = "application/json"
+        elif roll < 0.4:
+            path = f"/content/{rng.randint(1, 10_000)}"
+        elif roll < 0.8:
+            path = f"/licenses/{rng.randint(1, 50_000)}"
+        else:
+            path = f"/licenses?content_id={rng.randint(1, 100)}&limit=20"
+            if path in etags and rng.random() < 0.5:
+                headers["If-None-Match"] = etags[path]
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+        if response.status >= 500:
+            errors.append(f"{response.status} for {method} {path}")
+        etag = response.getheader("ETag")
+        if etag:
+            etags[path] = etag
+
+    conn.close()
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run(base_url: str, clients: int, seconds: float) -> dict:
+    """I run the load test and return the numbers it printed."""
+    deadline = time.perf_counter() + seconds
+    per_client: list[list] = [[] for _ in range(clients)]
+    errors: list = []
+    threads = [
+        threading.Thread(target=_client, args=(base_url, deadline, n, per_client[n], errors))
+        for n in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for chunk in per_client for latency in chunk)
+    result = {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1_000,
+        "p99_ms": _percentile(latencies, 0.99) * 1_000,
+    }
+    print(
+        f"{clients} clients, {seconds:.0f}s: {result['requests']:,} requests, "
+        f"{result['rps']:,.0f} req/s, p50 {result['p50_ms']:.2f} ms, "
+        f"p99 {result['p99_ms']:.2f} ms, {result['errors']} errors"
+    )
+    if errors:
+        print("first error:", errors[0])
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None, help="server to test (default: start a local one)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=16, help="workers for the local server")
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.clients, args.seconds)
+    else:
+        with _local_server(args.workers) as url:
+            run(url, args.clients, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,680 @@
+"""
+I wrote this benchmark suite to time every public function of the repos
+(content_repo, distributor_repo, license_repo) and the services
+(content_service, distributor_service, license_service, conflict_service)
+at several catalog sizes, and to catch performance regressions.
+
+For each size (number of license rows) it:
+- builds a fresh database with benchmarks.synthetic.generate_catalog()
+- calls each function with realistic, seeded arguments, repeatedly until
+  a time budget is used up, and records the median and p95 per call
+- skips whole-table scans above --max-scan-rows so a 10M run does not
+  try to hold 10M objects in memory (they are listed as skipped)
+
+Results are written as JSON. With --baseline, every case is compared to
+the stored run and flagged when it is more than --threshold slower (and
+slower by more than --min-delta-ms, so microsecond noise is ignored).
+
+Run it from the project root:
+
+    python -m benchmarks.suite --sizes 1k,10k,100k --out results.json
+    python -m benchmarks.suite --sizes 1k,10k,100k --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --sizes 1k,10k,100k --baseline benchmarks/baseline.json
+    python -m benchmarks.suite --sizes 1M,10M --budget 2
+"""
+
+import argparse
+import inspect
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from collections import deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+from benchmarks._common import temp_database
+from benchmarks.synthetic import GENRES, REGIONS, WORDS, CatalogSize, generate_catalog
+from src.models.content import Content
+from src.models.distributor import Distributor
+from src.models.license_xref import LicenseXref
+from src.persistence import content_repo, distributor_repo, license_repo
+from src.services import conflict_service, content_service, distributor_service, license_service
+
+
+SUITE_MODULES = (
+    content_repo, distributor_repo, license_repo,
+    content_service, distributor_service, license_service, conflict_service,
+)
+
+DEFAULT_SIZES = "1k,10k,100k"
+DEFAULT_BUDGET = 0.5       # seconds of calls per case
+MAX_CALLS = 200
+MAX_SCAN_CALLS = 3
+DEFAULT_MAX_SCAN_ROWS = 1_000_000
+DEFAULT_THRESHOLD = 0.25   # 25% slower than the baseline is a regression
+DEFAULT_MIN_DELTA_MS = 0.05
+
+
+class Context:
+    """
+    I hand each case the catalog size and a seeded random source, and
+    remember what the write cases created so later cases can update or
+    delete real rows.
+    """
+
+    def __init__(self, size: CatalogSize, seed: int):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.created_content: List[int] = []
+        self.created_distributors: List[int] = []
+        self.created_licenses: List[int] = []
+        self._windows = 0
+
+    def content_id(self) -> int:
+        return self.rng.randint(1, self.size.content)
+
+    def distributor_id(self) -> int:
+        return self.rng.randint(1, self.size.distributors)
+
+    def license_id(self) -> int:
+        return self.rng.randint(1, self.size.licenses)
+
+    def day(self) -> date:
+        return date(2005, 1, 1) + timedelta(days=self.rng.randint(0, 9_000))
+
+    def fresh_window(self) -> tuple[str, str]:
+        # One-day windows long before any synthetic license starts (open
+        # ends rule out the far future), each used once, so writes never
+        # hit the overlap rule.
+        self._windows += 1
+        day = (date(1800, 1, 1) + timedelta(days=self._windows)).isoformat()
+        return day, day
+
+    def new_license(self) -> LicenseXref:
+        start, end = self.fresh_window()
+        return LicenseXref(0, self.content_id(), self.distributor_id(), start, end, "Benchmark terms")
+
+    def word(self) -> str:
+        return self.rng.choice(WORDS)
+
+    def take(self, created: List[int]) -> int:
+        # Delete cases remove rows the create cases made; once those run
+        # out they time the "no such row" path with an id that never exists.
+        return created.pop() if created else 10 ** 12
+
+
+class Case(NamedTuple):
+    name: str
+    call: Callable[[Context], object]
+    scan: bool
+    writes: bool
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, scan: bool = False, writes: bool = False):
+    """
+    I register the decorated function as the benchmark for `name`.
+    Write cases run after all read cases, so the rows they add do not
+    change what the reads are measured against.
+    """
+    def register(func: Callable[[Context], object]) -> Callable[[Context], object]:
+        CASES[name] = Case(name, func, scan, writes)
+        return func
+    return register
+
+
+def _drain(iterator) -> None:
+    deque(iterator, maxlen=0)
+
+
+# ---- content_repo ----
+@case("content_repo.create_content", writes=True)
+def _(ctx):
+    ctx.created_content.append(content_repo.create_content(Content(0, f"Bench {ctx.word()}", "Drama")).id)
+
+
+@case("content_repo.create_many_content", writes=True)
+def _(ctx):
+    content_repo.create_many_content(Content(0, f"Bulk {ctx.word()} {i}", "Drama") for i in range(100))
+
+
+@case("content_repo.get_content_by_id")
+def _(ctx):
+    content_repo.get_content_by_id(ctx.content_id())
+
+
+@case("content_repo.content_exists")
+def _(ctx):
+    content_repo.content_exists(ctx.content_id())
+
+
+@case("content_repo.existing_content_ids")
+def _(ctx):
+    content_repo.existing_content_ids([ctx.content_id() for _ in range(1_000)])
+
+
+@case("content_repo.iter_all_content", scan=True)
+def _(ctx):
+    _drain(content_repo.iter_all_content())
+
+
+@case("content_repo.list_all_content", scan=True)
+def _(ctx):
+    content_repo.list_all_content()
+
+
+@case("content_repo.list_content_page")
+def _(ctx):
+    content_repo.list_content_page(filters={"genre": ctx.rng.choice(GENRES)[0]})
+
+
+@case("content_repo.search_content")
+def _(ctx):
+    content_repo.search_content(f'"{ctx.word()}"', 20)
+
+
+@case("content_repo.update_content", writes=True)
+def _(ctx):
+    content_repo.update_content(Content(ctx.content_id(), f"Renamed {ctx.word()}", "Drama"))
+
+
+@case("content_repo.delete_content", writes=True)
+def _(ctx):
+    content_repo.delete_content(ctx.take(ctx.created_content))
+
+
+# ---- distributor_repo ----
+@case("distributor_repo.create_distributor", writes=True)
+def _(ctx):
+    ctx.created_distributors.append(distributor_repo.create_distributor(Distributor(0, "Bench", None, "EU")).id)
+
+
+@case("distributor_repo.create_many_distributors", writes=True)
+def _(ctx):
+    distributor_repo.create_many_distributors(Distributor(0, f"Bulk {i}", None, "NA") for i in range(100))
+
+
+@case("distributor_repo.get_distributor_by_id")
+def _(ctx):
+    distributor_repo.get_distributor_by_id(ctx.distributor_id())
+
+
+@case("distributor_repo.distributor_exists")
+def _(ctx):
+    distributor_repo.distributor_exists(ctx.distributor_id())
+
+
+@case("distributor_repo.existing_distributor_ids")
+def _(ctx):
+    distributor_repo.existing_distributor_ids([ctx.distributor_id() for _ in range(1_000)])
+
+
+@case("distributor_repo.iter_all_distributors", scan=True)
+def _(ctx):
+    _drain(distributor_repo.iter_all_distributors())
+
+
+@case("distributor_repo.list_all_distributors", scan=True)
+def _(ctx):
+    distributor_repo.list_all_distributors()
+
+
+@case("distributor_repo.list_distributors_page")
+def _(ctx):
+    distributor_repo.list_distributors_page(filters={"region": ctx.rng.choice(REGIONS)[0]})
+
+
+@case("distributor_repo.update_distributor", writes=True)
+def _(ctx):
+    distributor_id = ctx.distributor_id()
+    distributor_repo.update_distributor(Distributor(distributor_id, f"Distributor {distributor_id}", None, "EU"))
+
+
+@case("distributor_repo.delete_distributor", writes=True)
+def _(ctx):
+    distributor_repo.delete_distributor(ctx.take(ctx.created_distributors))
+
+
+# ---- license_repo ----
+@case("license_repo.create_license", writes=True)
+def _(ctx):
+    ctx.created_licenses.append(license_repo.create_license(ctx.new_license()).id)
+
+
+@case("license_repo.create_many_licenses", writes=True)
+def _(ctx):
+    license_repo.create_many_licenses(ctx.new_license() for _ in range(100))
+
+
+@case("license_repo.get_license_by_id")
+def _(ctx):
+    license_repo.get_license_by_id(ctx.license_id())
+
+
+@case("license_repo.references_exist")
+def _(ctx):
+    license_repo.references_exist(ctx.content_id(), ctx.distributor_id())
+
+
+@case("license_repo.iter_all_licenses", scan=True)
+def _(ctx):
+    _drain(license_repo.iter_all_licenses())
+
+
+@case("license_repo.list_all_licenses", scan=True)
+def _(ctx):
+    license_repo.list_all_licenses()
+
+
+@case("license_repo.list_licenses_page")
+def _(ctx):
+    license_repo.list_licenses_page(filters={"content_id": ctx.content_id()})
+
+
+@case("license_repo.iter_license_details")
+def _(ctx):
+    _drain(license_repo.iter_license_details({"content_id": ctx.content_id()}))
+
+
+@case("license_repo.list_license_details_page")
+def _(ctx):
+    license_repo.list_license_details_page(filters={"region": ctx.rng.choice(REGIONS)[0]})
+
+
+@case("license_repo.list_licenses_in_window")
+def _(ctx):
+    day = ctx.day()
+    license_repo.list_licenses_in_window(day.isoformat(), (day + timedelta(days=7)).isoformat())
+
+
+@case("license_repo.list_licenses_ending_between")
+def _(ctx):
+    day = ctx.day()
+    license_repo.list_licenses_ending_between(day.isoformat(), (day + timedelta(days=30)).isoformat())
+
+
+@case("license_repo.iter_license_columns", scan=True)
+def _(ctx):
+    _drain(license_repo.iter_license_columns())
+
+
+@case("license_repo.get_terms")
+def _(ctx):
+    license_repo.get_terms([ctx.license_id() for _ in range(1_000)])
+
+
+@case("license_repo.iter_licenses_by_window", scan=True)
+def _(ctx):
+    _drain(license_repo.iter_licenses_by_window())
+
+
+@case("license_repo.list_overlapping_licenses")
+def _(ctx):
+    day = ctx.day().isoformat()
+    license_repo.list_overlapping_licenses(ctx.content_id(), ctx.distributor_id(), day, day)
+
+
+@case("license_repo.update_license", writes=True)
+def _(ctx):
+    lic = ctx.new_license()
+    lic.id = ctx.created_licenses[-1] if ctx.created_licenses else ctx.license_id()
+    license_repo.update_license(lic)
+
+
+@case("license_repo.delete_license", writes=True)
+def _(ctx):
+    license_repo.delete_license(ctx.take(ctx.created_licenses))
+
+
+# ---- content_service ----
+@case("content_service.build_content")
+def _(ctx):
+    content_service.build_content(f" Title {ctx.word()} ", "Drama", "Movie", 2020, None)
+
+
+@case("content_service.add_content", writes=True)
+def _(ctx):
+    ctx.created_content.append(content_service.add_content(f"Service {ctx.word()}", "Drama").id)
+
+
+@case("content_service.add_content_bulk", writes=True)
+def _(ctx):
+    content_service.add_content_bulk(Content(0, f"Bulk {i}", "Drama") for i in range(100))
+
+
+@case("content_service.get_content")
+def _(ctx):
+    content_service.get_content(ctx.content_id())
+
+
+@case("content_service.list_contents", scan=True)
+def _(ctx):
+    content_service.list_contents()
+
+
+@case("content_service.iter_contents", scan=True)
+def _(ctx):
+    _drain(content_service.iter_contents())
+
+
+@case("content_service.list_contents_page")
+def _(ctx):
+    content_service.list_contents_page(content_type="Series")
+
+
+@case("content_service.build_search_query")
+def _(ctx):
+    content_service.build_search_query(f"{ctx.word()} {ctx.word()[:3]}")
+
+
+@case("content_service.search_content")
+def _(ctx):
+    content_service.search_content(f"{ctx.word()} {ctx.word()[:3]}")
+
+
+# ---- distributor_service ----
+@case("distributor_service.build_distributor")
+def _(ctx):
+    distributor_service.build_distributor(" Bench ", "rights@example.com", "EU")
+
+
+@case("distributor_service.add_distributor", writes=True)
+def _(ctx):
+    ctx.created_distributors.append(distributor_service.add_distributor("Bench", None, "EU").id)
+
+
+@case("distributor_service.add_distributor_bulk", writes=True)
+def _(ctx):
+    distributor_service.add_distributor_bulk(Distributor(0, f"Bulk {i}", None, "NA") for i in range(100))
+
+
+@case("distributor_service.get_distributor")
+def _(ctx):
+    distributor_service.get_distributor(ctx.distributor_id())
+
+
+@case("distributor_service.list_distributors", scan=True)
+def _(ctx):
+    distributor_service.list_distributors()
+
+
+@case("distributor_service.iter_distributors", scan=True)
+def _(ctx):
+    _drain(distributor_service.iter_distributors())
+
+
+@case("distributor_service.list_distributors_page")
+def _(ctx):
+    distributor_service.list_distributors_page(region="APAC")
+
+
+# ---- license_service ----
+@case("license_service.build_license")
+def _(ctx):
+    start, end = ctx.fresh_window()
+    license_service.build_license(ctx.content_id(), ctx.distributor_id(), start, end, " SVOD ")
+
+
+@case("license_service.add_license", writes=True)
+def _(ctx):
+    lic = ctx.new_license()
+    saved = license_service.add_license(lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms)
+    ctx.created_licenses.append(saved.id)
+
+
+@case("license_service.validate_license")
+def _(ctx):
+    license_service.validate_license(ctx.new_license())
+
+
+@case("license_service.prefetch_references")
+def _(ctx):
+    license_service.prefetch_references(
+        LicenseXref(0, ctx.content_id(), ctx.distributor_id()) for _ in range(1_000)
+    )
+
+
+@case("license_service.add_license_bulk", writes=True)
+def _(ctx):
+    license_service.add_license_bulk(ctx.new_license() for _ in range(100))
+
+
+@case("license_service.get_license")
+def _(ctx):
+    license_service.get_license(ctx.license_id())
+
+
+@case("license_service.list_licenses", scan=True)
+def _(ctx):
+    license_service.list_licenses()
+
+
+@case("license_service.iter_licenses", scan=True)
+def _(ctx):
+    _drain(license_service.iter_licenses())
+
+
+@case("license_service.list_licenses_page")
+def _(ctx):
+    license_service.list_licenses_page(distributor_id=ctx.distributor_id())
+
+
+@case("license_service.iter_license_details")
+def _(ctx):
+    _drain(license_service.iter_license_details(content_id=ctx.content_id()))
+
+
+@case("license_service.list_license_details_page")
+def _(ctx):
+    license_service.list_license_details_page(content_type="Movie")
+
+
+@case("license_service.list_active_licenses")
+def _(ctx):
+    license_service.list_active_licenses(ctx.day().isoformat())
+
+
+@case("license_service.list_licenses_in_window")
+def _(ctx):
+    day = ctx.day()
+    license_service.list_licenses_in_window(day.isoformat(), (day + timedelta(days=7)).isoformat())
+
+
+@case("license_service.list_expiring_licenses")
+def _(ctx):
+    license_service.list_expiring_licenses(30, today=ctx.day().isoformat())
+
+
+@case("license_service.update_license", writes=True)
+def _(ctx):
+    lic = ctx.new_license()
+    lic.id = ctx.created_licenses[-1] if ctx.created_licenses else ctx.license_id()
+    license_service.update_license(lic)
+
+
+@case("license_service.delete_license", writes=True)
+def _(ctx):
+    license_service.delete_license(ctx.take(ctx.created_licenses))
+
+
+# ---- conflict_service ----
+@case("conflict_service.find_conflicts", scan=True)
+def _(ctx):
+    _drain(conflict_service.find_conflicts())
+
+
+@case("conflict_service.find_conflicting_licenses")
+def _(ctx):
+    start, end = ctx.fresh_window()
+    conflict_service.find_conflicting_licenses(ctx.content_id(), ctx.distributor_id(), start, end)
+
+
+# ------------------------------------------------------------
+# Running, saving and comparing
+# ------------------------------------------------------------
+def uncovered_functions() -> List[str]:
+    """I list public functions of SUITE_MODULES that have no case yet."""
+    missing = []
+    for module in SUITE_MODULES:
+        short = module.__name__.rsplit(".", 1)[-1]
+        for name, func in inspect.getmembers(module, inspect.isfunction):
+            if func.__module__ == module.__name__ and not name.startswith("_"):
+                if f"{short}.{name}" not in CASES:
+                    missing.append(f"{short}.{name}")
+    return missing
+
+
+def parse_sizes(text: str) -> List[int]:
+    """I turn "1k,10k,1M" into [1000, 10000, 1000000]."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        factor = multipliers.get(part[-1:], 1)
+        number = part[:-1] if factor != 1 else part
+        try:
+            sizes.append(int(float(number) * factor))
+        except ValueError:
+            raise ValueError(f"Cannot read size {part!r}; use numbers like 1000, 10k or 1M.") from None
+    return sizes
+
+
+def _time_case(entry: Case, ctx: Context, budget: float) -> dict:
+    limit = MAX_SCAN_CALLS if entry.scan else MAX_CALLS
+    if not entry.writes:
+        entry.call(ctx)  # warm-up: page cache, statement cache, read cache
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < limit and (not timings or time.perf_counter() - started < budget):
+        start = time.perf_counter()
+        entry.call(ctx)
+        timings.append((time.perf_counter() - start) * 1_000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "calls": len(timings),
+    }
+
+
+def run_size(licenses: int, seed: int, budget: float, max_scan_rows: int, only: str | None) -> dict:
+    size = CatalogSize.for_licenses(licenses)
+    results: dict = {}
+    with temp_database():
+        start = time.perf_counter()
+        generate_catalog(size, seed)
+        print(f"\n== {size} (generated in {time.perf_counter() - start:.1f}s) ==")
+
+        ctx = Context(size, seed)
+        ordered = sorted(CASES.values(), key=lambda entry: entry.writes)
+        for entry in ordered:
+            name = entry.name
+            if only and only not in name:
+                continue
+            if entry.scan and licenses > max_scan_rows:
+                results[name] = {"skipped": f"whole-table scan above {max_scan_rows:,} rows"}
+                print(f"  {name:<48} skipped")
+                continue
+            results[name] = _time_case(entry, ctx, budget)
+            r = results[name]
+            print(f"  {name:<48} median {r['median_ms']:10.3f} ms  p95 {r['p95_ms']:10.3f} ms  ({r['calls']} calls)")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """
+    I return one line per case that got slower than in the baseline.
+
+    Whole runs drift (another machine, a busy CPU), so I first take the
+    median new/old ratio over all cases as the run's speed factor and
+    judge each case against the baseline scaled by it. A case is flagged
+    when its median is more than `threshold` (a fraction) and more than
+    min_delta_ms above that, and also above the scaled baseline p95, so
+    ordinary jitter is not reported.
+    """
+    pairs = []
+    for size, cases in current["sizes"].items():
+        for name, result in cases.items():
+            old = baseline.get("sizes", {}).get(size, {}).get(name)
+            if old and old.get("median_ms") and "median_ms" in result:
+                pairs.append((size, name, old, result))
+    if not pairs:
+        return []
+
+    factor = statistics.median(result["median_ms"] / old["median_ms"] for _, _, old, result in pairs)
+    print(f"\nWhole-run speed factor against the baseline: {factor:.2f}x")
+
+    regressions = []
+    for size, name, old, result in pairs:
+        new_ms = result["median_ms"]
+        expected_ms = old["median_ms"] * factor
+        slower = new_ms > expected_ms * (1 + threshold) and new_ms - expected_ms > min_delta_ms
+        if slower and new_ms > old.get("p95_ms", old["median_ms"]) * factor:
+            regressions.append(
+                f"{size:>10} {name:<48} {old['median_ms']:10.3f} -> {new_ms:10.3f} ms "
+                f"({(new_ms / expected_ms - 1) * 100:+.0f}% after the speed factor)"
+            )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="license row counts, e.g. 1k,10k,100k,1M,10M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds of calls per case")
+    parser.add_argument("--max-scan-rows", type=int, default=DEFAULT_MAX_SCAN_ROWS)
+    parser.add_argument("--only", default=None, help="only run cases whose name contains this text")
+    parser.add_argument("--out", type=Path, default=None, help="write the results JSON here")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare against this results JSON")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="also write the results here")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args(argv)
+
+    missing = uncovered_functions()
+    if missing:
+        print("No benchmark case for:", ", ".join(missing))
+
+    current = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "budget_s": args.budget,
+        },
+        "sizes": {},
+    }
+    for licenses in parse_sizes(args.sizes):
+        current["sizes"][str(licenses)] = run_size(
+            licenses, args.seed, args.budget, args.max_scan_rows, args.only
+        )
+
+    for path in (args.out, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+            print(f"\nWrote {path}")
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        print("\n".join(regressions))
+        return 1
+    print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
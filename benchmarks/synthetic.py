@@ -0,0 +1,222 @@
+"""
+I wrote this module to fill a database with a synthetic catalog that
+looks like real licensing data, so benchmarks run against realistic
+shapes instead of uniform rows.
+
+The catalog is deterministic: the same counts and seed always give the
+same rows. It has:
+- content with genres, types and release years weighted toward recent
+  years, and notes on some titles
+- distributors spread unevenly over regions
+- licenses spread over titles with a Zipf-like skew (a few titles hold
+  many licenses, many hold one or none), each held by a handful of
+  distributors, with back-to-back date windows per title and
+  distributor (never overlapping, as the service rules require), some
+  open-ended
+
+Usage from the project root (writes to a new database file):
+
+    python -m benchmarks.synthetic out.db --content 100000 --licenses 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from src.persistence import db
+
+
+WORDS = (
+    "star night river city ghost winter summer empire lost silent dark golden "
+    "last return secret island storm fire ocean shadow king queen road dream "
+    "heart broken wild blue iron glass garden mirror north south edge signal "
+    "echo hollow crown bridge harbor velvet paper thunder").split()
+GENRES = (("Drama", 30), ("Comedy", 20), ("Documentary", 12), ("Thriller", 12),
+          ("Animation", 8), ("Sci-Fi", 8), ("Horror", 6), ("Romance", 4))
+CONTENT_TYPES = (("Movie", 60), ("Series", 30), ("Short", 10))
+REGIONS = (("NA", 35), ("EU", 30), ("APAC", 20), ("LATAM", 10), ("MEA", 5))
+TERMS = ("Exclusive SVOD", "Non-exclusive AVOD", "TVOD, worldwide", "Free TV, first window",
+         "Pay TV, second window", "Festival screening rights only", "Airline and hotel rights")
+# License lengths in days and how often each one is used.
+DURATIONS = ((90, 10), (180, 15), (365, 35), (730, 25), (1825, 15))
+
+FIRST_START = date(2005, 1, 1)
+# Back-to-back windows per (title, distributor) pair are capped so even
+# the most popular title's windows stay within a few decades.
+MAX_WINDOWS_PER_PAIR = 12
+INSERT_CHUNK = 20_000
+
+
+class CatalogSize(NamedTuple):
+    content: int
+    distributors: int
+    licenses: int
+
+    @classmethod
+    def for_licenses(cls, licenses: int) -> "CatalogSize":
+        """I pick content and distributor counts that fit a license count."""
+        return cls(max(100, licenses // 10), max(10, min(5_000, licenses // 1_000)), licenses)
+
+
+def _weighted(rng: random.Random, choices: tuple) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _content_rows(count: int, rng: random.Random) -> Iterator[tuple]:
+    genres, genre_weights = zip(*GENRES)
+    types, type_weights = zip(*CONTENT_TYPES)
+    for i in range(1, count + 1):
+        words = rng.randint(1, 4)
+        title = " ".join(rng.choice(WORDS).title() for _ in range(words))
+        # Recent years are much more common than old ones.
+        year = 2025 - int(rng.expovariate(1 / 12)) % 75
+        notes = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 15))) if rng.random() < 0.3 else None
+        yield (
+            f"{title} {i}",
+            rng.choices(genres, genre_weights)[0],
+            rng.choices(types, type_weights)[0],
+            year,
+            notes,
+        )
+
+
+def _distributor_rows(count: int, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, count + 1):
+        region = _weighted(rng, REGIONS)
+        yield (f"Distributor {i}", f"rights{i}@example.com" if rng.random() < 0.8 else None, region)
+
+
+def license_counts(
+    content: int, licenses: int, skew: float, rng: random.Random, cap: int | None = None
+) -> list[int]:
+    """
+    I split `licenses` over `content` titles with Zipf-like weights
+    (weight 1 / rank**skew, ranks shuffled so popular titles are spread
+    over the id range). No title gets more than `cap`; what is cut off
+    the top goes to the next titles in line. The counts always add up to
+    `licenses`.
+    """
+    if cap is not None and cap * content < licenses:
+        raise ValueError(f"{content} titles cannot hold {licenses} licenses at {cap} each.")
+
+    ranks = list(range(1, content + 1))
+    rng.shuffle(ranks)
+    weights = [1.0 / rank ** skew for rank in ranks]
+    total = sum(weights)
+    counts = [int(licenses * w / total) for w in weights]
+    # Hand out what rounding down left over, again by weight.
+    remaining = licenses - sum(counts)
+    if remaining:
+        cumulative = list(accumulate(weights))
+        for index in rng.choices(range(content), cum_weights=cumulative, k=remaining):
+            counts[index] += 1
+
+    if cap is not None:
+        excess = sum(max(0, c - cap) for c in counts)
+        counts = [min(c, cap) for c in counts]
+        index = 0
+        while excess:
+            room = min(cap - counts[index], excess)
+            counts[index] += room
+            excess -= room
+            index += 1
+    return counts
+
+
+def _license_rows(size: CatalogSize, skew: float, rng: random.Random) -> Iterator[tuple]:
+    durations, duration_weights = zip(*DURATIONS)
+    cap = size.distributors * MAX_WINDOWS_PER_PAIR
+    counts = license_counts(size.content, size.licenses, skew, rng, cap)
+
+    for content_id, count in enumerate(counts, start=1):
+        if not count:
+            continue
+        # Each title is licensed to a few distributors; each of them gets
+        # back-to-back windows, so no two licenses for a pair overlap.
+        wanted = max(rng.randint(1, 6), -(-count // MAX_WINDOWS_PER_PAIR))
+        holders = rng.sample(range(1, size.distributors + 1), min(size.distributors, wanted))
+        next_start = {d: FIRST_START + timedelta(days=rng.randint(0, 3_650)) for d in holders}
+        per_holder = [holders[i % len(holders)] for i in range(count)]
+        last_for = {d: i for i, d in enumerate(per_holder)}
+
+        for i, distributor_id in enumerate(per_holder):
+            start = next_start[distributor_id]
+            end = start + timedelta(days=rng.choices(durations, duration_weights)[0] - 1)
+            next_start[distributor_id] = end + timedelta(days=1 + rng.randint(0, 120))
+
+            is_last = last_for[distributor_id] == i
+            start_text = start.isoformat()
+            end_text = None if is_last and rng.random() < 0.15 else end.isoformat()
+            terms = rng.choice(TERMS) if rng.random() < 0.9 else None
+            yield (content_id, distributor_id, start_text, end_text, terms)
+
+
+def _insert(sql: str, rows: Iterator[tuple]) -> None:
+    while True:
+        chunk = list(islice(rows, INSERT_CHUNK))
+        if not chunk:
+            break
+        with db.connection() as conn:
+            conn.executemany(sql, chunk)
+
+
+def generate_catalog(size: CatalogSize, seed: int = 42, skew: float = 1.1) -> CatalogSize:
+    """
+    I fill the database at db.DB_PATH (schema already migrated, tables
+    empty) with a synthetic catalog of the given size. Inserts run with
+    the bulk-load profile, which is put back afterwards.
+    """
+    previous_profile = db.get_profile()
+    db.set_profile("bulk-load")
+    try:
+        _insert(
+            "INSERT INTO content (title, genre, content_type, release_year, notes) VALUES (?, ?, ?, ?, ?)",
+            _content_rows(size.content, random.Random(f"{seed}:content")),
+        )
+        _insert(
+            "INSERT INTO distributor (name, contact_email, region) VALUES (?, ?, ?)",
+            _distributor_rows(size.distributors, random.Random(f"{seed}:distributors")),
+        )
+        _insert(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date, terms) "
+            "VALUES (?, ?, ?, ?, ?)",
+            _license_rows(size, skew, random.Random(f"{seed}:licenses")),
+        )
+        with db.connection() as conn:
+            conn.execute("ANALYZE")
+    finally:
+        db.set_profile(previous_profile)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", type=Path, help="database file to create")
+    parser.add_argument("--licenses", type=int, default=100_000)
+    parser.add_argument("--content", type=int, default=None)
+    parser.add_argument("--distributors", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=1.1)
+    args = parser.parse_args()
+
+    if args.path.exists():
+        raise SystemExit(f"{args.path} already exists; pick a new file.")
+
+    default = CatalogSize.for_licenses(args.licenses)
+    size = CatalogSize(args.content or default.content, args.distributors or default.distributors, args.licenses)
+
+    db.DB_PATH = args.path
+    db.init_db()
+    start = time.perf_counter()
+    generate_catalog(size, args.seed, args.skew)
+    db.close_pool()
+    print(f"Generated {size} in {time.perf_counter() - start:.1f}s -> {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+-- ===========================
+-- SECONDARY INDEXES
+-- ===========================
+-- Lookups and pages of licenses for one title or one distributor.
+-- A single-column index keeps rowids in order inside each key, so
+-- "WHERE content_id = ? AND id > ? ORDER BY id" needs no sort.
+CREATE INDEX IF NOT EXISTS idx_license_xref_content_id
+    ON license_xref (content_id);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_distributor_id
+    ON license_xref (distributor_id);
+
+-- Licenses for one content/distributor pair, ordered by window start.
+CREATE INDEX IF NOT EXISTS idx_license_xref_pair_start
+    ON license_xref (content_id, distributor_id, start_date);
+
+-- Date range queries ("starts between", "ends before").
+CREATE INDEX IF NOT EXISTS idx_license_xref_dates
+    ON license_xref (start_date, end_date);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_end_date
+    ON license_xref (end_date);
+
+-- Filters used by the paged content and distributor listings.
+CREATE INDEX IF NOT EXISTS idx_content_genre
+    ON content (genre);
+
+CREATE INDEX IF NOT EXISTS idx_content_content_type
+    ON content (content_type);
+
+CREATE INDEX IF NOT EXISTS idx_distributor_region
+    ON distributor (region);
@@ -0,0 +1,53 @@
+-- ===========================
+-- LICENSE WINDOW INDEX (R*Tree)
+-- ===========================
+-- One-dimensional R*Tree over each license's active window, stored as
+-- whole days since 1970-01-01. It answers "active on D" and "overlaps
+-- [D1, D2]" without scanning every row that started before D.
+-- A NULL (or unreadable) start/end date means the window is open on that
+-- side; -1000000 and 3000000 match OPEN_START_DAY/OPEN_END_DAY in src/utils.py.
+CREATE VIRTUAL TABLE IF NOT EXISTS license_window USING rtree_i32(
+    id,
+    start_day,
+    end_day
+);
+
+INSERT INTO license_window (id, start_day, end_day)
+SELECT
+    id,
+    COALESCE(CAST(strftime('%s', start_date) AS INTEGER) / 86400, -1000000),
+    COALESCE(CAST(strftime('%s', end_date) AS INTEGER) / 86400, 3000000)
+FROM license_xref
+WHERE id NOT IN (SELECT id FROM license_window)
+  -- A window that ends before it starts is empty (and rtree_i32 rejects it).
+  AND COALESCE(CAST(strftime('%s', start_date) AS INTEGER) / 86400, -1000000)
+      <= COALESCE(CAST(strftime('%s', end_date) AS INTEGER) / 86400, 3000000);
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000),
+        COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000),
+        COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_delete
+AFTER DELETE ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+END;
@@ -0,0 +1,72 @@
+-- ===========================
+-- FULL-TEXT SEARCH (FTS5)
+-- ===========================
+-- Two external-content FTS5 indexes: the text lives only in content and
+-- license_xref, the indexes only hold tokens. Triggers below keep them in
+-- step with every INSERT, UPDATE and DELETE.
+-- remove_diacritics lets "amelie" find "Amélie"; prefix='2 3' adds
+-- small prefix indexes so "arr*" style queries do not scan the vocabulary.
+CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+    title,
+    notes,
+    genre,
+    content = 'content',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS license_terms_fts USING fts5(
+    terms,
+    content = 'license_xref',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+INSERT INTO content_fts (content_fts) VALUES ('rebuild');
+INSERT INTO license_terms_fts (license_terms_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_content_fts_insert
+AFTER INSERT ON content
+BEGIN
+    INSERT INTO content_fts (rowid, title, notes, genre)
+    VALUES (NEW.id, NEW.title, NEW.notes, NEW.genre);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_content_fts_update
+AFTER UPDATE OF id, title, notes, genre ON content
+BEGIN
+    INSERT INTO content_fts (content_fts, rowid, title, notes, genre)
+    VALUES ('delete', OLD.id, OLD.title, OLD.notes, OLD.genre);
+    INSERT INTO content_fts (rowid, title, notes, genre)
+    VALUES (NEW.id, NEW.title, NEW.notes, NEW.genre);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_content_fts_delete
+AFTER DELETE ON content
+BEGIN
+    INSERT INTO content_fts (content_fts, rowid, title, notes, genre)
+    VALUES ('delete', OLD.id, OLD.title, OLD.notes, OLD.genre);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_terms_fts_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_terms_fts (rowid, terms) VALUES (NEW.id, NEW.terms);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_terms_fts_update
+AFTER UPDATE OF id, terms ON license_xref
+BEGIN
+    INSERT INTO license_terms_fts (license_terms_fts, rowid, terms)
+    VALUES ('delete', OLD.id, OLD.terms);
+    INSERT INTO license_terms_fts (rowid, terms) VALUES (NEW.id, NEW.terms);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_terms_fts_delete
+AFTER DELETE ON license_xref
+BEGIN
+    INSERT INTO license_terms_fts (license_terms_fts, rowid, terms)
+    VALUES ('delete', OLD.id, OLD.terms);
+END;
@@ -0,0 +1,177 @@
+-- ===========================
+-- LICENSE COUNT SUMMARIES
+-- ===========================
+-- Dashboard numbers kept up to date by triggers on license_xref, so
+-- reading them is one primary-key lookup instead of a scan:
+-- - distributor_license_counts: licenses per distributor
+-- - content_distributor_counts: licenses per (title, distributor) pair,
+--   which is what lets the triggers keep distinct distributor counts
+-- - content_license_counts: licenses, distinct distributors and
+--   licenses active on license_counts_state.active_day, per title
+-- Rows whose counts drop to zero are deleted, so a missing row means 0.
+-- "Active" depends on the day, so active_day is moved forward by
+-- license_counts_repo.advance_active_day(), which only recounts the titles
+-- with a window starting or ending in between.
+-- The day expressions match license_window (0003) and src/utils.py.
+CREATE TABLE IF NOT EXISTS distributor_license_counts (
+    distributor_id INTEGER PRIMARY KEY,
+    licenses INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS content_distributor_counts (
+    content_id INTEGER NOT NULL,
+    distributor_id INTEGER NOT NULL,
+    licenses INTEGER NOT NULL,
+    PRIMARY KEY (content_id, distributor_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS content_license_counts (
+    content_id INTEGER PRIMARY KEY,
+    licenses INTEGER NOT NULL,
+    distributors INTEGER NOT NULL,
+    active_licenses INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS license_counts_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    active_day INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO license_counts_state (id, active_day)
+VALUES (1, CAST(strftime('%s', 'now') AS INTEGER) / 86400);
+
+-- Fill the summaries from the licenses that already exist.
+INSERT INTO distributor_license_counts (distributor_id, licenses)
+SELECT distributor_id, COUNT(*) FROM license_xref GROUP BY distributor_id;
+
+INSERT INTO content_distributor_counts (content_id, distributor_id, licenses)
+SELECT content_id, distributor_id, COUNT(*) FROM license_xref GROUP BY content_id, distributor_id;
+
+INSERT INTO content_license_counts (content_id, licenses, distributors, active_licenses)
+SELECT
+    content_id,
+    COUNT(*),
+    COUNT(DISTINCT distributor_id),
+    SUM(
+        COALESCE(CAST(strftime('%s', start_date) AS INTEGER) / 86400, -1000000)
+            <= (SELECT active_day FROM license_counts_state WHERE id = 1)
+        AND COALESCE(CAST(strftime('%s', end_date) AS INTEGER) / 86400, 3000000)
+            >= (SELECT active_day FROM license_counts_state WHERE id = 1)
+    )
+FROM license_xref
+GROUP BY content_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_counts_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO distributor_license_counts (distributor_id, licenses)
+    VALUES (NEW.distributor_id, 1)
+    ON CONFLICT (distributor_id) DO UPDATE SET licenses = licenses + 1;
+
+    INSERT INTO content_license_counts (content_id, licenses, distributors, active_licenses)
+    VALUES (NEW.content_id, 0, 0, 0)
+    ON CONFLICT (content_id) DO NOTHING;
+
+    UPDATE content_license_counts SET
+        licenses = licenses + 1,
+        distributors = distributors + NOT EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = NEW.content_id AND distributor_id = NEW.distributor_id
+        ),
+        active_licenses = active_licenses + (
+            SELECT COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000) <= active_day
+               AND COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = NEW.content_id;
+
+    INSERT INTO content_distributor_counts (content_id, distributor_id, licenses)
+    VALUES (NEW.content_id, NEW.distributor_id, 1)
+    ON CONFLICT (content_id, distributor_id) DO UPDATE SET licenses = licenses + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_counts_delete
+AFTER DELETE ON license_xref
+BEGIN
+    UPDATE distributor_license_counts SET licenses = licenses - 1
+    WHERE distributor_id = OLD.distributor_id;
+    DELETE FROM distributor_license_counts
+    WHERE distributor_id = OLD.distributor_id AND licenses = 0;
+
+    UPDATE content_distributor_counts SET licenses = licenses - 1
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id;
+
+    UPDATE content_license_counts SET
+        licenses = licenses - 1,
+        distributors = distributors - EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0
+        ),
+        active_licenses = active_licenses - (
+            SELECT COALESCE(CAST(strftime('%s', OLD.start_date) AS INTEGER) / 86400, -1000000) <= active_day
+               AND COALESCE(CAST(strftime('%s', OLD.end_date) AS INTEGER) / 86400, 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = OLD.content_id;
+
+    DELETE FROM content_distributor_counts
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0;
+    DELETE FROM content_license_counts
+    WHERE content_id = OLD.content_id AND licenses = 0;
+END;
+
+-- An update is counted as the old row leaving and the new row arriving.
+CREATE TRIGGER IF NOT EXISTS trg_license_counts_update
+AFTER UPDATE OF content_id, distributor_id, start_date, end_date ON license_xref
+BEGIN
+    UPDATE distributor_license_counts SET licenses = licenses - 1
+    WHERE distributor_id = OLD.distributor_id;
+    DELETE FROM distributor_license_counts
+    WHERE distributor_id = OLD.distributor_id AND licenses = 0;
+
+    UPDATE content_distributor_counts SET licenses = licenses - 1
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id;
+
+    UPDATE content_license_counts SET
+        licenses = licenses - 1,
+        distributors = distributors - EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0
+        ),
+        active_licenses = active_licenses - (
+            SELECT COALESCE(CAST(strftime('%s', OLD.start_date) AS INTEGER) / 86400, -1000000) <= active_day
+               AND COALESCE(CAST(strftime('%s', OLD.end_date) AS INTEGER) / 86400, 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = OLD.content_id;
+
+    DELETE FROM content_distributor_counts
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0;
+    DELETE FROM content_license_counts
+    WHERE content_id = OLD.content_id AND licenses = 0;
+
+    INSERT INTO distributor_license_counts (distributor_id, licenses)
+    VALUES (NEW.distributor_id, 1)
+    ON CONFLICT (distributor_id) DO UPDATE SET licenses = licenses + 1;
+
+    INSERT INTO content_license_counts (content_id, licenses, distributors, active_licenses)
+    VALUES (NEW.content_id, 0, 0, 0)
+    ON CONFLICT (content_id) DO NOTHING;
+
+    UPDATE content_license_counts SET
+        licenses = licenses + 1,
+        distributors = distributors + NOT EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = NEW.content_id AND distributor_id = NEW.distributor_id
+        ),
+        active_licenses = active_licenses + (
+            SELECT COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000) <= active_day
+               AND COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = NEW.content_id;
+
+    INSERT INTO content_distributor_counts (content_id, distributor_id, licenses)
+    VALUES (NEW.content_id, NEW.distributor_id, 1)
+    ON CONFLICT (content_id, distributor_id) DO UPDATE SET licenses = licenses + 1;
+END;
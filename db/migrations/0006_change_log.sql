@@ -0,0 +1,142 @@
+-- ===========================
+-- CHANGE LOG (change data capture)
+-- ===========================
+-- Every insert, update and delete on content, distributor and
+-- license_xref appends one row here from a trigger, in the same
+-- transaction as the change itself, so the log never misses or
+-- invents a change. Downstream consumers read it in seq order instead
+-- of re-reading whole tables.
+-- - seq: AUTOINCREMENT, so numbers only ever go up, even after the
+--   newest rows are compacted away
+-- - data: the row's new values as a JSON object (NULL for deletes)
+-- change_log_state.purged_through is the highest seq removed by
+-- retention; a consumer positioned before it has missed changes.
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    row_id INTEGER NOT NULL,
+    data TEXT,
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+-- Compaction looks for a later change to the same row.
+CREATE INDEX IF NOT EXISTS idx_change_log_row ON change_log (table_name, row_id, seq);
+-- Retention deletes by age.
+CREATE INDEX IF NOT EXISTS idx_change_log_changed_at ON change_log (changed_at);
+
+CREATE TABLE IF NOT EXISTS change_log_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    purged_through INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO change_log_state (id, purged_through) VALUES (1, 0);
+
+-- Where each named consumer has read up to, so retention can keep
+-- changes nobody has seen yet.
+CREATE TABLE IF NOT EXISTS change_consumers (
+    name TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_content_insert
+AFTER INSERT ON content
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('content', 'insert', NEW.id, json_object(
+        'id', NEW.id,
+        'title', NEW.title,
+        'genre', NEW.genre,
+        'content_type', NEW.content_type,
+        'release_year', NEW.release_year,
+        'notes', NEW.notes
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_content_update
+AFTER UPDATE ON content
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('content', 'update', NEW.id, json_object(
+        'id', NEW.id,
+        'title', NEW.title,
+        'genre', NEW.genre,
+        'content_type', NEW.content_type,
+        'release_year', NEW.release_year,
+        'notes', NEW.notes
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_content_delete
+AFTER DELETE ON content
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('content', 'delete', OLD.id, NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_distributor_insert
+AFTER INSERT ON distributor
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('distributor', 'insert', NEW.id, json_object(
+        'id', NEW.id,
+        'name', NEW.name,
+        'contact_email', NEW.contact_email,
+        'region', NEW.region
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_distributor_update
+AFTER UPDATE ON distributor
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('distributor', 'update', NEW.id, json_object(
+        'id', NEW.id,
+        'name', NEW.name,
+        'contact_email', NEW.contact_email,
+        'region', NEW.region
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_distributor_delete
+AFTER DELETE ON distributor
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('distributor', 'delete', OLD.id, NULL);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_license_xref_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('license_xref', 'insert', NEW.id, json_object(
+        'id', NEW.id,
+        'content_id', NEW.content_id,
+        'distributor_id', NEW.distributor_id,
+        'start_date', NEW.start_date,
+        'end_date', NEW.end_date,
+        'terms', NEW.terms
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_license_xref_update
+AFTER UPDATE ON license_xref
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('license_xref', 'update', NEW.id, json_object(
+        'id', NEW.id,
+        'content_id', NEW.content_id,
+        'distributor_id', NEW.distributor_id,
+        'start_date', NEW.start_date,
+        'end_date', NEW.end_date,
+        'terms', NEW.terms
+    ));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_license_xref_delete
+AFTER DELETE ON license_xref
+BEGIN
+    INSERT INTO change_log (table_name, op, row_id, data)
+    VALUES ('license_xref', 'delete', OLD.id, NULL);
+END;
@@ -0,0 +1,13 @@
+-- ===========================
+-- LICENSE SHARD DIRECTORY
+-- ===========================
+-- Only used when license_xref is split across shard files (see
+-- src/persistence/sharding.py). Ids are handed out here so they stay
+-- unique across shards, and each id remembers its content_id, so a
+-- lookup, update or delete by id goes straight to the one shard that
+-- holds the row. It stores content_id rather than a shard number, so
+-- rebalancing to a new layout does not have to rewrite it.
+CREATE TABLE IF NOT EXISTS license_shard_ids (
+    id         INTEGER PRIMARY KEY,
+    content_id INTEGER NOT NULL
+);
@@ -0,0 +1,189 @@
+-- ===========================
+-- EPOCH DAYS BY CALENDAR DATE
+-- ===========================
+-- 0003 and 0005 turned dates into epoch days with
+-- CAST(strftime('%s', d) AS INTEGER) / 86400. Integer division rounds
+-- toward zero, so a value with a time of day before 1970
+-- ('1969-12-31 12:00') landed on day 0 instead of -1, unlike
+-- src/utils.py. julianday(d, 'start of day') drops the time first, so
+-- the difference from 1970-01-01 is always a whole number of days.
+-- The triggers are recreated with that expression and the rows they
+-- may have placed on the wrong day are recounted.
+
+DROP TRIGGER IF EXISTS trg_license_window_insert;
+
+CREATE TRIGGER trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+        COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+    );
+END;
+
+DROP TRIGGER IF EXISTS trg_license_window_update;
+
+CREATE TRIGGER trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+        COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+    );
+END;
+
+DROP TRIGGER IF EXISTS trg_license_counts_insert;
+
+CREATE TRIGGER trg_license_counts_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO distributor_license_counts (distributor_id, licenses)
+    VALUES (NEW.distributor_id, 1)
+    ON CONFLICT (distributor_id) DO UPDATE SET licenses = licenses + 1;
+
+    INSERT INTO content_license_counts (content_id, licenses, distributors, active_licenses)
+    VALUES (NEW.content_id, 0, 0, 0)
+    ON CONFLICT (content_id) DO NOTHING;
+
+    UPDATE content_license_counts SET
+        licenses = licenses + 1,
+        distributors = distributors + NOT EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = NEW.content_id AND distributor_id = NEW.distributor_id
+        ),
+        active_licenses = active_licenses + (
+            SELECT COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) <= active_day
+               AND COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = NEW.content_id;
+
+    INSERT INTO content_distributor_counts (content_id, distributor_id, licenses)
+    VALUES (NEW.content_id, NEW.distributor_id, 1)
+    ON CONFLICT (content_id, distributor_id) DO UPDATE SET licenses = licenses + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_license_counts_delete;
+
+CREATE TRIGGER trg_license_counts_delete
+AFTER DELETE ON license_xref
+BEGIN
+    UPDATE distributor_license_counts SET licenses = licenses - 1
+    WHERE distributor_id = OLD.distributor_id;
+    DELETE FROM distributor_license_counts
+    WHERE distributor_id = OLD.distributor_id AND licenses = 0;
+
+    UPDATE content_distributor_counts SET licenses = licenses - 1
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id;
+
+    UPDATE content_license_counts SET
+        licenses = licenses - 1,
+        distributors = distributors - EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0
+        ),
+        active_licenses = active_licenses - (
+            SELECT COALESCE(CAST(julianday(OLD.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) <= active_day
+               AND COALESCE(CAST(julianday(OLD.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = OLD.content_id;
+
+    DELETE FROM content_distributor_counts
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0;
+    DELETE FROM content_license_counts
+    WHERE content_id = OLD.content_id AND licenses = 0;
+END;
+
+DROP TRIGGER IF EXISTS trg_license_counts_update;
+
+CREATE TRIGGER trg_license_counts_update
+AFTER UPDATE OF content_id, distributor_id, start_date, end_date ON license_xref
+BEGIN
+    UPDATE distributor_license_counts SET licenses = licenses - 1
+    WHERE distributor_id = OLD.distributor_id;
+    DELETE FROM distributor_license_counts
+    WHERE distributor_id = OLD.distributor_id AND licenses = 0;
+
+    UPDATE content_distributor_counts SET licenses = licenses - 1
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id;
+
+    UPDATE content_license_counts SET
+        licenses = licenses - 1,
+        distributors = distributors - EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0
+        ),
+        active_licenses = active_licenses - (
+            SELECT COALESCE(CAST(julianday(OLD.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) <= active_day
+               AND COALESCE(CAST(julianday(OLD.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = OLD.content_id;
+
+    DELETE FROM content_distributor_counts
+    WHERE content_id = OLD.content_id AND distributor_id = OLD.distributor_id AND licenses = 0;
+    DELETE FROM content_license_counts
+    WHERE content_id = OLD.content_id AND licenses = 0;
+
+    INSERT INTO distributor_license_counts (distributor_id, licenses)
+    VALUES (NEW.distributor_id, 1)
+    ON CONFLICT (distributor_id) DO UPDATE SET licenses = licenses + 1;
+
+    INSERT INTO content_license_counts (content_id, licenses, distributors, active_licenses)
+    VALUES (NEW.content_id, 0, 0, 0)
+    ON CONFLICT (content_id) DO NOTHING;
+
+    UPDATE content_license_counts SET
+        licenses = licenses + 1,
+        distributors = distributors + NOT EXISTS (
+            SELECT 1 FROM content_distributor_counts
+            WHERE content_id = NEW.content_id AND distributor_id = NEW.distributor_id
+        ),
+        active_licenses = active_licenses + (
+            SELECT COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) <= active_day
+               AND COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) >= active_day
+            FROM license_counts_state WHERE id = 1
+        )
+    WHERE content_id = NEW.content_id;
+
+    INSERT INTO content_distributor_counts (content_id, distributor_id, licenses)
+    VALUES (NEW.content_id, NEW.distributor_id, 1)
+    ON CONFLICT (content_id, distributor_id) DO UPDATE SET licenses = licenses + 1;
+END;
+
+-- Only values before 1970 could come out differently, so only rows
+-- with a date that sorts before 1970 are placed again.
+DELETE FROM license_window
+WHERE id IN (
+    SELECT id FROM license_xref
+    WHERE start_date < '1970-01-01' OR end_date < '1970-01-01'
+);
+
+INSERT INTO license_window (id, start_day, end_day)
+SELECT
+    id,
+    COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+    COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+FROM license_xref
+WHERE (start_date < '1970-01-01' OR end_date < '1970-01-01')
+  AND COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000)
+      <= COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000);
+
+UPDATE content_license_counts SET active_licenses = (
+    SELECT COUNT(*)
+    FROM license_xref l
+    JOIN license_window w ON w.id = l.id
+    JOIN license_counts_state s ON s.id = 1
+    WHERE l.content_id = content_license_counts.content_id
+      AND w.start_day <= s.active_day AND w.end_day >= s.active_day
+)
+WHERE content_id IN (
+    SELECT content_id FROM license_xref
+    WHERE start_date < '1970-01-01' OR end_date < '1970-01-01'
+);
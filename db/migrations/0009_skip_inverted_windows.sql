@@ -0,0 +1,38 @@
+-- ===========================
+-- INVERTED WINDOWS ARE EMPTY
+-- ===========================
+-- Dates were not validated before the service checks existed, so old
+-- rows can end before they start. rtree_i32 rejects start_day >
+-- end_day, which made such a row fail every insert or update of
+-- license_xref. A window like that contains no day, so the triggers
+-- now leave it out of license_window, as LicenseWindowIndex and the
+-- conflict audit do; the count triggers already never count it active.
+
+DROP TRIGGER IF EXISTS trg_license_window_insert;
+
+CREATE TRIGGER trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    SELECT NEW.id, start_day, end_day FROM (
+        SELECT
+            COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) AS start_day,
+            COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) AS end_day
+    )
+    WHERE start_day <= end_day;
+END;
+
+DROP TRIGGER IF EXISTS trg_license_window_update;
+
+CREATE TRIGGER trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    SELECT NEW.id, start_day, end_day FROM (
+        SELECT
+            COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) AS start_day,
+            COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) AS end_day
+    )
+    WHERE start_day <= end_day;
+END;
@@ -0,0 +1,67 @@
+-- ===========================
+-- LICENSE SHARD SCHEMA
+-- ===========================
+-- Every shard file holds the license_xref rows of some content ids,
+-- with the same columns, indexes and license_window R*Tree as the main
+-- database (migrations 0001-0003), so license_repo's queries run on a
+-- shard unchanged. content and distributor stay in the main database,
+-- which is why there are no foreign keys here. Ids are assigned by
+-- license_shard_ids in the main database, never by the shard.
+CREATE TABLE IF NOT EXISTS license_xref (
+    id             INTEGER PRIMARY KEY,
+    content_id     INTEGER NOT NULL,
+    distributor_id INTEGER NOT NULL,
+    start_date     TEXT,
+    end_date       TEXT,
+    terms          TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_content_id
+    ON license_xref (content_id);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_distributor_id
+    ON license_xref (distributor_id);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_pair_start
+    ON license_xref (content_id, distributor_id, start_date);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_dates
+    ON license_xref (start_date, end_date);
+
+CREATE INDEX IF NOT EXISTS idx_license_xref_end_date
+    ON license_xref (end_date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS license_window USING rtree_i32(
+    id,
+    start_day,
+    end_day
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000),
+        COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(strftime('%s', NEW.start_date) AS INTEGER) / 86400, -1000000),
+        COALESCE(CAST(strftime('%s', NEW.end_date) AS INTEGER) / 86400, 3000000)
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_license_window_delete
+AFTER DELETE ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+END;
@@ -0,0 +1,49 @@
+-- ===========================
+-- EPOCH DAYS BY CALENDAR DATE
+-- ===========================
+-- The same fix as migration 0008 of the main database: the window
+-- triggers use julianday(d, 'start of day'), which matches
+-- src/utils.py for values with a time of day before 1970 too.
+
+DROP TRIGGER IF EXISTS trg_license_window_insert;
+
+CREATE TRIGGER trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+        COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+    );
+END;
+
+DROP TRIGGER IF EXISTS trg_license_window_update;
+
+CREATE TRIGGER trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    VALUES (
+        NEW.id,
+        COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+        COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+    );
+END;
+
+DELETE FROM license_window
+WHERE id IN (
+    SELECT id FROM license_xref
+    WHERE start_date < '1970-01-01' OR end_date < '1970-01-01'
+);
+
+INSERT INTO license_window (id, start_day, end_day)
+SELECT
+    id,
+    COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000),
+    COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)
+FROM license_xref
+WHERE (start_date < '1970-01-01' OR end_date < '1970-01-01')
+  AND COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000)
+      <= COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000);
@@ -0,0 +1,35 @@
+-- ===========================
+-- INVERTED WINDOWS ARE EMPTY
+-- ===========================
+-- The same fix as migration 0009 of the main database: a window that
+-- ends before it starts is left out of license_window instead of
+-- failing the write.
+
+DROP TRIGGER IF EXISTS trg_license_window_insert;
+
+CREATE TRIGGER trg_license_window_insert
+AFTER INSERT ON license_xref
+BEGIN
+    INSERT INTO license_window (id, start_day, end_day)
+    SELECT NEW.id, start_day, end_day FROM (
+        SELECT
+            COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) AS start_day,
+            COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) AS end_day
+    )
+    WHERE start_day <= end_day;
+END;
+
+DROP TRIGGER IF EXISTS trg_license_window_update;
+
+CREATE TRIGGER trg_license_window_update
+AFTER UPDATE OF id, start_date, end_date ON license_xref
+BEGIN
+    DELETE FROM license_window WHERE id = OLD.id;
+    INSERT INTO license_window (id, start_day, end_day)
+    SELECT NEW.id, start_day, end_day FROM (
+        SELECT
+            COALESCE(CAST(julianday(NEW.start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000) AS start_day,
+            COALESCE(CAST(julianday(NEW.end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000) AS end_day
+    )
+    WHERE start_day <= end_day;
+END;
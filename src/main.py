@@ -1,3 +1,4 @@
+from src.persistence import db
 from src.persistence.db import init_db
 from src.services import content_service, distributor_service, license_service
 
@@ -18,6 +19,40 @@ def _prompt_int(prompt: str) -> int | None:
         return None
 
 
+def _page_through(fetch_page, heading: str, empty_message: str) -> None:
+    """
+    I wrote this helper so long listings are shown one page at a time.
+    fetch_page(token) must return a Page; the user can move forward and
+    back until they press Enter.
+    """
+    token = None
+    while True:
+        page = fetch_page(token)
+        if not page.items:
+            print(empty_message)
+            return
+
+        print(f"\n-- {heading} --")
+        for item in page:
+            print(item)
+
+        options = []
+        if page.prev_token:
+            options.append("P = previous")
+        if page.next_token:
+            options.append("N = next")
+        if not options:
+            return
+
+        choice = input(f"{', '.join(options)}, Enter = back: ").strip().lower()
+        if choice == "n" and page.next_token:
+            token = page.next_token
+        elif choice == "p" and page.prev_token:
+            token = page.prev_token
+        else:
+            return
+
+
 def content_menu() -> None:
     """
     I wrote this content submenu so the user can manage Content records:
@@ -25,6 +60,7 @@ def content_menu() -> None:
     - add new content
     - view one content by id
     - delete content by id
+    - search content by title, notes, genre or license terms
     """
     while True:
         print("\n==== Content Menu ====")
@@ -32,19 +68,18 @@ def content_menu() -> None:
         print("2. Add new content")
         print("3. View content by id")
         print("4. Delete content by id")
+        print("5. Search content")
         print("B. Back to main menu")
 
         choice = input("Choose an option: ").strip().lower()
 
         # ---- LIST ----
         if choice == "1":
-            contents = content_service.list_contents()
-            if not contents:
-                print("No content found.")
-            else:
-                print("\n-- All Content --")
-                for c in contents:
-                    print(c)
+            _page_through(
+                lambda token: content_service.list_contents_page(token),
+                "All Content",
+                "No content found.",
+            )
 
         # ---- ADD ----
         elif choice == "2":
@@ -105,6 +140,25 @@ def content_menu() -> None:
             else:
                 print(f"No content found with id {content_id}.")
 
+        # ---- SEARCH ----
+        elif choice == "5":
+            text = input("Search for: ").strip()
+            if not text:
+                continue
+
+            try:
+                results = content_service.search_content(text)
+            except ValueError as e:
+                print(f"Could not search: {e}")
+                continue
+
+            if not results:
+                print(f"No content matches {text!r}.")
+            else:
+                print(f"\n-- Best matches for {text!r} --")
+                for content in results:
+                    print(content)
+
         # ---- BACK ----
         elif choice == "b":
             break
@@ -113,6 +167,68 @@ def content_menu() -> None:
             print("Invalid choice. Please try again.")
 
 
+def query_stats_menu() -> None:
+    """
+    I wrote this admin submenu to see which SQL statements are hot or
+    slow while the app runs:
+    - show the top statements by total time
+    - show the slow-query log with query plans
+    - turn query stats on or off
+    - reset the numbers
+    """
+    while True:
+        state = "on" if db.query_stats_enabled() else "off"
+        print(f"\n==== Query Statistics (currently {state}) ====")
+        print("1. Show top statements")
+        print("2. Show slow queries")
+        print("3. Turn query stats on/off")
+        print("4. Reset statistics")
+        print("B. Back to main menu")
+
+        choice = input("Choose an option: ").strip().lower()
+
+        if choice == "1":
+            top = _prompt_int("How many statements (Enter = 10): ") or 10
+            statements = db.query_stats(top=top)
+            if not statements:
+                print("No statements recorded yet. Turn query stats on first.")
+                continue
+
+            print(f"\n{'calls':>8} {'rows':>9} {'total ms':>10} {'mean ms':>9} {'p95 ms':>8}  statement")
+            for stats in statements:
+                print(
+                    f"{stats['calls']:>8} {stats['rows']:>9} {stats['total_ms']:>10.1f} "
+                    f"{stats['mean_ms']:>9.3f} {stats['p95_ms']:>8.3f}  {stats['sql'][:80]}"
+                )
+
+        elif choice == "2":
+            entries = db.slow_queries()
+            if not entries:
+                print("No slow queries logged.")
+            for entry in entries:
+                print(f"\n{entry['ms']:.1f} ms, {entry['rows']} rows: {entry['sql']}")
+                for step in entry["plan"]:
+                    print(f"    {step}")
+
+        elif choice == "3":
+            if db.query_stats_enabled():
+                db.disable_query_stats()
+                print("Query stats turned off.")
+            else:
+                db.enable_query_stats()
+                print(f"Query stats turned on (slow queries: {db.SLOW_QUERY_MS:g} ms and up).")
+
+        elif choice == "4":
+            db.reset_query_stats()
+            print("Statistics cleared.")
+
+        elif choice == "b":
+            break
+
+        else:
+            print("Invalid choice. Please try again.")
+
+
 def main_menu() -> None:
     """
     I wrote this main menu so the user can choose whether
@@ -125,6 +241,7 @@ def main_menu() -> None:
         print("1. Manage content")
         print("2. Manage distributors")
         print("3. Manage licenses")
+        print("4. Query statistics (admin)")
         print("Q. Quit")
 
         choice = input("Choose an option: ").strip().lower()
@@ -142,6 +259,9 @@ def main_menu() -> None:
         elif choice == "3":
             print("License menu coming soon...")
 
+        elif choice == "4":
+            query_stats_menu()
+
         else:
             print("Invalid choice. Please try again.")
 
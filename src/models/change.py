@@ -0,0 +1,44 @@
+class Change:
+    """
+    I created this class for one entry of the change log: which row of
+    which table was inserted, updated or deleted, its new values (None
+    for deletes) and the sequence number consumers track.
+    """
+
+    __slots__ = ("seq", "table", "op", "row_id", "data", "changed_at")
+
+    def __init__(
+        self,
+        seq: int,
+        table: str,
+        op: str,
+        row_id: int,
+        data: dict | None = None,
+        changed_at: str | None = None,
+    ):
+        self.seq = seq
+        self.table = table
+        self.op = op
+        self.row_id = row_id
+        self.data = data
+        self.changed_at = changed_at
+
+    def __str__(self) -> str:
+        return f"#{self.seq} {self.op} {self.table} {self.row_id}"
+
+    def __repr__(self) -> str:
+        return (
+            f"Change(seq={self.seq!r}, table={self.table!r}, op={self.op!r}, "
+            f"row_id={self.row_id!r}, data={self.data!r}, changed_at={self.changed_at!r})"
+        )
+
+    def to_dict(self) -> dict:
+        """Convert this Change into a clean dictionary."""
+        return {
+            "seq": self.seq,
+            "table": self.table,
+            "op": self.op,
+            "row_id": self.row_id,
+            "data": self.data,
+            "changed_at": self.changed_at,
+        }
@@ -1,4 +1,8 @@
 class Content:
+    # __slots__ drops the per-instance __dict__, which matters when
+    # hundreds of thousands of Content objects are loaded at once.
+    __slots__ = ("id", "title", "genre", "content_type", "release_year", "notes")
+
     def __init__(
         self,
         id: int,
@@ -1,4 +1,7 @@
 class Distributor:
+    # __slots__ drops the per-instance __dict__ to keep large lists small.
+    __slots__ = ("id", "name", "contact_email", "region")
+
     def __init__(self, id: int, name: str, contact_email: str | None = None, region: str | None = None):
         self.id = id
         self.name = name
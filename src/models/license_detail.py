@@ -0,0 +1,66 @@
+from src.models.license_xref import LicenseXref
+
+
+class LicenseDetail(LicenseXref):
+    """
+    I created this class for screens that show licenses next to the
+    title and distributor they belong to. It is a LicenseXref with the
+    content and distributor columns it joins to copied onto it, so code
+    written for LicenseXref keeps working with it.
+
+    The extra fields are None when the referenced row no longer exists.
+    """
+
+    __slots__ = ("content_title", "content_type", "release_year", "distributor_name", "distributor_region")
+
+    def __init__(
+        self,
+        id: int,
+        content_id: int,
+        distributor_id: int,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        terms: str | None = None,
+        content_title: str | None = None,
+        content_type: str | None = None,
+        release_year: int | None = None,
+        distributor_name: str | None = None,
+        distributor_region: str | None = None,
+    ):
+        super().__init__(id, content_id, distributor_id, start_date, end_date, terms)
+        self.content_title = content_title
+        self.content_type = content_type
+        self.release_year = release_year
+        self.distributor_name = distributor_name
+        self.distributor_region = distributor_region
+
+    def __str__(self) -> str:
+        title = self.content_title or f"Content {self.content_id}"
+        if self.release_year:
+            title += f" ({self.release_year})"
+        distributor = self.distributor_name or f"Distributor {self.distributor_id}"
+        if self.distributor_region:
+            distributor += f" [{self.distributor_region}]"
+        window = f"{self.start_date or 'open'} to {self.end_date or 'open'}"
+        return f"License {self.id}: {title} -> {distributor}, {window}"
+
+    def __repr__(self) -> str:
+        return (
+            f"LicenseDetail(id={self.id!r}, content_id={self.content_id!r}, "
+            f"distributor_id={self.distributor_id!r}, start_date={self.start_date!r}, "
+            f"end_date={self.end_date!r}, terms={self.terms!r}, "
+            f"content_title={self.content_title!r}, content_type={self.content_type!r}, "
+            f"release_year={self.release_year!r}, distributor_name={self.distributor_name!r}, "
+            f"distributor_region={self.distributor_region!r})"
+        )
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update(
+            content_title=self.content_title,
+            content_type=self.content_type,
+            release_year=self.release_year,
+            distributor_name=self.distributor_name,
+            distributor_region=self.distributor_region,
+        )
+        return data
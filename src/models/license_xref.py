@@ -4,6 +4,11 @@ class LicenseXref:
     between one piece of content and one distributor.
     """
 
+    # I use __slots__ so each license is a fixed set of attribute slots
+    # instead of a __dict__. Reports load millions of these, so the
+    # per-object saving adds up (see benchmarks/bench_model_footprint.py).
+    __slots__ = ("id", "content_id", "distributor_id", "start_date", "end_date", "terms")
+
     def __init__(
         self,
         id: int,
@@ -0,0 +1,216 @@
+"""
+I created this module to keep recently read rows in memory so hot
+titles and distributors are not fetched from SQLite over and over.
+
+Each repository owns one ReadThroughCache in front of its get_*_by_id
+function. The cache is:
+- bounded: least recently used entries are evicted past max_size
+- optionally time limited: entries older than ttl seconds are reloaded
+- invalidated by key from the repos' update_* and delete_* functions
+- kept in step with other connections and processes: at most every
+  sync_interval seconds it asks PRAGMA data_version whether anything
+  committed, and if so drops only the rows of its own table that the
+  change log (migration 0006) recorded since the last look
+
+So a row another worker sharing db/media.db changed is served for at
+most sync_interval seconds, and a write to one table leaves the other
+caches alone.
+
+Settings come from MEDIA_CACHE_SIZE (0 turns caching off),
+MEDIA_CACHE_TTL (seconds, unset means no expiry) and
+MEDIA_CACHE_SYNC_INTERVAL (seconds between probes, 0 probes on every
+lookup).
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from src.persistence import change_log_repo, db
+
+
+CACHE_SIZE = int(os.environ.get("MEDIA_CACHE_SIZE", "10000"))
+CACHE_TTL = float(os.environ["MEDIA_CACHE_TTL"]) if os.environ.get("MEDIA_CACHE_TTL") else None
+CACHE_SYNC_INTERVAL = float(os.environ.get("MEDIA_CACHE_SYNC_INTERVAL", "0.1"))
+
+T = TypeVar("T")
+
+
+class ReadThroughCache(Generic[T]):
+    """
+    I wrote this class as a thread-safe LRU map from primary key to
+    model object, with hit/miss/eviction counters.
+
+    Callers always get their own copy of a cached object, so changing
+    a model returned by get_*_by_id() never changes what is cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = CACHE_SIZE,
+        ttl: float | None = CACHE_TTL,
+        sync_interval: float = CACHE_SYNC_INTERVAL,
+        table: str | None = None,
+    ):
+        self.name = name
+        self.table = table or name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self._entries: "OrderedDict[Hashable, tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced_at = float("-inf")
+        self._db_path = None
+        self._version: tuple[int, int] | None = None
+        self._seq: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Optional[T]]) -> Optional[T]:
+        """
+        I return the cached object for `key`, or call loader(key) and
+        remember the result. None results ("not found") are not cached,
+        so a later insert never has to invalidate anything.
+        """
+        if self.max_size <= 0:
+            return loader(key)
+
+        seq = self._sync()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.copy(value)
+                del self._entries[key]
+            self.misses += 1
+
+        value = loader(key)
+        if value is None:
+            return None
+
+        # A change committed after my sync is dropped at the next one. But
+        # if another thread synced while I was reading, that sync may
+        # already have dropped this key, so I do not cache what I read.
+        with self._lock:
+            if self._seq == seq:
+                self._entries[key] = (time.monotonic(), copy.copy(value))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """I drop one key; the repos call this after updating or deleting that row."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """I drop every entry (the counters are kept) and probe again on the next lookup."""
+        with self._lock:
+            self._entries.clear()
+            self._synced_at = float("-inf")
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, int | float | str]:
+        """I return the counters as a dictionary, for logging or the admin menu."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _sync(self) -> int | None:
+        # Between probes one clock read is all a lookup costs. My own
+        # repo's writes never wait for a probe: they invalidate by key.
+        if self._fresh():
+            return self._seq
+        with self._sync_lock:
+            if self._fresh():
+                return self._seq
+            version = db.data_version()
+            if version != self._version:
+                self._apply_changes(version)
+            self._synced_at = time.monotonic()
+            self._db_path = db.DB_PATH
+            return self._seq
+
+    def _fresh(self) -> bool:
+        # Pointing DB_PATH at another file (tests, restores) forces a probe.
+        return db.DB_PATH == self._db_path and time.monotonic() - self._synced_at < self.sync_interval
+
+    def _apply_changes(self, version: tuple[int, int]) -> None:
+        # data_version moves on any commit, so the change log tells me
+        # which of my rows actually changed since the last seq I saw.
+        purged_through, latest_seq = change_log_repo.get_log_bounds()
+        seq = self._seq
+        same_file = self._version is not None and self._version[0] == version[0]
+
+        changed: set[int] | None = None
+        if same_file and seq is not None and purged_through <= seq <= latest_seq:
+            if latest_seq - seq <= self.max_size:
+                changed = change_log_repo.changed_row_ids(self.table, seq, latest_seq)
+
+        with self._lock:
+            if changed is None:
+                # New file, purged history or a huge backlog: start over.
+                self._entries.clear()
+            else:
+                for row_id in changed:
+                    if self._entries.pop(row_id, None) is not None:
+                        self.invalidations += 1
+            self._version = version
+            self._seq = latest_seq
+
+
+_caches: Dict[str, ReadThroughCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str) -> ReadThroughCache:
+    """
+    I return the shared cache with this name, creating it the first
+    time. The name is also the table whose change-log entries keep it
+    in step. Two threads asking at once still get the same cache.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = ReadThroughCache(name)
+        return _caches[name]
+
+
+def _all_caches() -> list[ReadThroughCache]:
+    with _caches_lock:
+        return list(_caches.values())
+
+
+def cache_stats() -> Dict[str, Dict[str, int | float | str]]:
+    """I return the stats of every cache, keyed by name."""
+    return {c.name: c.stats() for c in _all_caches()}
+
+
+def clear_caches() -> None:
+    """I empty every cache, for example after restoring a backup."""
+    for c in _all_caches():
+        c.clear()
@@ -0,0 +1,156 @@
+"""
+I created this module to hold the database operations for the change
+log that the triggers in migration 0006 append to, and for the offsets
+named consumers have read up to.
+"""
+
+import json
+from typing import Iterable, List, Optional
+
+from src.models.change import Change
+from src.persistence.db import connection
+
+
+# The tables the triggers watch.
+CHANGE_TABLES = ("content", "distributor", "license_xref")
+
+
+def _row_to_change(row) -> Change:
+    data = json.loads(row["data"]) if row["data"] is not None else None
+    return Change(row["seq"], row["table_name"], row["op"], row["row_id"], data, row["changed_at"])
+
+
+def list_changes_after(after_seq: int, limit: int, tables: Iterable[str] | None = None) -> List[Change]:
+    """
+    I return up to `limit` changes with seq > after_seq, oldest first,
+    optionally only for some tables. The seq primary key makes this a
+    range read however long the log is.
+    """
+    select_sql = """
+        SELECT seq, table_name, op, row_id, data, changed_at
+        FROM change_log
+        WHERE seq > ?
+    """
+    params: list = [after_seq]
+    if tables is not None:
+        tables = list(tables)
+        select_sql += f" AND table_name IN ({', '.join('?' * len(tables))})"
+        params.extend(tables)
+    select_sql += " ORDER BY seq LIMIT ?"
+    params.append(limit)
+
+    with connection() as conn:
+        rows = conn.execute(select_sql, params).fetchall()
+    return [_row_to_change(row) for row in rows]
+
+
+def get_log_bounds() -> tuple[int, int]:
+    """
+    I return (purged_through, latest_seq): the highest seq retention
+    has removed and the highest seq ever handed out (0 for none).
+    """
+    # The newest change is never compacted away (it is the latest for
+    # its row) and retention records what it purged, so this is the
+    # same as sqlite_sequence without scanning it.
+    select_sql = """
+        SELECT purged_through, MAX(purged_through, COALESCE((SELECT MAX(seq) FROM change_log), 0))
+        FROM change_log_state WHERE id = 1
+    """
+
+    with connection() as conn:
+        return tuple(conn.execute(select_sql).fetchone())
+
+
+def changed_row_ids(table_name: str, after_seq: int, through_seq: int) -> set[int]:
+    """
+    I return the ids of the rows of one table that changed with
+    after_seq < seq <= through_seq, for the read caches. Like
+    list_changes_after() this only reads the new end of the log.
+    """
+    select_sql = """
+        SELECT DISTINCT row_id FROM change_log
+        WHERE seq > ? AND seq <= ? AND table_name = ?
+    """
+
+    with connection() as conn:
+        rows = conn.execute(select_sql, (after_seq, through_seq, table_name)).fetchall()
+    return {row["row_id"] for row in rows}
+
+
+def get_consumer_offset(name: str) -> Optional[int]:
+    """I return the last seq a consumer committed, or None if it never did."""
+    with connection() as conn:
+        row = conn.execute("SELECT last_seq FROM change_consumers WHERE name = ?", (name,)).fetchone()
+    return row["last_seq"] if row else None
+
+
+def set_consumer_offset(name: str, last_seq: int) -> None:
+    """I record that a consumer has handled every change up to last_seq."""
+    upsert_sql = """
+        INSERT INTO change_consumers (name, last_seq, updated_at)
+        VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        ON CONFLICT (name) DO UPDATE SET last_seq = excluded.last_seq, updated_at = excluded.updated_at
+    """
+
+    with connection() as conn:
+        conn.execute(upsert_sql, (name, last_seq))
+
+
+def list_consumer_offsets() -> dict[str, int]:
+    with connection() as conn:
+        rows = conn.execute("SELECT name, last_seq FROM change_consumers ORDER BY name").fetchall()
+    return {row["name"]: row["last_seq"] for row in rows}
+
+
+def delete_consumer(name: str) -> bool:
+    """I forget a consumer, so retention no longer waits for it."""
+    with connection() as conn:
+        cursor = conn.execute("DELETE FROM change_consumers WHERE name = ?", (name,))
+    return cursor.rowcount > 0
+
+
+def compact_changes() -> int:
+    """
+    I delete every change that has a later change for the same row and
+    return how many went. The latest change per row is always kept, so
+    a consumer still ends up with each row's final state.
+    """
+    delete_sql = """
+        DELETE FROM change_log
+        WHERE EXISTS (
+            SELECT 1 FROM change_log AS later
+            WHERE later.table_name = change_log.table_name
+              AND later.row_id = change_log.row_id
+              AND later.seq > change_log.seq
+        )
+    """
+
+    with connection() as conn:
+        cursor = conn.execute(delete_sql)
+    return cursor.rowcount
+
+
+def purge_changes(older_than: str, max_seq: int | None = None) -> int:
+    """
+    I delete the changes logged up to `older_than` (an ISO timestamp
+    in UTC), but never past max_seq, and return how many went.
+
+    I cut at one seq (everything up to the newest old-enough change) so
+    the log always stays a contiguous tail, and remember that seq in
+    change_log_state.purged_through.
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        (cutoff,) = conn.execute(
+            "SELECT MAX(seq) FROM change_log WHERE changed_at <= ?", (older_than,)
+        ).fetchone()
+        if cutoff is None:
+            return 0
+        if max_seq is not None:
+            cutoff = min(cutoff, max_seq)
+
+        cursor = conn.execute("DELETE FROM change_log WHERE seq <= ?", (cutoff,))
+        conn.execute(
+            "UPDATE change_log_state SET purged_through = MAX(purged_through, ?) WHERE id = 1", (cutoff,)
+        )
+    return cursor.rowcount
@@ -5,10 +5,26 @@ for the Content table.
 By keeping SQL here, I keep my service layer and UI code cleaner.
 """
 
-from typing import Optional, List
+import json
+from typing import Iterable, Iterator, Optional, List
 
 from src.models.content import Content
-from src.persistence.db import get_connection
+from src.persistence.cache import get_cache
+from src.persistence.db import (
+    FETCH_BATCH_SIZE,
+    bulk_insert,
+    connection,
+    model_row_factory,
+    query_models,
+)
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page, fetch_page
+
+
+# Columns the *_page listing may filter on (equality only).
+CONTENT_PAGE_FILTERS = ("genre", "content_type")
+
+# Read-through LRU cache in front of get_content_by_id().
+_cache = get_cache("content")
 
 
 def create_content(content: Content) -> Content:
@@ -17,7 +33,7 @@ def create_content(content: Content) -> Content:
     into the SQLite database.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs an INSERT statement
     - gets the new row id from SQLite
     - returns a fresh Content object with the id filled in
@@ -27,7 +43,7 @@ def create_content(content: Content) -> Content:
         VALUES (?, ?, ?, ?, ?)
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(
             insert_sql,
             (
@@ -50,15 +66,55 @@ def create_content(content: Content) -> Content:
         release_year=content.release_year,
         notes=content.notes,
     )
+
+
+def create_many_content(
+    contents: Iterable[Content],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so I can load a whole catalog of Content
+    objects without paying for one transaction per row.
+
+    It:
+    - streams the objects into a single executemany() INSERT
+    - commits once, or once every chunk_size rows if given
+    - returns the new ids in the same order as the input
+    """
+    insert_sql = """
+        INSERT INTO content (title, genre, content_type, release_year, notes)
+        VALUES (?, ?, ?, ?, ?)
+    """
+
+    rows = (
+        (c.title, c.genre, c.content_type, c.release_year, c.notes)
+        for c in contents
+    )
+    return bulk_insert("content", insert_sql, rows, chunk_size)
+
+
 def get_content_by_id(content_id: int) -> Optional[Content]:
     """
     I wrote this function so I can look up a single Content record
-    from the database using its primary key id.
+    by its primary key id.
+
+    Hot ids are served from the read-through cache; on a miss the row
+    is read with _select_content_by_id() and remembered. Returns None if
+    there is no such row.
+    """
+    return _cache.get_or_load(content_id, _select_content_by_id)
+
+
+def _select_content_by_id(content_id: int) -> Optional[Content]:
+    """
+    I read one Content row straight from SQLite, without going
+    through the cache. get_content_by_id() calls this on a miss.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs a SELECT statement with the id as a parameter
-    - if a row is found, converts it into a Content object
+    - if a row is found, builds the Content with _model_factory, the same
+      row factory the listings use
     - if nothing is found, returns None
     """
     select_sql = """
@@ -67,36 +123,67 @@ def get_content_by_id(content_id: int) -> Optional[Content]:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql, (content_id,))
-        row = cursor.fetchone()
+    with connection() as conn:
+        # None when there is no matching row, so the caller can handle
+        # "not found" cases in the service or UI layer.
+        return query_models(conn, _model_factory, select_sql, (content_id,)).fetchone()
 
-    if row is None:
-        # I return None if there is no matching row so the caller can
-        # handle "not found" cases in the service or UI layer.
-        return None
 
-    # I build and return a Content object from the row.
-    return Content(
-        id=row["id"],
-        title=row["title"],
-        genre=row["genre"],
-        content_type=row["content_type"],
-        release_year=row["release_year"],
-        notes=row["notes"],
-    )
+def content_exists(content_id: int) -> bool:
+    """
+    I wrote this function for callers that only need to know whether
+    a content id is real. It reads the primary key and nothing else,
+    and does not build a Content object.
+    """
+    select_sql = """
+        SELECT 1 FROM content WHERE id = ?
+    """
 
-def list_all_content() -> List[Content]:
+    with connection() as conn:
+        row = conn.execute(select_sql, (content_id,)).fetchone()
+
+    return row is not None
+
+
+def existing_content_ids(content_ids: Iterable[int]) -> set[int]:
     """
-    I wrote this function so I can pull every content record
-    from the database and convert each row into a Content object.
+    I wrote this function to check many content ids in one query. The ids
+    go in as a single JSON array parameter, which SQLite expands with
+    json_each(), so there is no limit on how many I can pass.
+
+    It returns the subset of the ids that exist.
+    """
+    select_sql = """
+        SELECT id FROM content
+        WHERE id IN (SELECT value FROM json_each(?))
+    """
+
+    ids = list(set(content_ids))
+    if not ids:
+        return set()
+    with connection() as conn:
+        rows = conn.execute(select_sql, (json.dumps(ids),)).fetchall()
+
+    return {row["id"] for row in rows}
+
+
+# Every SELECT in this module lists the columns in Content.__init__ order,
+# so a row (tuple or sqlite3.Row) can be unpacked straight into the model.
+_model_factory = model_row_factory(Content)
+
+
+def iter_all_content(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Content]:
+    """
+    I wrote this generator so I can walk every content record without
+    loading the whole table into memory.
 
     It:
-    - opens the database
-    - runs a SELECT query for all rows
-    - loops through the rows
-    - turns each into a Content object
-    - returns the list
+    - borrows a pooled connection and keeps it for the whole iteration
+    - pulls batch_size rows at a time with fetchmany()
+    - yields one Content object per row
+
+    The connection goes back to the pool when the loop finishes or the
+    generator is closed early.
     """
     select_sql = """
         SELECT id, title, genre, content_type, release_year, notes
@@ -104,24 +191,114 @@ def list_all_content() -> List[Content]:
         ORDER BY id
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql)
-        rows = cursor.fetchall()
-
-    contents: List[Content] = []
-    for row in rows:
-        contents.append(
-            Content(
-                id=row["id"],
-                title=row["title"],
-                genre=row["genre"],
-                content_type=row["content_type"],
-                release_year=row["release_year"],
-                notes=row["notes"],
-            )
+    with connection() as conn:
+        cursor = query_models(conn, _model_factory, select_sql)
+        while True:
+            models = cursor.fetchmany(batch_size)
+            if not models:
+                break
+            yield from models
+
+
+def list_all_content() -> List[Content]:
+    """
+    I wrote this function so I can pull every content record
+    from the database and convert each row into a Content object.
+
+    It builds the list straight from iter_all_content(), so the rows
+    are never held in memory twice.
+    """
+    return list(iter_all_content())
+
+
+def list_content_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+) -> Page[Content]:
+    """
+    I wrote this function so a screen can show one page of content
+    records at a time instead of loading the whole table.
+
+    token is the next_token / prev_token of a previous Page (None for
+    the first page) and filters may match any of CONTENT_PAGE_FILTERS.
+    """
+    return fetch_page(
+        "content",
+        "id, title, genre, content_type, release_year, notes",
+        _model_factory,
+        token=token,
+        limit=limit,
+        filters=filters,
+        allowed_filters=CONTENT_PAGE_FILTERS,
+    )
+
+
+# bm25() weights for content_fts columns (title, notes, genre): a hit in
+# the title counts far more than one in the notes.
+SEARCH_WEIGHTS = (10.0, 1.0, 2.0)
+
+# A match in a license's terms is ranked like a weak title hit, so titles
+# whose own text matches come first.
+TERMS_RANK_FACTOR = 0.5
+
+
+def search_content(match: str, limit: int, include_terms: bool = True) -> List[Content]:
+    """
+    I wrote this function to run a full-text search over the catalog.
+
+    `match` is an FTS5 query string (content_service.search_content()
+    builds it from what the user typed). A title is a hit when its
+    title, notes or genre match, or when the terms of one of its
+    licenses match. Results come back best first by bm25 score.
+
+    Each side keeps only its own best `limit` hits before they are
+    merged, so the final sort never sees the whole match set. With
+    include_terms=False only the title side is searched.
+    """
+    title_w, notes_w, genre_w = SEARCH_WEIGHTS
+    terms_union = " UNION ALL SELECT * FROM terms_hits" if include_terms else ""
+    select_sql = f"""
+        WITH text_hits AS (
+            SELECT rowid AS content_id, bm25(content_fts, {title_w}, {notes_w}, {genre_w}) AS score
+            FROM content_fts
+            WHERE content_fts MATCH :match
+            ORDER BY score
+            LIMIT :limit
+        ),
+        -- bm25() cannot run inside an aggregate, so the license scores are
+        -- materialized before they are grouped per title.
+        license_scores AS MATERIALIZED (
+            SELECT rowid AS license_id, bm25(license_terms_fts) AS score
+            FROM license_terms_fts
+            WHERE license_terms_fts MATCH :match
+        ),
+        terms_hits AS (
+            SELECT l.content_id, MIN(t.score) * {TERMS_RANK_FACTOR} AS score
+            FROM license_scores AS t
+            JOIN license_xref AS l ON l.id = t.license_id
+            GROUP BY l.content_id
+            ORDER BY score
+            LIMIT :limit
+        ),
+        ranked AS (
+            SELECT content_id, MIN(score) AS score
+            FROM (SELECT * FROM text_hits{terms_union})
+            GROUP BY content_id
         )
+        SELECT c.id, c.title, c.genre, c.content_type, c.release_year, c.notes
+        FROM ranked
+        JOIN content AS c ON c.id = ranked.content_id
+        ORDER BY ranked.score, c.id
+        LIMIT :limit
+    """
+
+    with connection() as conn:
+        return query_models(
+            conn, _model_factory, select_sql, {"match": match, "limit": limit}
+        ).fetchall()
+
 
-    return contents
 def update_content(content: Content) -> bool:
     """
     I wrote this function so I can update an existing Content
@@ -142,7 +319,7 @@ def update_content(content: Content) -> bool:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(
             update_sql,
             (
@@ -156,6 +333,8 @@ def update_content(content: Content) -> bool:
         )
         conn.commit()
 
+    _cache.invalidate(content.id)
+
     # rowcount tells me how many rows were affected by the UPDATE
     return cursor.rowcount > 0
 def delete_content(content_id: int) -> bool:
@@ -173,9 +352,11 @@ def delete_content(content_id: int) -> bool:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(delete_sql, (content_id,))
         conn.commit()
 
+    _cache.invalidate(content_id)
+
     # If rowcount is 0, nothing was deleted (bad or missing id)
     return cursor.rowcount > 0
@@ -3,10 +3,26 @@ I created this module to hold all of the database operations
 for the Distributor table.
 """
 
-from typing import Optional, List
+import json
+from typing import Iterable, Iterator, Optional, List
 
 from src.models.distributor import Distributor
-from src.persistence.db import get_connection
+from src.persistence.cache import get_cache
+from src.persistence.db import (
+    FETCH_BATCH_SIZE,
+    bulk_insert,
+    connection,
+    model_row_factory,
+    query_models,
+)
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page, fetch_page
+
+
+# Columns the *_page listing may filter on (equality only).
+DISTRIBUTOR_PAGE_FILTERS = ("region",)
+
+# Read-through LRU cache in front of get_distributor_by_id().
+_cache = get_cache("distributor")
 
 
 def create_distributor(distributor: Distributor) -> Distributor:
@@ -15,7 +31,7 @@ def create_distributor(distributor: Distributor) -> Distributor:
     into the SQLite database.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs an INSERT statement
     - gets the new row id from SQLite
     - returns a fresh Distributor object with the id filled in
@@ -25,7 +41,7 @@ def create_distributor(distributor: Distributor) -> Distributor:
         VALUES (?, ?, ?)
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(
             insert_sql,
             (
@@ -43,15 +59,49 @@ def create_distributor(distributor: Distributor) -> Distributor:
         contact_email=distributor.contact_email,
         region=distributor.region,
     )
+
+
+def create_many_distributors(
+    distributors: Iterable[Distributor],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so I can insert many Distributor objects
+    in one transaction (or one per chunk_size rows).
+
+    It returns the new ids in the same order as the input.
+    """
+    insert_sql = """
+        INSERT INTO distributor (name, contact_email, region)
+        VALUES (?, ?, ?)
+    """
+
+    rows = ((d.name, d.contact_email, d.region) for d in distributors)
+    return bulk_insert("distributor", insert_sql, rows, chunk_size)
+
+
 def get_distributor_by_id(distributor_id: int) -> Optional[Distributor]:
     """
-    I wrote this function so I can look up a single Distributor
-    record in the database using its primary key id.
+    I wrote this function so I can look up a single Distributor record
+    by its primary key id.
+
+    Hot ids are served from the read-through cache; on a miss the row
+    is read with _select_distributor_by_id() and remembered. Returns None if
+    there is no such row.
+    """
+    return _cache.get_or_load(distributor_id, _select_distributor_by_id)
+
+
+def _select_distributor_by_id(distributor_id: int) -> Optional[Distributor]:
+    """
+    I read one Distributor row straight from SQLite, without going
+    through the cache. get_distributor_by_id() calls this on a miss.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs a SELECT with the id as a parameter
-    - if a row is found, converts it into a Distributor object
+    - if a row is found, builds the Distributor with _model_factory, the same
+      row factory the listings use
     - if nothing is found, returns None
     """
     select_sql = """
@@ -60,32 +110,67 @@ def get_distributor_by_id(distributor_id: int) -> Optional[Distributor]:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql, (distributor_id,))
-        row = cursor.fetchone()
+    with connection() as conn:
+        # None when there is no matching row, so the caller can handle
+        # "not found" cases in the service or UI layer.
+        return query_models(conn, _model_factory, select_sql, (distributor_id,)).fetchone()
 
-    if row is None:
-        # I return None if there is no matching row so the caller can
-        # handle "not found" cases in the service or UI layer.
-        return None
 
-    return Distributor(
-        id=row["id"],
-        name=row["name"],
-        contact_email=row["contact_email"],
-        region=row["region"],
-    )
-def list_all_distributors() -> List[Distributor]:
+def distributor_exists(distributor_id: int) -> bool:
     """
-    I wrote this function so I can pull every distributor record
-    from the database and convert each row into a Distributor object.
+    I wrote this function for callers that only need to know whether
+    a distributor id is real. It reads the primary key and nothing else,
+    and does not build a Distributor object.
+    """
+    select_sql = """
+        SELECT 1 FROM distributor WHERE id = ?
+    """
+
+    with connection() as conn:
+        row = conn.execute(select_sql, (distributor_id,)).fetchone()
+
+    return row is not None
+
+
+def existing_distributor_ids(distributor_ids: Iterable[int]) -> set[int]:
+    """
+    I wrote this function to check many distributor ids in one query. The ids
+    go in as a single JSON array parameter, which SQLite expands with
+    json_each(), so there is no limit on how many I can pass.
+
+    It returns the subset of the ids that exist.
+    """
+    select_sql = """
+        SELECT id FROM distributor
+        WHERE id IN (SELECT value FROM json_each(?))
+    """
+
+    ids = list(set(distributor_ids))
+    if not ids:
+        return set()
+    with connection() as conn:
+        rows = conn.execute(select_sql, (json.dumps(ids),)).fetchall()
+
+    return {row["id"] for row in rows}
+
+
+# Every SELECT in this module lists the columns in Distributor.__init__ order,
+# so a row (tuple or sqlite3.Row) can be unpacked straight into the model.
+_model_factory = model_row_factory(Distributor)
+
+
+def iter_all_distributors(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Distributor]:
+    """
+    I wrote this generator so I can walk every distributor record without
+    loading the whole table into memory.
 
     It:
-    - opens the database
-    - runs a SELECT query for all rows
-    - loops through the rows
-    - turns each into a Distributor object
-    - returns the list
+    - borrows a pooled connection and keeps it for the whole iteration
+    - pulls batch_size rows at a time with fetchmany()
+    - yields one Distributor object per row
+
+    The connection goes back to the pool when the loop finishes or the
+    generator is closed early.
     """
     select_sql = """
         SELECT id, name, contact_email, region
@@ -93,22 +178,47 @@ def list_all_distributors() -> List[Distributor]:
         ORDER BY id
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql)
-        rows = cursor.fetchall()
+    with connection() as conn:
+        cursor = query_models(conn, _model_factory, select_sql)
+        while True:
+            models = cursor.fetchmany(batch_size)
+            if not models:
+                break
+            yield from models
 
-    distributors: List[Distributor] = []
-    for row in rows:
-        distributors.append(
-            Distributor(
-                id=row["id"],
-                name=row["name"],
-                contact_email=row["contact_email"],
-                region=row["region"],
-            )
-        )
 
-    return distributors
+def list_all_distributors() -> List[Distributor]:
+    """
+    I wrote this function so I can pull every distributor record
+    from the database and convert each row into a Distributor object.
+
+    It builds the list straight from iter_all_distributors(), so the rows
+    are never held in memory twice.
+    """
+    return list(iter_all_distributors())
+
+
+def list_distributors_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+) -> Page[Distributor]:
+    """
+    I wrote this function so a screen can show one page of distributor
+    records at a time instead of loading the whole table.
+
+    token is the next_token / prev_token of a previous Page (None for
+    the first page) and filters may match any of DISTRIBUTOR_PAGE_FILTERS.
+    """
+    return fetch_page(
+        "distributor",
+        "id, name, contact_email, region",
+        _model_factory,
+        token=token,
+        limit=limit,
+        filters=filters,
+        allowed_filters=DISTRIBUTOR_PAGE_FILTERS,
+    )
 def update_distributor(distributor: Distributor) -> bool:
     """
     I wrote this function so I can update an existing Distributor
@@ -127,7 +237,7 @@ def update_distributor(distributor: Distributor) -> bool:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(
             update_sql,
             (
@@ -139,6 +249,8 @@ def update_distributor(distributor: Distributor) -> bool:
         )
         conn.commit()
 
+    _cache.invalidate(distributor.id)
+
     # rowcount tells me how many rows were affected by the UPDATE
     return cursor.rowcount > 0
 def delete_distributor(distributor_id: int) -> bool:
@@ -156,9 +268,11 @@ def delete_distributor(distributor_id: int) -> bool:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(delete_sql, (distributor_id,))
         conn.commit()
 
+    _cache.invalidate(distributor_id)
+
     # If rowcount is 0, nothing was deleted (bad or missing id)
     return cursor.rowcount > 0
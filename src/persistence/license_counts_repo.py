@@ -0,0 +1,190 @@
+"""
+I created this module for the license count summary tables that the
+triggers in migration 0005 keep up to date (licenses per distributor,
+distributors per title, active licenses per title).
+
+Reading a count is one primary-key lookup. The only thing triggers
+cannot do is notice that a day has passed, so advance_active_day()
+moves the "active on" day forward as a maintenance step, and
+rebuild/diff recompute every summary from license_xref to repair or
+check them. Reads never write: an active count for any other day is
+counted on the spot through the license_window R*Tree.
+"""
+
+from typing import List
+
+from src.persistence.db import connection
+
+
+# The same day arithmetic as license_window and the triggers: whole days
+# since 1970-01-01, with open sides mapped to the utils.py sentinels.
+_START_DAY = "COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), -1000000)"
+_END_DAY = "COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), 3000000)"
+
+# What each summary table should hold, computed from scratch, keyed the
+# same way as the table. :day is the day active licenses are counted on.
+_EXPECTED = {
+    "distributor_license_counts": (
+        ("distributor_id",),
+        "SELECT distributor_id, COUNT(*) AS licenses FROM license_xref GROUP BY distributor_id",
+    ),
+    "content_distributor_counts": (
+        ("content_id", "distributor_id"),
+        """
+        SELECT content_id, distributor_id, COUNT(*) AS licenses
+        FROM license_xref
+        GROUP BY content_id, distributor_id
+        """,
+    ),
+    "content_license_counts": (
+        ("content_id",),
+        f"""
+        SELECT
+            content_id,
+            COUNT(*) AS licenses,
+            COUNT(DISTINCT distributor_id) AS distributors,
+            SUM({_START_DAY} <= :day AND {_END_DAY} >= :day) AS active_licenses
+        FROM license_xref
+        GROUP BY content_id
+        """,
+    ),
+}
+
+
+def get_distributor_license_count(distributor_id: int) -> int:
+    """I return how many licenses a distributor holds (0 if none)."""
+    select_sql = "SELECT licenses FROM distributor_license_counts WHERE distributor_id = ?"
+
+    with connection() as conn:
+        row = conn.execute(select_sql, (distributor_id,)).fetchone()
+    return row["licenses"] if row else 0
+
+
+def get_content_license_counts(content_id: int, day: int) -> tuple[int, int, int]:
+    """
+    I return (licenses, distinct distributors, licenses active on epoch
+    day `day`) for one title; titles without licenses give zeros.
+
+    When `day` is the maintained active day this is a single lookup.
+    For any other day I count the title's active licenses through the
+    license_window R*Tree instead, in the same read transaction, and
+    leave the summary alone, so this works on read-only connections and
+    never waits for the write lock.
+    """
+    select_sql = """
+        SELECT
+            COALESCE(c.licenses, 0),
+            COALESCE(c.distributors, 0),
+            COALESCE(c.active_licenses, 0),
+            s.active_day
+        FROM license_counts_state s
+        LEFT JOIN content_license_counts c ON c.content_id = ?
+        WHERE s.id = 1
+    """
+    active_sql = """
+        SELECT COUNT(*)
+        FROM license_xref l
+        JOIN license_window w ON w.id = l.id
+        WHERE l.content_id = :content_id AND w.start_day <= :day AND w.end_day >= :day
+    """
+
+    with connection() as conn:
+        conn.execute("BEGIN")
+        licenses, distributors, active, active_day = conn.execute(select_sql, (content_id,)).fetchone()
+        if active_day != day and licenses:
+            (active,) = conn.execute(active_sql, {"content_id": content_id, "day": day}).fetchone()
+    return licenses, distributors, active
+
+
+def get_active_day() -> int:
+    """I return the epoch day the maintained active counts refer to."""
+    with connection() as conn:
+        return conn.execute("SELECT active_day FROM license_counts_state WHERE id = 1").fetchone()[0]
+
+
+def advance_active_day(day: int) -> int:
+    """
+    I move the active counts to epoch day `day` (forward or back) and
+    return how many titles I recounted. This is maintenance (the
+    "advance" command, run once a day); reads do not call it.
+
+    Only titles with a license starting or ending between the old and
+    the new day can change, and the license_window R*Tree finds those
+    without a scan. Everything runs under the write lock, so two
+    callers racing to advance the same day recount once.
+    """
+    recount_sql = """
+        UPDATE content_license_counts SET active_licenses = (
+            SELECT COUNT(*)
+            FROM license_xref l
+            JOIN license_window w ON w.id = l.id
+            WHERE l.content_id = content_license_counts.content_id
+              AND w.start_day <= :day AND w.end_day >= :day
+        )
+        WHERE content_id IN (
+            SELECT l.content_id FROM license_window w JOIN license_xref l ON l.id = w.id
+            WHERE w.start_day > :low AND w.start_day <= :high
+            UNION
+            SELECT l.content_id FROM license_window w JOIN license_xref l ON l.id = w.id
+            WHERE w.end_day >= :low AND w.end_day < :high
+        )
+    """
+
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        (old_day,) = conn.execute("SELECT active_day FROM license_counts_state WHERE id = 1").fetchone()
+        if old_day == day:
+            return 0
+        cursor = conn.execute(recount_sql, {"day": day, "low": min(old_day, day), "high": max(old_day, day)})
+        conn.execute("UPDATE license_counts_state SET active_day = ? WHERE id = 1", (day,))
+        return cursor.rowcount
+
+
+def rebuild_license_counts(day: int | None = None) -> None:
+    """
+    I recompute every summary table from license_xref in one
+    transaction, counting active licenses on epoch day `day` (the
+    current active day if None).
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if day is not None:
+            conn.execute("UPDATE license_counts_state SET active_day = ? WHERE id = 1", (day,))
+        (day,) = conn.execute("SELECT active_day FROM license_counts_state WHERE id = 1").fetchone()
+
+        for table, (_, expected_sql) in _EXPECTED.items():
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"INSERT INTO {table} {expected_sql}", {"day": day})
+
+
+def diff_license_counts() -> List[dict]:
+    """
+    I recompute every summary from license_xref and compare it with
+    the maintained tables, both read in one transaction. I return one
+    dictionary per key that differs, with the maintained and expected
+    rows (None where a row is missing); an empty list means all good.
+    """
+    differences: List[dict] = []
+
+    with connection() as conn:
+        conn.execute("BEGIN")
+        (day,) = conn.execute("SELECT active_day FROM license_counts_state WHERE id = 1").fetchone()
+
+        for table, (key_columns, expected_sql) in _EXPECTED.items():
+            diff_sql = f"""
+                WITH expected AS MATERIALIZED ({expected_sql})
+                SELECT 'maintained', * FROM (SELECT * FROM {table} EXCEPT SELECT * FROM expected)
+                UNION ALL
+                SELECT 'expected', * FROM (SELECT * FROM expected EXCEPT SELECT * FROM {table})
+            """
+            by_key: dict[tuple, dict] = {}
+            for side, *values in conn.execute(diff_sql, {"day": day}):
+                key = tuple(values[: len(key_columns)])
+                entry = by_key.setdefault(
+                    key,
+                    {"table": table, "key": dict(zip(key_columns, key)), "maintained": None, "expected": None},
+                )
+                entry[side] = tuple(values[len(key_columns):])
+            differences.extend(by_key.values())
+
+    return differences
@@ -4,10 +4,65 @@ for the LicenseXref table. Each row represents one license
 between a content item and a distributor.
 """
 
-from typing import Optional, List
+import json
+from typing import Dict, Iterable, Iterator, Optional, List
 
+from src.models.license_detail import LicenseDetail
 from src.models.license_xref import LicenseXref
-from src.persistence.db import get_connection
+from src.persistence.cache import get_cache
+from src.persistence.db import (
+    FETCH_BATCH_SIZE,
+    bulk_insert,
+    connection,
+    insert_rows,
+    model_row_factory,
+    query_models,
+)
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page, fetch_page, where_clause
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, to_epoch_day
+
+
+# Columns the *_page listing may filter on (equality only).
+LICENSE_PAGE_FILTERS = ("content_id", "distributor_id")
+
+# Columns the joined license listing may filter on. Each name exists in
+# only one of the three joined tables, so none of them need a prefix.
+LICENSE_DETAIL_FILTERS = ("content_id", "distributor_id", "content_type", "region")
+
+# Read-through LRU cache in front of get_license_by_id().
+_cache = get_cache("license_xref")
+
+_INSERT_SQL = """
+    INSERT INTO license_xref (
+        content_id,
+        distributor_id,
+        start_date,
+        end_date,
+        terms
+    )
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_UPDATE_SQL = """
+    UPDATE license_xref
+    SET content_id = ?,
+        distributor_id = ?,
+        start_date = ?,
+        end_date = ?,
+        terms = ?
+    WHERE id = ?
+"""
+
+
+def _update_params(license_xref: LicenseXref) -> tuple:
+    return (
+        license_xref.content_id,
+        license_xref.distributor_id,
+        license_xref.start_date,
+        license_xref.end_date,
+        license_xref.terms,
+        license_xref.id,
+    )
 
 
 def create_license(license_xref: LicenseXref) -> LicenseXref:
@@ -16,25 +71,14 @@ def create_license(license_xref: LicenseXref) -> LicenseXref:
     into the SQLite database.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs an INSERT statement
     - gets the new row id from SQLite
     - returns a fresh LicenseXref object with the id filled in
     """
-    insert_sql = """
-        INSERT INTO license_xref (
-            content_id,
-            distributor_id,
-            start_date,
-            end_date,
-            terms
-        )
-        VALUES (?, ?, ?, ?, ?)
-    """
-
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(
-            insert_sql,
+            _INSERT_SQL,
             (
                 license_xref.content_id,
                 license_xref.distributor_id,
@@ -54,15 +98,48 @@ def create_license(license_xref: LicenseXref) -> LicenseXref:
         end_date=license_xref.end_date,
         terms=license_xref.terms,
     )
+
+
+def create_many_licenses(
+    licenses: Iterable[LicenseXref],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so I can insert many LicenseXref objects
+    in one transaction (or one per chunk_size rows), for example when
+    a whole rights deal is loaded at once.
+
+    It returns the new ids in the same order as the input.
+    """
+    rows = (
+        (lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms)
+        for lic in licenses
+    )
+    return bulk_insert("license_xref", _INSERT_SQL, rows, chunk_size)
+
+
 def get_license_by_id(license_id: int) -> Optional[LicenseXref]:
     """
-    I wrote this function so I can look up a single LicenseXref
-    record in the database using its primary key id.
+    I wrote this function so I can look up a single LicenseXref record
+    by its primary key id.
+
+    Hot ids are served from the read-through cache; on a miss the row
+    is read with _select_license_by_id() and remembered. Returns None if
+    there is no such row.
+    """
+    return _cache.get_or_load(license_id, _select_license_by_id)
+
+
+def _select_license_by_id(license_id: int) -> Optional[LicenseXref]:
+    """
+    I read one LicenseXref row straight from SQLite, without going
+    through the cache. get_license_by_id() calls this on a miss.
 
     It:
-    - opens a database connection
+    - borrows a pooled database connection
     - runs a SELECT with the id as a parameter
-    - if a row is found, converts it into a LicenseXref object
+    - if a row is found, builds the LicenseXref with _model_factory, the same
+      row factory the listings use
     - if nothing is found, returns None
     """
     select_sql = """
@@ -71,93 +148,498 @@ def get_license_by_id(license_id: int) -> Optional[LicenseXref]:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql, (license_id,))
-        row = cursor.fetchone()
+    with connection() as conn:
+        # None when there is no matching row, so the caller can handle
+        # "not found" cases in the service or UI layer.
+        return query_models(conn, _model_factory, select_sql, (license_id,)).fetchone()
+
+
+def references_exist(content_id: int, distributor_id: int) -> tuple[bool, bool]:
+    """
+    I wrote this function so add_license() can confirm both sides of a
+    license in one round trip. It returns (content exists, distributor
+    exists) using two primary-key probes and builds no model objects.
+    """
+    select_sql = """
+        SELECT
+            EXISTS (SELECT 1 FROM content WHERE id = ?) AS has_content,
+            EXISTS (SELECT 1 FROM distributor WHERE id = ?) AS has_distributor
+    """
+
+    with connection() as conn:
+        row = conn.execute(select_sql, (content_id, distributor_id)).fetchone()
+
+    return bool(row["has_content"]), bool(row["has_distributor"])
+
+
+# Every SELECT in this module lists the columns in LicenseXref.__init__ order,
+# so a row (tuple or sqlite3.Row) can be unpacked straight into the model.
+_model_factory = model_row_factory(LicenseXref)
+
+
+def iter_all_licenses(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[LicenseXref]:
+    """
+    I wrote this generator so I can walk every license record without
+    loading the whole table into memory.
+
+    It:
+    - borrows a pooled connection and keeps it for the whole iteration
+    - pulls batch_size rows at a time with fetchmany()
+    - yields one LicenseXref object per row
+
+    The connection goes back to the pool when the loop finishes or the
+    generator is closed early.
+    """
+    select_sql = """
+        SELECT id, content_id, distributor_id, start_date, end_date, terms
+        FROM license_xref
+        ORDER BY id
+    """
+
+    with connection() as conn:
+        cursor = query_models(conn, _model_factory, select_sql)
+        while True:
+            models = cursor.fetchmany(batch_size)
+            if not models:
+                break
+            yield from models
 
-    if row is None:
-        # I return None if there is no matching row so the caller can
-        # handle "not found" cases in the service or UI layer.
-        return None
 
-    return LicenseXref(
-        id=row["id"],
-        content_id=row["content_id"],
-        distributor_id=row["distributor_id"],
-        start_date=row["start_date"],
-        end_date=row["end_date"],
-        terms=row["terms"],
-    )
 def list_all_licenses() -> List[LicenseXref]:
     """
     I wrote this function so I can pull every license record
     from the database and convert each row into a LicenseXref object.
 
-    It:
-    - opens the database
-    - runs a SELECT query for all rows
-    - loops through the rows
-    - turns each into a LicenseXref object
-    - returns the list
+    It builds the list straight from iter_all_licenses(), so the rows
+    are never held in memory twice.
+    """
+    return list(iter_all_licenses())
+
+
+def list_licenses_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+) -> Page[LicenseXref]:
+    """
+    I wrote this function so a screen can show one page of license
+    records at a time instead of loading the whole table.
+
+    token is the next_token / prev_token of a previous Page (None for
+    the first page) and filters may match any of LICENSE_PAGE_FILTERS.
+    """
+    return fetch_page(
+        "license_xref",
+        "id, content_id, distributor_id, start_date, end_date, terms",
+        _model_factory,
+        token=token,
+        limit=limit,
+        filters=filters,
+        allowed_filters=LICENSE_PAGE_FILTERS,
+    )
+
+
+# One query brings back each license with the content and distributor
+# columns a listing screen shows, instead of two extra lookups per row.
+# LEFT JOIN keeps licenses whose content or distributor has been deleted.
+_DETAIL_FROM = """
+    license_xref AS l
+    LEFT JOIN content AS c ON c.id = l.content_id
+    LEFT JOIN distributor AS d ON d.id = l.distributor_id
+"""
+_DETAIL_COLUMNS = """
+    l.id, l.content_id, l.distributor_id, l.start_date, l.end_date, l.terms,
+    c.title, c.content_type, c.release_year, d.name, d.region
+"""
+_detail_factory = model_row_factory(LicenseDetail)
+
+
+def iter_license_details(
+    filters: dict | None = None,
+    batch_size: int = FETCH_BATCH_SIZE,
+) -> Iterator[LicenseDetail]:
+    """
+    I wrote this generator so reports can walk licenses together with
+    their content title/type/year and distributor name/region.
+
+    It runs one JOIN query and streams LicenseDetail objects batch_size
+    rows at a time, in license id order. filters may match any of
+    LICENSE_DETAIL_FILTERS.
+    """
+    filter_sql, filter_params = where_clause(filters, LICENSE_DETAIL_FILTERS)
+    select_sql = f"""
+        SELECT {_DETAIL_COLUMNS}
+        FROM {_DETAIL_FROM}
+        WHERE 1 = 1{filter_sql}
+        ORDER BY l.id
+    """
+
+    with connection() as conn:
+        cursor = query_models(conn, _detail_factory, select_sql, tuple(filter_params))
+        while True:
+            models = cursor.fetchmany(batch_size)
+            if not models:
+                break
+            yield from models
+
+
+def list_license_details_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+) -> Page[LicenseDetail]:
+    """
+    I wrote this function to page through the joined license listing
+    the same way list_licenses_page() pages through license_xref.
+    filters may match any of LICENSE_DETAIL_FILTERS.
+    """
+    return fetch_page(
+        _DETAIL_FROM,
+        _DETAIL_COLUMNS,
+        _detail_factory,
+        token=token,
+        limit=limit,
+        filters=filters,
+        allowed_filters=LICENSE_DETAIL_FILTERS,
+        key="l.id",
+    )
+
+
+def list_licenses_in_window(window_start: str | None, window_end: str | None) -> List[LicenseXref]:
+    """
+    I wrote this function to find every license whose active window
+    overlaps [window_start, window_end] (inclusive, "YYYY-MM-DD").
+
+    It goes through the license_window R*Tree, so SQLite only visits
+    the tree nodes that overlap the range instead of every license that
+    started earlier. Passing the same date twice means "active on that
+    day"; None leaves that side of the range open.
+    """
+    select_sql = """
+        SELECT l.id, l.content_id, l.distributor_id, l.start_date, l.end_date, l.terms
+        FROM license_window AS w
+        JOIN license_xref AS l ON l.id = w.id
+        WHERE w.start_day <= ? AND w.end_day >= ?
+        ORDER BY l.id
+    """
+
+    params = (
+        to_epoch_day(window_end, OPEN_END_DAY),
+        to_epoch_day(window_start, OPEN_START_DAY),
+    )
+    with connection() as conn:
+        return query_models(conn, _model_factory, select_sql, params).fetchall()
+
+
+def list_licenses_ending_between(from_date: str, to_date: str) -> List[LicenseXref]:
+    """
+    I wrote this function to find licenses whose end_date falls in
+    [from_date, to_date], soonest first. ISO dates sort as text, so this
+    is a range scan on idx_license_xref_end_date.
     """
     select_sql = """
         SELECT id, content_id, distributor_id, start_date, end_date, terms
         FROM license_xref
+        WHERE end_date >= ? AND end_date <= ?
+        ORDER BY end_date, id
+    """
+
+    with connection() as conn:
+        return query_models(conn, _model_factory, select_sql, (from_date, to_date)).fetchall()
+
+
+def iter_license_columns(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[tuple]:
+    """
+    I wrote this generator for the columnar LicenseFrame snapshot. It
+    yields plain (id, content_id, distributor_id, start_day, end_day)
+    tuples in id order, with the dates already turned into epoch days by
+    SQLite (open ends become OPEN_START_DAY / OPEN_END_DAY). Terms are
+    left out; they can be fetched later with get_terms().
+    """
+    select_sql = """
+        SELECT
+            id,
+            content_id,
+            distributor_id,
+            COALESCE(CAST(julianday(start_date, 'start of day') - 2440587.5 AS INTEGER), ?),
+            COALESCE(CAST(julianday(end_date, 'start of day') - 2440587.5 AS INTEGER), ?)
+        FROM license_xref
         ORDER BY id
     """
 
-    with get_connection() as conn:
-        cursor = conn.execute(select_sql)
-        rows = cursor.fetchall()
-
-    licenses: List[LicenseXref] = []
-    for row in rows:
-        licenses.append(
-            LicenseXref(
-                id=row["id"],
-                content_id=row["content_id"],
-                distributor_id=row["distributor_id"],
-                start_date=row["start_date"],
-                end_date=row["end_date"],
-                terms=row["terms"],
-            )
-        )
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples, no per-row objects
+        cursor.execute(select_sql, (OPEN_START_DAY, OPEN_END_DAY))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
 
-    return licenses
-def update_license(license_xref: LicenseXref) -> bool:
+
+def get_terms(license_ids: Iterable[int]) -> Dict[int, Optional[str]]:
+    """
+    I wrote this function to load the terms text for many licenses in
+    one query. It returns {license_id: terms} for the ids that exist.
+    """
+    select_sql = """
+        SELECT id, terms FROM license_xref
+        WHERE id IN (SELECT value FROM json_each(?))
     """
-    I wrote this function so I can update an existing LicenseXref
-    record in the database.
 
-    It:
-    - runs an UPDATE statement using license_xref.id as the key
-    - returns True if a row was actually updated
-    - returns False if no rows were changed (for example, bad id)
+    ids = list(set(license_ids))
+    if not ids:
+        return {}
+    with connection() as conn:
+        rows = conn.execute(select_sql, (json.dumps(ids),)).fetchall()
+
+    return {row["id"]: row["terms"] for row in rows}
+
+
+def iter_licenses_by_window(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[LicenseXref]:
     """
-    update_sql = """
-        UPDATE license_xref
-        SET content_id = ?,
-            distributor_id = ?,
-            start_date = ?,
-            end_date = ?,
-            terms = ?
-        WHERE id = ?
+    I wrote this generator for the conflict audit. It streams every
+    license ordered by content, distributor and start date, which is
+    exactly the order of idx_license_xref_pair_start, so SQLite walks
+    the index instead of sorting the table.
+    """
+    select_sql = """
+        SELECT id, content_id, distributor_id, start_date, end_date, terms
+        FROM license_xref
+        ORDER BY content_id, distributor_id, start_date, id
+    """
+
+    with connection() as conn:
+        cursor = query_models(conn, _model_factory, select_sql)
+        while True:
+            models = cursor.fetchmany(batch_size)
+            if not models:
+                break
+            yield from models
+
+
+# The overlap checks compare the epoch days the license_window triggers
+# stored, not the date text, so they read legacy values exactly like
+# the triggers, utils.to_epoch_day() and the conflict audit do (an
+# unreadable date is open-ended, an inverted window is empty). CROSS
+# JOIN keeps license_xref, found through its content_id index, as the
+# outer table; each row then looks up its own window by id.
+_OVERLAP_SQL = """
+    SELECT l.id, l.content_id, l.distributor_id, l.start_date, l.end_date, l.terms
+    FROM license_xref AS l
+    CROSS JOIN license_window AS w
+    WHERE l.content_id = ?
+      AND (? IS NULL OR l.distributor_id = ?)
+      AND (? IS NULL OR l.id != ?)
+      AND w.id = l.id
+      AND w.start_day <= ? AND w.end_day >= ?
+    ORDER BY l.start_date, l.id
+"""
+
+
+def _select_overlapping(
+    conn,
+    content_id: int,
+    distributor_id: int | None,
+    start_date: str | None,
+    end_date: str | None,
+    exclude_id: int | None = None,
+) -> List[LicenseXref]:
+    params = (
+        content_id,
+        distributor_id, distributor_id,
+        exclude_id, exclude_id,
+        to_epoch_day(end_date, OPEN_END_DAY),
+        to_epoch_day(start_date, OPEN_START_DAY),
+    )
+    return query_models(conn, _model_factory, _OVERLAP_SQL, params).fetchall()
+
+
+def list_overlapping_licenses(
+    content_id: int,
+    distributor_id: int | None,
+    start_date: str | None,
+    end_date: str | None,
+    exclude_id: int | None = None,
+) -> List[LicenseXref]:
+    """
+    I wrote this function for the insert/update conflict check. It
+    returns the licenses for one content item (and distributor, if
+    given) whose window overlaps [start_date, end_date]. NULL dates are
+    treated as open-ended on both sides of the comparison.
+
+    Only that title's rows are visited, through the content_id index,
+    and their windows are compared as epoch days from license_window.
+    """
+    with connection() as conn:
+        return _select_overlapping(conn, content_id, distributor_id, start_date, end_date, exclude_id)
+
+
+def find_overlaps_for_batch(licenses: List[LicenseXref]) -> Dict[int, List[int]]:
+    """
+    I wrote this function so a bulk load can run the overlap check for
+    a whole batch in one query instead of one query per license.
+
+    The batch goes in as a JSON array and is joined against license_xref
+    with the same rules as list_overlapping_licenses(). It returns
+    {position in `licenses`: [overlapping license ids]} for the licenses
+    that overlap something; the others are left out.
+    """
+    if not licenses:
+        return {}
+    with connection() as conn:
+        return _select_batch_overlaps(conn, licenses)
+
+
+def _select_batch_overlaps(conn, licenses: List[LicenseXref]) -> Dict[int, List[int]]:
+    select_sql = """
+        WITH batch AS (
+            SELECT
+                json_extract(value, '$[0]') AS position,
+                json_extract(value, '$[1]') AS content_id,
+                json_extract(value, '$[2]') AS distributor_id,
+                json_extract(value, '$[3]') AS start_day,
+                json_extract(value, '$[4]') AS end_day
+            FROM json_each(?)
+        )
+        SELECT batch.position, l.id
+        FROM batch
+        CROSS JOIN license_xref AS l
+        CROSS JOIN license_window AS w
+        WHERE l.content_id = batch.content_id
+          AND l.distributor_id = batch.distributor_id
+          AND w.id = l.id
+          AND w.start_day <= batch.end_day AND w.end_day >= batch.start_day
+        ORDER BY batch.position, l.start_date, l.id
+    """
+
+    batch = json.dumps([
+        [
+            position,
+            lic.content_id,
+            lic.distributor_id,
+            to_epoch_day(lic.start_date, OPEN_START_DAY),
+            to_epoch_day(lic.end_date, OPEN_END_DAY),
+        ]
+        for position, lic in enumerate(licenses)
+    ])
+    overlaps: Dict[int, List[int]] = {}
+    for position, license_id in conn.execute(select_sql, (batch,)):
+        overlaps.setdefault(position, []).append(license_id)
+    return overlaps
+
+
+def _conflicts_for(conn, license_xref: LicenseXref) -> List[LicenseXref]:
+    return _select_overlapping(
+        conn,
+        license_xref.content_id,
+        license_xref.distributor_id,
+        license_xref.start_date,
+        license_xref.end_date,
+        license_xref.id or None,
+    )
+
+
+def create_license_if_no_overlap(
+    license_xref: LicenseXref,
+) -> tuple[Optional[LicenseXref], List[LicenseXref]]:
     """
+    I wrote this function so add_license() can check for overlaps and
+    insert in one BEGIN IMMEDIATE transaction. Holding the write lock
+    from the check to the insert means two writers cannot both pass the
+    check and then insert overlapping windows.
 
-    with get_connection() as conn:
+    It returns (saved license, []) or (None, the overlapping licenses).
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conflicts = _conflicts_for(conn, license_xref)
+        if conflicts:
+            return None, conflicts
         cursor = conn.execute(
-            update_sql,
+            _INSERT_SQL,
             (
                 license_xref.content_id,
                 license_xref.distributor_id,
                 license_xref.start_date,
                 license_xref.end_date,
                 license_xref.terms,
-                license_xref.id,
             ),
         )
+        new_id = cursor.lastrowid
+
+    return LicenseXref(
+        id=new_id,
+        content_id=license_xref.content_id,
+        distributor_id=license_xref.distributor_id,
+        start_date=license_xref.start_date,
+        end_date=license_xref.end_date,
+        terms=license_xref.terms,
+    ), []
+
+
+def create_many_licenses_if_no_overlap(
+    licenses: List[LicenseXref],
+) -> tuple[List[int], Dict[int, List[int]]]:
+    """
+    I do for a batch what create_license_if_no_overlap() does for one
+    license: the set-based check of find_overlaps_for_batch() and the
+    insert share one BEGIN IMMEDIATE transaction, so no other writer can
+    slip an overlapping window in between.
+
+    The licenses must not overlap each other; the caller checks that.
+    It returns (new ids in input order, {}) or, if anything overlaps,
+    ([], {position: [overlapping license ids]}) without inserting.
+    """
+    if not licenses:
+        return [], {}
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        overlaps = _select_batch_overlaps(conn, licenses)
+        if overlaps:
+            return [], overlaps
+        rows = (
+            (lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms)
+            for lic in licenses
+        )
+        return insert_rows(conn, "license_xref", _INSERT_SQL, rows), {}
+
+
+def update_license_if_no_overlap(license_xref: LicenseXref) -> tuple[bool, List[LicenseXref]]:
+    """
+    I do for update_license() what create_license_if_no_overlap() does
+    for inserts: the overlap check (skipping the license itself) and the
+    UPDATE share one write transaction. It returns (updated, []) or
+    (False, the overlapping licenses).
+    """
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conflicts = _conflicts_for(conn, license_xref)
+        if conflicts:
+            return False, conflicts
+        cursor = conn.execute(_UPDATE_SQL, _update_params(license_xref))
+
+    _cache.invalidate(license_xref.id)
+    return cursor.rowcount > 0, []
+
+
+def update_license(license_xref: LicenseXref) -> bool:
+    """
+    I wrote this function so I can update an existing LicenseXref
+    record in the database.
+
+    It:
+    - runs an UPDATE statement using license_xref.id as the key
+    - returns True if a row was actually updated
+    - returns False if no rows were changed (for example, bad id)
+    """
+    with connection() as conn:
+        cursor = conn.execute(_UPDATE_SQL, _update_params(license_xref))
         conn.commit()
 
+    _cache.invalidate(license_xref.id)
+
     # rowcount tells me how many rows were affected by the UPDATE
     return cursor.rowcount > 0
 def delete_license(license_id: int) -> bool:
@@ -175,9 +657,11 @@ def delete_license(license_id: int) -> bool:
         WHERE id = ?
     """
 
-    with get_connection() as conn:
+    with connection() as conn:
         cursor = conn.execute(delete_sql, (license_id,))
         conn.commit()
 
+    _cache.invalidate(license_id)
+
     # If rowcount is 0, nothing was deleted (bad or missing id)
     return cursor.rowcount > 0
@@ -0,0 +1,104 @@
+"""
+I created this module to apply schema changes as numbered migration
+scripts instead of re-running one big schema.sql on every start.
+
+Migration files live in db/migrations and are named NNNN_description.sql.
+The database remembers the last one it applied in PRAGMA user_version,
+so migrate() only runs the scripts that are newer than that.
+"""
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import List, NamedTuple
+
+from src.persistence import db
+
+
+_FILENAME = re.compile(r"^(\d{4})_[\w-]+\.sql$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Path
+
+
+def discover_migrations(directory: Path | None = None) -> List[Migration]:
+    """
+    I list every migration script in version order and make sure the
+    numbers are unique and start at 1 without gaps.
+    """
+    directory = Path(directory or db.MIGRATIONS_DIR)
+    migrations = []
+    for path in directory.glob("*.sql"):
+        match = _FILENAME.match(path.name)
+        if match is None:
+            raise ValueError(f"Migration file {path.name} is not named NNNN_description.sql.")
+        migrations.append(Migration(int(match.group(1)), path.stem, path))
+
+    migrations.sort()
+    expected = list(range(1, len(migrations) + 1))
+    if [m.version for m in migrations] != expected:
+        raise ValueError(f"Migrations in {directory} must be numbered 1..N without gaps or repeats.")
+    return migrations
+
+
+def _split_statements(script: str) -> List[str]:
+    # I split on complete statements (sqlite3 knows that a trigger body
+    # with semicolons is still one statement) so I can run them one at a
+    # time inside my own transaction. executescript() would commit first.
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip() and not all(
+        part.strip().startswith("--") or not part.strip() for part in buffer.splitlines()
+    ):
+        raise ValueError("Migration script ends with an incomplete statement.")
+    return statements
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    """I return the number of the last migration applied to this database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(target: int | None = None, directory: Path | None = None) -> List[int]:
+    """
+    I bring the database up to `target` (or the newest migration).
+
+    Each migration runs in its own BEGIN IMMEDIATE transaction together
+    with the user_version bump, so a failing script leaves the database
+    at the previous version. Taking the write lock first also means two
+    processes starting at once cannot apply the same migration twice.
+
+    It returns the versions that were applied.
+    """
+    migrations = discover_migrations(directory)
+    if target is None:
+        target = len(migrations)
+
+    applied: List[int] = []
+    with db.connection() as conn:
+        for migration in migrations[:target]:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if current_version(conn) >= migration.version:
+                    conn.rollback()
+                    continue
+                script = migration.path.read_text(encoding="utf-8")
+                for statement in _split_statements(script):
+                    conn.execute(statement)
+                # PRAGMA values cannot be bound, but version is an int I parsed.
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            applied.append(migration.version)
+
+    return applied
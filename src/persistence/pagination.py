@@ -0,0 +1,158 @@
+"""
+I created this module to hold the keyset (cursor) pagination logic that
+all three repositories share.
+
+Instead of OFFSET, each page is fetched with
+
+    WHERE id > ? ORDER BY id LIMIT ?        (next page)
+    WHERE id < ? ORDER BY id DESC LIMIT ?   (previous page)
+
+so every page costs the same no matter how deep into the table it is.
+The position is handed to callers as an opaque continuation token.
+"""
+
+import base64
+import binascii
+import json
+from typing import Callable, Generic, List, TypeVar
+
+from src.persistence.db import connection, query_models
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+
+T = TypeVar("T")
+
+
+class Page(Generic[T]):
+    """
+    I use this class as the return value of every *_page function.
+
+    - items: the models on this page, in id order
+    - next_token: pass it back to get the following page (None on the last page)
+    - prev_token: pass it back to get the previous page (None on the first page)
+    """
+
+    def __init__(self, items: List[T], next_token: str | None, prev_token: str | None):
+        self.items = items
+        self.next_token = next_token
+        self.prev_token = prev_token
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __repr__(self) -> str:
+        return (
+            f"Page(items={len(self.items)}, next_token={self.next_token!r}, "
+            f"prev_token={self.prev_token!r})"
+        )
+
+
+def encode_token(direction: str, boundary_id: int) -> str:
+    """I turn a direction and boundary id into an opaque, URL-safe token."""
+    raw = json.dumps({"d": direction, "id": boundary_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> tuple[str, int]:
+    """
+    I reverse encode_token(). Anything that does not decode to a valid
+    direction and integer id raises ValueError so the UI can report it.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction, boundary_id = data["d"], data["id"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid page token.") from None
+
+    if direction not in ("next", "prev") or not isinstance(boundary_id, int):
+        raise ValueError("Invalid page token.")
+    return direction, boundary_id
+
+
+def where_clause(filters: dict | None, allowed: tuple[str, ...]) -> tuple[str, list]:
+    """
+    I turn {column: value} into " AND column = ?" clauses plus their
+    parameters. None values are skipped. Column names cannot be bound as
+    parameters, so I only accept the ones the calling repo lists as
+    filterable.
+    """
+    clauses, params = [], []
+    for column, value in (filters or {}).items():
+        if column not in allowed:
+            raise ValueError(f"Cannot filter on {column!r}.")
+        if value is None:
+            continue
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def fetch_page(
+    table: str,
+    columns: str,
+    row_factory: Callable,
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+    allowed_filters: tuple[str, ...] = (),
+    key: str = "id",
+) -> Page:
+    """
+    I wrote this function so every repo can offer keyset pagination
+    without repeating the SQL.
+
+    It:
+    - decodes the token (no token means the first page)
+    - fetches limit + 1 rows past the boundary to learn if more exist
+    - checks with a single indexed EXISTS whether rows exist on the other side
+    - returns a Page with tokens for both directions
+
+    Rows are built into models by row_factory, the repo's
+    model_row_factory(), so `columns` must be in the model's __init__
+    order and every model needs an id. table may also be a JOIN; key
+    then names the (qualified) id column that orders the pages.
+    """
+    if limit <= 0 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    direction, boundary = ("next", 0) if token is None else decode_token(token)
+    filter_sql, filter_params = where_clause(filters, allowed_filters)
+
+    if direction == "next":
+        page_sql = f"SELECT {columns} FROM {table} WHERE {key} > ?{filter_sql} ORDER BY {key} LIMIT ?"
+    else:
+        page_sql = f"SELECT {columns} FROM {table} WHERE {key} < ?{filter_sql} ORDER BY {key} DESC LIMIT ?"
+
+    with connection() as conn:
+        items = query_models(conn, row_factory, page_sql, (boundary, *filter_params, limit + 1)).fetchall()
+        has_more = len(items) > limit
+        items = items[:limit]
+        if direction == "prev":
+            items.reverse()
+
+        if not items:
+            return Page([], None, None)
+
+        # "Is there anything on the side I did not just fetch?"
+        if direction == "next":
+            other_sql = f"SELECT 1 FROM {table} WHERE {key} < ?{filter_sql} LIMIT 1"
+            other_id = items[0].id
+        else:
+            other_sql = f"SELECT 1 FROM {table} WHERE {key} > ?{filter_sql} LIMIT 1"
+            other_id = items[-1].id
+        has_other = conn.execute(other_sql, [other_id, *filter_params]).fetchone() is not None
+
+    first_id, last_id = items[0].id, items[-1].id
+    has_next, has_prev = (has_more, has_other) if direction == "next" else (has_other, has_more)
+
+    return Page(
+        items,
+        next_token=encode_token("next", last_id) if has_next else None,
+        prev_token=encode_token("prev", first_id) if has_prev else None,
+    )
@@ -0,0 +1,580 @@
+"""
+I created this module as the sharded twin of license_repo. When
+sharding is on, sharding.license_store() hands the services this
+module instead, with the same function names.
+
+Two kinds of call:
+- routed: anything that knows its content_id (create, the conflict
+  check, the checked create/update) or its id (get, update, delete, through the license_shard_ids
+  directory in the main database) goes to the one shard that holds it
+- scatter-gather: listings run the same query on every shard at once
+  on a thread pool and merge the per-shard results, which are already
+  sorted, with heapq.merge (by id unless the query orders otherwise)
+
+The per-shard SQL is license_repo's own, run inside db.use_database().
+
+Not available while sharded: the joined license details, the terms
+search and the license count summaries, which need license_xref in the
+same file as content and distributor (see sharding.require_unsharded()).
+"""
+
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import attrgetter, itemgetter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from src.models.license_xref import LicenseXref
+from src.persistence import license_repo, sharding
+from src.persistence.db import FETCH_BATCH_SIZE, bulk_insert, connection, query_models, use_database
+from src.persistence.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    decode_token,
+    encode_token,
+    where_clause,
+)
+
+
+# Threads that run the per-shard queries of one scatter-gather call.
+SCATTER_WORKERS = int(os.environ.get("MEDIA_SHARD_WORKERS", "8"))
+# create_many_licenses() allocates ids and writes the shards this many
+# licenses at a time.
+WRITE_CHUNK_SIZE = 10_000
+
+_LICENSE_COLUMNS = "id, content_id, distributor_id, start_date, end_date, terms"
+_INSERT_SQL = f"INSERT INTO license_xref ({_LICENSE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(SCATTER_WORKERS, thread_name_prefix="license-shard")
+        return _executor
+
+
+def _on_shard(path: Path, func: Callable, *args):
+    with use_database(path):
+        return func(*args)
+
+
+def _scatter(func: Callable, *args) -> List:
+    """I run func(*args) on every shard in parallel and return the results in shard order."""
+    paths = sharding.shard_paths()
+    if len(paths) == 1:
+        return [_on_shard(paths[0], func, *args)]
+    futures = [_get_executor().submit(_on_shard, path, func, *args) for path in paths]
+    return [future.result() for future in futures]
+
+
+def _iter_on_shard(path: Path, iterator_func: Callable, *args) -> Iterator:
+    # A repo generator borrows its connection at the first next() and
+    # keeps it, so the shard only has to be selected for that first step.
+    iterator = iterator_func(*args)
+    with use_database(path):
+        first = next(iterator, None)
+    if first is None:
+        return
+    yield first
+    yield from iterator
+
+
+def _merge(results: Iterable[List[LicenseXref]], key=attrgetter("id")) -> List[LicenseXref]:
+    return list(heapq.merge(*results, key=key))
+
+
+def _row(license_id: int, license_xref: LicenseXref) -> tuple:
+    return (
+        license_id,
+        license_xref.content_id,
+        license_xref.distributor_id,
+        license_xref.start_date,
+        license_xref.end_date,
+        license_xref.terms,
+    )
+
+
+def _insert_rows(rows: List[tuple]) -> None:
+    with connection() as conn:
+        conn.executemany(_INSERT_SQL, rows)
+
+
+def _delete_rows(license_ids: List[int]) -> None:
+    with connection() as conn:
+        conn.executemany("DELETE FROM license_xref WHERE id = ?", [(i,) for i in license_ids])
+
+
+def _content_id_of(license_id: int) -> Optional[int]:
+    with connection() as conn:
+        row = conn.execute("SELECT content_id FROM license_shard_ids WHERE id = ?", (license_id,)).fetchone()
+    return row["content_id"] if row else None
+
+
+def _forget_ids(license_ids: List[int]) -> None:
+    with connection() as conn:
+        conn.executemany("DELETE FROM license_shard_ids WHERE id = ?", [(i,) for i in license_ids])
+
+
+def create_license(license_xref: LicenseXref) -> LicenseXref:
+    """
+    I insert one license on its title's shard. The id comes from
+    license_shard_ids first, so it is unique across all shards; if the
+    shard insert fails, the id is handed back.
+    """
+    with connection() as conn:
+        cursor = conn.execute("INSERT INTO license_shard_ids (content_id) VALUES (?)", (license_xref.content_id,))
+        new_id = cursor.lastrowid
+
+    try:
+        _on_shard(sharding.shard_path_for(license_xref.content_id), _insert_rows, [_row(new_id, license_xref)])
+    except BaseException:
+        _forget_ids([new_id])
+        raise
+
+    return LicenseXref(
+        id=new_id,
+        content_id=license_xref.content_id,
+        distributor_id=license_xref.distributor_id,
+        start_date=license_xref.start_date,
+        end_date=license_xref.end_date,
+        terms=license_xref.terms,
+    )
+
+
+def create_many_licenses(
+    licenses: Iterable[LicenseXref],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I insert many licenses and return their ids in input order.
+
+    Per chunk (chunk_size, or WRITE_CHUNK_SIZE if None) I allocate the
+    ids in one transaction, then write each shard's part of the chunk
+    in parallel, one transaction per shard. A chunk cannot be atomic
+    across files, so if any shard fails I delete the chunk's rows from
+    every shard and hand its ids back before re-raising; chunks that
+    were already written stay written.
+    """
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    iterator = iter(licenses)
+    new_ids: List[int] = []
+    while True:
+        chunk = list(islice(iterator, chunk_size or WRITE_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        ids = bulk_insert(
+            "license_shard_ids",
+            "INSERT INTO license_shard_ids (content_id) VALUES (?)",
+            ((lic.content_id,) for lic in chunk),
+        )
+        by_shard: dict[Path, List[tuple]] = {}
+        for license_id, lic in zip(ids, chunk):
+            by_shard.setdefault(sharding.shard_path_for(lic.content_id), []).append(_row(license_id, lic))
+
+        futures = [_get_executor().submit(_on_shard, path, _insert_rows, rows) for path, rows in by_shard.items()]
+        errors = [future.exception() for future in futures]
+        failed = next((error for error in errors if error is not None), None)
+        if failed is not None:
+            for path, rows in by_shard.items():
+                _on_shard(path, _delete_rows, [row[0] for row in rows])
+            _forget_ids(ids)
+            raise failed
+
+        new_ids.extend(ids)
+    return new_ids
+
+
+def _insert_if_no_overlap(license_id: int, license_xref: LicenseXref) -> List[LicenseXref]:
+    # Check and insert in one write transaction on the title's shard.
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conflicts = license_repo._conflicts_for(conn, license_xref)
+        if not conflicts:
+            conn.execute(_INSERT_SQL, _row(license_id, license_xref))
+    return conflicts
+
+
+def create_license_if_no_overlap(
+    license_xref: LicenseXref,
+) -> tuple[Optional[LicenseXref], List[LicenseXref]]:
+    """
+    I do what license_repo.create_license_if_no_overlap() does on the
+    title's shard: the overlap check and the insert share that shard's
+    write lock. The id is taken from license_shard_ids first and handed
+    back if the license is not inserted.
+    """
+    with connection() as conn:
+        cursor = conn.execute("INSERT INTO license_shard_ids (content_id) VALUES (?)", (license_xref.content_id,))
+        new_id = cursor.lastrowid
+
+    try:
+        conflicts = _on_shard(
+            sharding.shard_path_for(license_xref.content_id), _insert_if_no_overlap, new_id, license_xref
+        )
+    except BaseException:
+        _forget_ids([new_id])
+        raise
+    if conflicts:
+        _forget_ids([new_id])
+        return None, conflicts
+
+    return LicenseXref(
+        id=new_id,
+        content_id=license_xref.content_id,
+        distributor_id=license_xref.distributor_id,
+        start_date=license_xref.start_date,
+        end_date=license_xref.end_date,
+        terms=license_xref.terms,
+    ), []
+
+
+def _insert_many_if_no_overlap(rows: List[tuple], licenses: List[LicenseXref]) -> dict[int, List[int]]:
+    # Check and insert one shard's part of a batch in one write transaction.
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        overlaps = license_repo._select_batch_overlaps(conn, licenses)
+        if not overlaps:
+            conn.executemany(_INSERT_SQL, rows)
+    return overlaps
+
+
+def create_many_licenses_if_no_overlap(
+    licenses: List[LicenseXref],
+) -> tuple[List[int], dict[int, List[int]]]:
+    """
+    I do what license_repo.create_many_licenses_if_no_overlap() does,
+    with one write transaction per shard: the ids come from
+    license_shard_ids, then every shard checks and inserts its part of
+    the batch in parallel. If any part overlaps or fails, the parts that
+    were written are deleted again and the ids handed back, so the batch
+    goes in whole or not at all.
+    """
+    if not licenses:
+        return [], {}
+    ids = bulk_insert(
+        "license_shard_ids",
+        "INSERT INTO license_shard_ids (content_id) VALUES (?)",
+        ((lic.content_id,) for lic in licenses),
+    )
+    positions: dict[Path, List[int]] = {}
+    for position, lic in enumerate(licenses):
+        positions.setdefault(sharding.shard_path_for(lic.content_id), []).append(position)
+
+    futures = {
+        path: _get_executor().submit(
+            _on_shard,
+            path,
+            _insert_many_if_no_overlap,
+            [_row(ids[p], licenses[p]) for p in members],
+            [licenses[p] for p in members],
+        )
+        for path, members in positions.items()
+    }
+    overlaps: dict[int, List[int]] = {}
+    written: List[Path] = []
+    failed: BaseException | None = None
+    for path, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            failed = failed or error
+            continue
+        shard_overlaps = future.result()
+        for shard_position, conflict_ids in shard_overlaps.items():
+            overlaps[positions[path][shard_position]] = conflict_ids
+        if not shard_overlaps:
+            written.append(path)
+
+    if failed is not None or overlaps:
+        for path in written:
+            _on_shard(path, _delete_rows, [ids[p] for p in positions[path]])
+        _forget_ids(ids)
+        if failed is not None:
+            raise failed
+        return [], overlaps
+    return ids, {}
+
+
+def get_license_by_id(license_id: int) -> Optional[LicenseXref]:
+    """I find the license's shard through license_shard_ids and read it there."""
+    content_id = _content_id_of(license_id)
+    if content_id is None:
+        return None
+    # Straight to SQLite: the read cache only sees commits to the main database.
+    return _on_shard(sharding.shard_path_for(content_id), license_repo._select_license_by_id, license_id)
+
+
+def _repoint(license_xref: LicenseXref, old_content_id: int) -> None:
+    if old_content_id != license_xref.content_id:
+        with connection() as conn:
+            conn.execute(
+                "UPDATE license_shard_ids SET content_id = ? WHERE id = ?",
+                (license_xref.content_id, license_xref.id),
+            )
+
+
+def _move_license(license_xref: LicenseXref, old_content_id: int, new_path: Path, check_overlap: bool) -> List[LicenseXref]:
+    # The row is written to the new shard, the directory is pointed at
+    # the new title, and the old copy is deleted.
+    if check_overlap:
+        conflicts = _on_shard(new_path, _insert_if_no_overlap, license_xref.id, license_xref)
+        if conflicts:
+            return conflicts
+    else:
+        _on_shard(new_path, _insert_rows, [_row(license_xref.id, license_xref)])
+
+    _repoint(license_xref, old_content_id)
+    _on_shard(sharding.shard_path_for(old_content_id), _delete_rows, [license_xref.id])
+    return []
+
+
+def update_license(license_xref: LicenseXref) -> bool:
+    """
+    I update a license on its shard. If the new content_id belongs on
+    another shard, the row moves: it is written to the new shard, the
+    directory is pointed at the new title, and the old copy is deleted.
+    """
+    old_content_id = _content_id_of(license_xref.id)
+    if old_content_id is None:
+        return False
+
+    old_path = sharding.shard_path_for(old_content_id)
+    new_path = sharding.shard_path_for(license_xref.content_id)
+    if old_path != new_path:
+        _move_license(license_xref, old_content_id, new_path, check_overlap=False)
+        return True
+
+    updated = _on_shard(old_path, license_repo.update_license, license_xref)
+    if updated:
+        _repoint(license_xref, old_content_id)
+    return updated
+
+
+def update_license_if_no_overlap(license_xref: LicenseXref) -> tuple[bool, List[LicenseXref]]:
+    """
+    I update a license only if its new window overlaps nothing, with
+    the check and the write under the destination shard's write lock.
+    It returns (updated, []) or (False, the overlapping licenses).
+    """
+    old_content_id = _content_id_of(license_xref.id)
+    if old_content_id is None:
+        return False, []
+
+    old_path = sharding.shard_path_for(old_content_id)
+    new_path = sharding.shard_path_for(license_xref.content_id)
+    if old_path != new_path:
+        conflicts = _move_license(license_xref, old_content_id, new_path, check_overlap=True)
+        return not conflicts, conflicts
+
+    updated, conflicts = _on_shard(old_path, license_repo.update_license_if_no_overlap, license_xref)
+    if updated:
+        _repoint(license_xref, old_content_id)
+    return updated, conflicts
+
+
+def delete_license(license_id: int) -> bool:
+    """I delete a license from its shard and drop its directory entry."""
+    content_id = _content_id_of(license_id)
+    if content_id is None:
+        return False
+
+    deleted = _on_shard(sharding.shard_path_for(content_id), license_repo.delete_license, license_id)
+    _forget_ids([license_id])
+    return deleted
+
+
+def list_overlapping_licenses(
+    content_id: int,
+    distributor_id: int | None,
+    start_date: str | None,
+    end_date: str | None,
+    exclude_id: int | None = None,
+) -> List[LicenseXref]:
+    """I run the conflict check on the one shard that holds the title."""
+    return _on_shard(
+        sharding.shard_path_for(content_id),
+        license_repo.list_overlapping_licenses,
+        content_id, distributor_id, start_date, end_date, exclude_id,
+    )
+
+
+def find_overlaps_for_batch(licenses: List[LicenseXref]) -> dict[int, List[int]]:
+    """
+    I split the batch by shard, run license_repo's set-based check on
+    each shard's part in parallel, and map the positions back to the
+    caller's list.
+    """
+    positions: dict[Path, List[int]] = {}
+    for position, lic in enumerate(licenses):
+        positions.setdefault(sharding.shard_path_for(lic.content_id), []).append(position)
+
+    futures = {
+        path: _get_executor().submit(
+            _on_shard, path, license_repo.find_overlaps_for_batch, [licenses[p] for p in members]
+        )
+        for path, members in positions.items()
+    }
+    overlaps: dict[int, List[int]] = {}
+    for path, future in futures.items():
+        for shard_position, ids in future.result().items():
+            overlaps[positions[path][shard_position]] = ids
+    return overlaps
+
+
+def iter_all_licenses(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[LicenseXref]:
+    """
+    I stream every license in id order by merging one id-ordered stream
+    per shard, so memory stays at about one batch per shard.
+    """
+    streams = [
+        _iter_on_shard(path, license_repo.iter_all_licenses, batch_size)
+        for path in sharding.shard_paths()
+    ]
+    return heapq.merge(*streams, key=attrgetter("id"))
+
+
+def iter_license_columns(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[tuple]:
+    """I merge the shards' id-ordered column tuples for LicenseFrame.load()."""
+    streams = [
+        _iter_on_shard(path, license_repo.iter_license_columns, batch_size)
+        for path in sharding.shard_paths()
+    ]
+    return heapq.merge(*streams, key=itemgetter(0))
+
+
+def get_terms(license_ids: Iterable[int]) -> dict[int, Optional[str]]:
+    """I ask every shard for the terms of the ids it holds and combine the answers."""
+    license_ids = list(license_ids)
+    terms: dict[int, Optional[str]] = {}
+    for part in _scatter(license_repo.get_terms, license_ids):
+        terms.update(part)
+    return terms
+
+
+def list_all_licenses() -> List[LicenseXref]:
+    return _merge(_scatter(license_repo.list_all_licenses))
+
+
+def iter_licenses_by_window(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[LicenseXref]:
+    """
+    I stream every license ordered by content, distributor and start
+    date for the conflict audit. A title never spans two shards, so
+    merging the shard streams on content_id keeps each title's rows in
+    the order its shard returned them.
+    """
+    streams = [
+        _iter_on_shard(path, license_repo.iter_licenses_by_window, batch_size)
+        for path in sharding.shard_paths()
+    ]
+    return heapq.merge(*streams, key=attrgetter("content_id"))
+
+
+def list_licenses_in_window(window_start: str | None, window_end: str | None) -> List[LicenseXref]:
+    return _merge(_scatter(license_repo.list_licenses_in_window, window_start, window_end))
+
+
+def list_licenses_ending_between(from_date: str, to_date: str) -> List[LicenseXref]:
+    results = _scatter(license_repo.list_licenses_ending_between, from_date, to_date)
+    return _merge(results, key=attrgetter("end_date", "id"))
+
+
+def _page_rows(direction: str, boundary: int, filter_sql: str, filter_params: list, limit: int) -> List[LicenseXref]:
+    if direction == "next":
+        page_sql = f"SELECT {_LICENSE_COLUMNS} FROM license_xref WHERE id > ?{filter_sql} ORDER BY id LIMIT ?"
+    else:
+        page_sql = f"SELECT {_LICENSE_COLUMNS} FROM license_xref WHERE id < ?{filter_sql} ORDER BY id DESC LIMIT ?"
+    with connection() as conn:
+        models = query_models(conn, license_repo._model_factory, page_sql, [boundary, *filter_params, limit]).fetchall()
+    if direction == "prev":
+        models.reverse()
+    return models
+
+
+def _has_rows(comparison: str, boundary: int, filter_sql: str, filter_params: list) -> bool:
+    exists_sql = f"SELECT 1 FROM license_xref WHERE id {comparison} ?{filter_sql} LIMIT 1"
+    with connection() as conn:
+        return conn.execute(exists_sql, [boundary, *filter_params]).fetchone() is not None
+
+
+def list_licenses_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+) -> Page[LicenseXref]:
+    """
+    I return one keyset page across all shards, with the same tokens
+    as license_repo.list_licenses_page() (ids are global, so a token
+    stays valid when sharding is switched on).
+
+    Every shard returns its own first limit + 1 rows past the boundary;
+    merged, the first `limit` are the page and anything left over means
+    there is a next one. Filtering on content_id asks one shard only.
+    """
+    if limit <= 0 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}.")
+
+    direction, boundary = ("next", 0) if token is None else decode_token(token)
+    filter_sql, filter_params = where_clause(filters, license_repo.LICENSE_PAGE_FILTERS)
+    content_id = (filters or {}).get("content_id")
+
+    def run(func: Callable, *args) -> List:
+        if content_id is not None:
+            return [_on_shard(sharding.shard_path_for(content_id), func, *args)]
+        return _scatter(func, *args)
+
+    rows = _merge(run(_page_rows, direction, boundary, filter_sql, filter_params, limit + 1))
+    has_more = len(rows) > limit
+    rows = rows[:limit] if direction == "next" else rows[-limit:]
+    if not rows:
+        return Page([], None, None)
+
+    # "Is there anything on the side I did not just fetch?"
+    if direction == "next":
+        has_other = any(run(_has_rows, "<", rows[0].id, filter_sql, filter_params))
+    else:
+        has_other = any(run(_has_rows, ">", rows[-1].id, filter_sql, filter_params))
+    has_next, has_prev = (has_more, has_other) if direction == "next" else (has_other, has_more)
+
+    return Page(
+        rows,
+        next_token=encode_token("next", rows[-1].id) if has_next else None,
+        prev_token=encode_token("prev", rows[0].id) if has_prev else None,
+    )
+
+
+def count_licenses_per_shard() -> List[int]:
+    """I return how many licenses each shard of the active layout holds."""
+    def count() -> int:
+        with connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM license_xref").fetchone()[0]
+
+    return _scatter(count)
+
+
+def count_licenses_per_content() -> List[tuple[int, int]]:
+    """I return (content_id, licenses) for every title with licenses, in content_id order."""
+    def count() -> List[tuple[int, int]]:
+        select_sql = "SELECT content_id, COUNT(*) FROM license_xref GROUP BY content_id ORDER BY content_id"
+        with connection() as conn:
+            return [tuple(row) for row in conn.execute(select_sql)]
+
+    return list(heapq.merge(*_scatter(count)))
+
+
+def _unavailable(*args, **kwargs):
+    raise ValueError("Joined license details are not available while licenses are sharded.")
+
+
+iter_license_details = _unavailable
+list_license_details_page = _unavailable
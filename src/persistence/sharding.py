@@ -0,0 +1,228 @@
+"""
+I created this module for the optional sharded license store: the
+license_xref rows are split by content_id across several SQLite files
+(shards), so one catalog can grow past what a single file and its one
+writer comfortably handle.
+
+The idea is:
+- a layout file (layout.json in the shard directory) records the
+  strategy, the shard files and, for "range", the content_id boundaries
+- "hash" puts content_id on shard content_id % N; "range" puts it on
+  the shard whose boundaries contain it
+- all licenses of one title live on one shard, so the conflict check
+  and "licenses for this title" touch a single file
+- content, distributor and the id directory (license_shard_ids) stay
+  in the main database
+
+Sharding is off unless MEDIA_LICENSE_SHARDS names a shard directory or
+enable_sharding() is called. sharded_license_repo has the queries and
+src/services/shard_service.py the create/status/rebalance commands.
+
+The license count summaries, the change log for licenses, the license
+terms search, exports and the process-pool reports are built on
+license_xref in the main database; they call require_unsharded().
+"""
+
+import json
+import os
+from bisect import bisect_right
+from pathlib import Path
+from types import ModuleType
+from typing import List
+
+from src.persistence import db, license_repo, migrations
+
+
+SHARDS_DIR = db.BASE_DIR / "db" / "shards"
+SHARD_MIGRATIONS_DIR = db.BASE_DIR / "db" / "shard_migrations"
+LAYOUT_FILE = "layout.json"
+STRATEGIES = ("hash", "range")
+MAX_SHARDS = 64
+
+_env_directory = os.environ.get("MEDIA_LICENSE_SHARDS", "")
+_directory: Path | None = Path(_env_directory) if _env_directory else None
+_layout: "ShardLayout | None" = None
+
+
+class ShardLayout:
+    """
+    I use this class to describe how licenses are spread over shards.
+
+    - strategy: "hash" or "range"
+    - files: the shard file names, relative to the shard directory
+    - boundaries: for "range", the N - 1 ascending content_ids where
+      each next shard starts (shard 0 holds everything below the first)
+    - generation: goes up by one on every rebalance, so the new files
+      never overwrite the ones still in use
+    """
+
+    def __init__(
+        self,
+        strategy: str,
+        files: List[str],
+        boundaries: List[int] | None = None,
+        generation: int = 1,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Choose a strategy from: {', '.join(STRATEGIES)}.")
+        if not 0 < len(files) <= MAX_SHARDS:
+            raise ValueError(f"A layout needs between 1 and {MAX_SHARDS} shards.")
+        boundaries = list(boundaries or [])
+        if strategy == "range":
+            if len(boundaries) != len(files) - 1:
+                raise ValueError("A range layout needs one boundary fewer than it has shards.")
+            if any(low >= high for low, high in zip(boundaries, boundaries[1:])):
+                raise ValueError("Range boundaries must be strictly ascending.")
+        elif boundaries:
+            raise ValueError("Only range layouts have boundaries.")
+
+        self.strategy = strategy
+        self.files = list(files)
+        self.boundaries = boundaries
+        self.generation = generation
+
+    @property
+    def count(self) -> int:
+        return len(self.files)
+
+    def shard_for(self, content_id: int) -> int:
+        """I return the number of the shard that holds content_id's licenses."""
+        if self.strategy == "hash":
+            return content_id % self.count
+        return bisect_right(self.boundaries, content_id)
+
+    def as_dict(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "files": self.files,
+            "boundaries": self.boundaries,
+            "generation": self.generation,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ShardLayout":
+        return cls(data["strategy"], data["files"], data.get("boundaries"), data.get("generation", 1))
+
+    def __repr__(self) -> str:
+        return (
+            f"ShardLayout(strategy={self.strategy!r}, shards={self.count}, "
+            f"boundaries={self.boundaries!r}, generation={self.generation})"
+        )
+
+
+def shard_file_names(count: int, generation: int) -> List[str]:
+    return [f"licenses-g{generation}-{number:02d}.db" for number in range(count)]
+
+
+def load_layout(directory: Path) -> ShardLayout:
+    """I read layout.json from a shard directory."""
+    path = Path(directory) / LAYOUT_FILE
+    if not path.exists():
+        raise ValueError(f"{path} does not exist; create the shards first.")
+    return ShardLayout.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def save_layout(directory: Path, layout: ShardLayout) -> None:
+    """
+    I write layout.json under a temporary name and rename it into
+    place, so a reader sees either the old or the new layout.
+    """
+    path = Path(directory) / LAYOUT_FILE
+    part = path.with_name(path.name + ".part")
+    part.write_text(json.dumps(layout.as_dict(), indent=2), encoding="utf-8")
+    os.replace(part, path)
+
+
+def migrate_shard_files(directory: Path, layout: ShardLayout) -> None:
+    """
+    I create the shard files that do not exist yet and bring each one
+    up to the newest script in db/shard_migrations, with the same
+    migration runner as the main database.
+    """
+    for path in shard_paths(layout, directory):
+        with db.use_database(path):
+            migrations.migrate(directory=SHARD_MIGRATIONS_DIR)
+
+
+def shard_paths(layout: ShardLayout | None = None, directory: Path | None = None) -> List[Path]:
+    """I return the full paths of the shard files (of the active layout by default)."""
+    layout = layout or get_layout()
+    directory = Path(directory or _directory)
+    return [directory / name for name in layout.files]
+
+
+def enable_sharding(directory: Path = SHARDS_DIR) -> ShardLayout:
+    """
+    I switch the license store to the shards in `directory` (which must
+    already have a layout) and make sure every shard file is migrated.
+    """
+    global _directory, _layout
+
+    layout = load_layout(directory)
+    migrate_shard_files(directory, layout)
+    _directory, _layout = Path(directory), layout
+    return layout
+
+
+def disable_sharding() -> None:
+    """I switch back to the license_xref table in the main database."""
+    global _directory, _layout
+
+    _directory, _layout = None, None
+
+
+def sharding_enabled() -> bool:
+    return _directory is not None
+
+
+def require_unsharded(feature: str) -> None:
+    """
+    I guard the features that read license_xref, or the tables its
+    triggers keep up to date, in the main database. Writes to the
+    shards never reach those, so while sharding is on the feature
+    raises ValueError instead of answering from stale rows.
+    """
+    if sharding_enabled():
+        raise ValueError(f"{feature} is not available while licenses are sharded.")
+
+
+def get_shard_directory() -> Path:
+    if _directory is None:
+        raise ValueError("License sharding is not enabled.")
+    return _directory
+
+
+def get_layout() -> ShardLayout:
+    """I return the active layout, reading it on first use."""
+    global _layout
+
+    if _layout is None:
+        _layout = load_layout(get_shard_directory())
+    return _layout
+
+
+def set_layout(layout: ShardLayout) -> None:
+    """I make `layout` the active one and save it (used after a rebalance)."""
+    global _layout
+
+    save_layout(get_shard_directory(), layout)
+    _layout = layout
+
+
+def shard_path_for(content_id: int) -> Path:
+    """I return the shard file that holds content_id's licenses."""
+    layout = get_layout()
+    return get_shard_directory() / layout.files[layout.shard_for(content_id)]
+
+
+def license_store() -> ModuleType:
+    """
+    I return the module the services should call for license rows:
+    sharded_license_repo when sharding is on, license_repo otherwise.
+    Both offer the same functions for the operations that can be sharded.
+    """
+    if sharding_enabled():
+        # Imported here because sharded_license_repo imports this module.
+        from src.persistence import sharded_license_repo
+        return sharded_license_repo
+    return license_repo
@@ -0,0 +1,450 @@
+"""
+I created this module as a second entry point next to main.py: a small
+HTTP/JSON server, so other programs (and many users at once) can use
+the licensing services without the interactive menu.
+
+It is built on the standard library only:
+- http.server with HTTP/1.1, so clients can keep a connection open
+- a fixed pool of worker threads; each worker serves one client
+  connection at a time, and the database pool is sized to match, so
+  every worker always has a connection of its own ready
+- JSON bodies built from the models' to_dict()
+- keyset pagination with the same tokens as the *_page services
+- ETag / If-None-Match on list endpoints, so an unchanged listing is
+  answered with 304 without running its query
+
+Endpoints:
+
+    GET    /content?token=&limit=&genre=&content_type=
+    GET    /content/search?q=&limit=
+    GET    /content/<id>
+    POST   /content
+    GET    /distributors?token=&limit=&region=
+    GET    /distributors/<id>
+    POST   /distributors
+    GET    /licenses?token=&limit=&content_id=&distributor_id=
+    GET    /licenses/details?token=&limit=&content_id=&distributor_id=&content_type=&region=
+    GET    /licenses/active?on=YYYY-MM-DD
+    GET    /licenses/<id>
+    POST   /licenses
+    PUT    /licenses/<id>
+    DELETE /licenses/<id>
+
+Usage from the project root:
+
+    python -m src.server --port 8080 --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, List
+from urllib.parse import parse_qs, urlsplit
+
+from src.models.license_xref import LicenseXref
+from src.persistence import db, sharding
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page
+from src.services import content_service, distributor_service, license_service
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+
+# An idle keep-alive connection holds a worker, so I close it after this
+# many seconds without a request.
+KEEPALIVE_TIMEOUT = 5.0
+MAX_BODY_BYTES = 1_048_576
+
+
+class HTTPError(Exception):
+    """I raise this inside a handler to answer with a specific status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ------------------------------------------------------------
+# Request helpers
+# ------------------------------------------------------------
+def _param(query: dict, name: str) -> str | None:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(query: dict, name: str, default: int | None = None) -> int | None:
+    raw = _param(query, name)
+    if raw is None or raw == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number, got {raw!r}.") from None
+
+
+def _page_args(query: dict) -> dict:
+    return {
+        "token": _param(query, "token"),
+        "limit": _int_param(query, "limit", DEFAULT_PAGE_SIZE),
+    }
+
+
+def _page_body(page: Page) -> dict:
+    return {
+        "items": [item.to_dict() for item in page],
+        "next_token": page.next_token,
+        "prev_token": page.prev_token,
+    }
+
+
+def _found(model, kind: str, model_id: int) -> dict:
+    if model is None:
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No {kind} found with id {model_id}.")
+    return model.to_dict()
+
+
+def _require(body: dict, *names: str) -> None:
+    missing = [name for name in names if body.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing field(s): {', '.join(missing)}.")
+
+
+# ------------------------------------------------------------
+# Endpoint handlers: (match, query, body) -> (status, payload)
+# ------------------------------------------------------------
+def list_content(match, query, body):
+    page = content_service.list_contents_page(
+        genre=_param(query, "genre"), content_type=_param(query, "content_type"), **_page_args(query)
+    )
+    return HTTPStatus.OK, _page_body(page)
+
+
+def search_content(match, query, body):
+    text = _param(query, "q") or ""
+    limit = _int_param(query, "limit", content_service.DEFAULT_SEARCH_LIMIT)
+    return HTTPStatus.OK, {"items": [c.to_dict() for c in content_service.search_content(text, limit)]}
+
+
+def get_content(match, query, body):
+    content_id = int(match["id"])
+    return HTTPStatus.OK, _found(content_service.get_content(content_id), "content", content_id)
+
+
+def create_content(match, query, body):
+    _require(body, "title")
+    content = content_service.add_content(
+        body["title"], body.get("genre"), body.get("content_type"), body.get("release_year"), body.get("notes")
+    )
+    return HTTPStatus.CREATED, content.to_dict()
+
+
+def list_distributors(match, query, body):
+    page = distributor_service.list_distributors_page(region=_param(query, "region"), **_page_args(query))
+    return HTTPStatus.OK, _page_body(page)
+
+
+def get_distributor(match, query, body):
+    distributor_id = int(match["id"])
+    return HTTPStatus.OK, _found(distributor_service.get_distributor(distributor_id), "distributor", distributor_id)
+
+
+def create_distributor(match, query, body):
+    _require(body, "name")
+    distributor = distributor_service.add_distributor(body["name"], body.get("contact_email"), body.get("region"))
+    return HTTPStatus.CREATED, distributor.to_dict()
+
+
+def list_licenses(match, query, body):
+    page = license_service.list_licenses_page(
+        content_id=_int_param(query, "content_id"),
+        distributor_id=_int_param(query, "distributor_id"),
+        **_page_args(query),
+    )
+    return HTTPStatus.OK, _page_body(page)
+
+
+def list_license_details(match, query, body):
+    page = license_service.list_license_details_page(
+        content_id=_int_param(query, "content_id"),
+        distributor_id=_int_param(query, "distributor_id"),
+        content_type=_param(query, "content_type"),
+        region=_param(query, "region"),
+        **_page_args(query),
+    )
+    return HTTPStatus.OK, _page_body(page)
+
+
+def list_active_licenses(match, query, body):
+    licenses = license_service.list_active_licenses(_param(query, "on"))
+    return HTTPStatus.OK, {"items": [lic.to_dict() for lic in licenses]}
+
+
+def get_license(match, query, body):
+    license_id = int(match["id"])
+    return HTTPStatus.OK, _found(license_service.get_license(license_id), "license", license_id)
+
+
+def create_license(match, query, body):
+    _require(body, "content_id", "distributor_id")
+    lic = license_service.add_license(
+        body["content_id"], body["distributor_id"], body.get("start_date"), body.get("end_date"), body.get("terms")
+    )
+    return HTTPStatus.CREATED, lic.to_dict()
+
+
+def update_license(match, query, body):
+    license_id = int(match["id"])
+    _require(body, "content_id", "distributor_id")
+    lic = LicenseXref.from_dict({**body, "id": license_id})
+    if not license_service.update_license(lic):
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No license found with id {license_id}.")
+    # It may have been deleted again since; that is a 404 too.
+    return HTTPStatus.OK, _found(license_service.get_license(license_id), "license", license_id)
+
+
+def delete_license(match, query, body):
+    license_id = int(match["id"])
+    if not license_service.delete_license(license_id):
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No license found with id {license_id}.")
+    return HTTPStatus.NO_CONTENT, None
+
+
+# (method, path pattern, handler, is a list endpoint that gets an ETag)
+ROUTES: List[tuple[str, re.Pattern, Callable, bool]] = [
+    ("GET", re.compile(r"/content"), list_content, True),
+    ("GET", re.compile(r"/content/search"), search_content, True),
+    ("GET", re.compile(r"/content/(?P<id>\d+)"), get_content, False),
+    ("POST", re.compile(r"/content"), create_content, False),
+    ("GET", re.compile(r"/distributors"), list_distributors, True),
+    ("GET", re.compile(r"/distributors/(?P<id>\d+)"), get_distributor, False),
+    ("POST", re.compile(r"/distributors"), create_distributor, False),
+    ("GET", re.compile(r"/licenses"), list_licenses, True),
+    ("GET", re.compile(r"/licenses/details"), list_license_details, True),
+    ("GET", re.compile(r"/licenses/active"), list_active_licenses, True),
+    ("GET", re.compile(r"/licenses/(?P<id>\d+)"), get_license, False),
+    ("POST", re.compile(r"/licenses"), create_license, False),
+    ("PUT", re.compile(r"/licenses/(?P<id>\d+)"), update_license, False),
+    ("DELETE", re.compile(r"/licenses/(?P<id>\d+)"), delete_license, False),
+]
+
+
+def _route(method: str, path: str):
+    path_matched = False
+    for route_method, pattern, handler, listing in ROUTES:
+        match = pattern.fullmatch(path)
+        if match is None:
+            continue
+        path_matched = True
+        if route_method == method:
+            return match, handler, listing
+    if path_matched:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported on {path}.")
+    raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint at {path}.")
+
+
+def list_etag(url: str) -> str | None:
+    """
+    I build the ETag of a list response from its URL and the database's
+    data_version() token. Any commit changes the token, so the tag
+    changes whenever the listing might have; an unchanged tag means the
+    query would return the same rows, and it does not need to run.
+
+    /licenses/active without ?on= means "today", so the resolved date
+    goes into the tag as well; yesterday's tag does not match today.
+
+    Commits to license shards do not change the main database's token,
+    so license listings get no ETag (None) while licenses are sharded.
+    """
+    parts = urlsplit(url)
+    if sharding.sharding_enabled() and parts.path.startswith("/licenses"):
+        return None
+    day = ""
+    if parts.path.rstrip("/") == "/licenses/active":
+        day = _param(parse_qs(parts.query), "on") or date.today().isoformat()
+    generation, version = db.data_version()
+    digest = hashlib.sha1(f"{generation}:{version}:{day}:{url}".encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    I check an If-None-Match header against our tag. The header is a
+    comma-separated list of whole tags (or "*" for any), and a weak
+    W/"..." tag matches too, as RFC 9110 asks for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class LicensingRequestHandler(BaseHTTPRequestHandler):
+    """
+    I handle one client connection. protocol_version HTTP/1.1 keeps the
+    connection open between requests unless the client asks to close.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MediaRightsLicensing/1.0"
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # second one waits for a delayed ACK and every response takes ~40 ms.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # the unread body would confuse the next request
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+        if length == 0:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be JSON.") from None
+        if not isinstance(body, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+        return body
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        etag = None
+        try:
+            # Always read the body, even for errors, so the next request on
+            # this keep-alive connection starts at the right byte.
+            body = self._read_body()
+            match, handler, listing = _route(method, url.path.rstrip("/") or "/")
+
+            if listing:
+                etag = list_etag(self.path)
+                if etag is not None and etag_matches(self.headers.get("If-None-Match"), etag):
+                    self._send(HTTPStatus.NOT_MODIFIED, None, etag)
+                    return
+
+            status, payload = handler(match, parse_qs(url.query), body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": e.message}
+        except (ValueError, TypeError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:  # noqa: BLE001 - report, keep serving
+            self.log_error("Unhandled error for %s %s: %r", method, self.path, e)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+
+        self._send(status, payload, etag if status == HTTPStatus.OK else None)
+
+    def _send(self, status: HTTPStatus, payload, etag: str | None) -> None:
+        data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class LicensingHTTPServer(HTTPServer):
+    """
+    I run each accepted connection on a fixed ThreadPoolExecutor instead
+    of a new thread per connection (like ThreadingHTTPServer does), so
+    the number of busy threads, and database connections, has a limit.
+    Connections beyond `workers` wait in the executor's queue.
+    """
+
+    daemon_threads = True
+    # A larger listen backlog so load tests with many clients are not refused.
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], workers: int = DEFAULT_WORKERS, verbose: bool = False):
+        if workers <= 0:
+            raise ValueError("workers must be a positive integer.")
+        super().__init__(address, LicensingRequestHandler)
+        self.workers = workers
+        self.verbose = verbose
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="media-http")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = DEFAULT_WORKERS,
+    verbose: bool = False,
+) -> LicensingHTTPServer:
+    """
+    I wrote this function to build a ready-to-run server (port 0 picks a
+    free port; read it back from server.server_address). It sizes the
+    database pool to one connection per worker.
+    """
+    db.set_pool_size(workers)
+    db.init_db()
+    return LicensingHTTPServer((host, port), workers, verbose)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the licensing services as an HTTP/JSON API.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} with {args.workers} workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
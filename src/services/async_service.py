@@ -0,0 +1,252 @@
+"""
+I created this module so an asyncio application (for example an API
+gateway) can call the licensing services without blocking its event
+loop on sqlite3.
+
+Every function here mirrors a function of content_service,
+distributor_service or license_service with the same arguments, but is
+a coroutine:
+
+    content = await async_service.get_content(42)
+
+Behind the facade, AsyncExecutor runs the blocking calls on threads:
+- one writer thread, so writes reach SQLite one at a time (SQLite only
+  allows one writer anyway; queuing here beats busy-waiting in SQLite)
+- READER_THREADS reader threads; each borrows a pooled connection, so
+  readers + writer never need more than POOL_SIZE connections
+- at most MAX_PENDING calls are handed to the threads at once; callers
+  beyond that wait on the event loop, and past MAX_WAITING they get
+  ExecutorBusyError straight away so a server can answer "try again"
+- identical reads that overlap in time share one database call
+- a caller that is cancelled before its call starts never runs it; a
+  call that is already running finishes and its result is dropped
+"""
+
+import asyncio
+import functools
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+from src.persistence.db import POOL_SIZE
+from src.services import content_service, distributor_service, license_service
+
+
+READER_THREADS = int(os.environ.get("MEDIA_ASYNC_READERS", str(max(1, POOL_SIZE - 1))))
+MAX_PENDING = int(os.environ.get("MEDIA_ASYNC_MAX_PENDING", "64"))
+MAX_WAITING = int(os.environ.get("MEDIA_ASYNC_MAX_WAITING", "10000"))
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when more than max_waiting calls are already queued."""
+
+
+class _LoopState:
+    # Semaphores and tasks belong to one event loop, so I keep one of
+    # these per loop that uses the executor.
+    def __init__(self, max_pending: int):
+        self.slots = asyncio.Semaphore(max_pending)
+        self.waiting = 0
+        self.in_flight: dict[Hashable, asyncio.Task] = {}
+
+
+def _read_key(func: Callable, args: tuple, kwargs: dict) -> Hashable | None:
+    key = (func, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None  # unhashable arguments (lists, models): no sharing
+    return key
+
+
+def _mark_retrieved(task: asyncio.Task) -> None:
+    # If every caller of a shared read was cancelled, nobody awaits the
+    # task; reading the exception keeps asyncio from logging it as lost.
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncExecutor:
+    """
+    I wrote this class to own the threads behind the async facade. Most
+    code uses the shared one from get_executor(); tests and benchmarks
+    can build their own with different limits.
+    """
+
+    def __init__(
+        self,
+        readers: int = READER_THREADS,
+        max_pending: int = MAX_PENDING,
+        max_waiting: int | None = MAX_WAITING,
+    ):
+        if readers <= 0 or max_pending <= 0:
+            raise ValueError("readers and max_pending must be positive integers.")
+
+        self.readers = readers
+        self.max_pending = max_pending
+        self.max_waiting = max_waiting
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="media-db-writer")
+        self._readers = ThreadPoolExecutor(readers, thread_name_prefix="media-db-reader")
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.max_pending)
+        return state
+
+    async def _submit(self, pool: ThreadPoolExecutor, func: Callable, args: tuple, kwargs: dict):
+        if self._closed:
+            raise RuntimeError("The async executor has been shut down.")
+
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+        if state.slots.locked():
+            if self.max_waiting is not None and state.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise ExecutorBusyError(f"More than {self.max_waiting} database calls are queued.")
+
+        state.waiting += 1
+        try:
+            await state.slots.acquire()
+        finally:
+            state.waiting -= 1
+
+        try:
+            self.calls += 1
+            # Cancelling the awaiting task cancels the thread-pool future
+            # too, which drops the call if it has not started yet.
+            return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        finally:
+            state.slots.release()
+
+    async def read(self, func: Callable, *args, **kwargs):
+        """
+        I run a read-only service call on a reader thread. If the same
+        call (same function and arguments) is already running, I wait
+        for that one instead of starting another, so concurrent callers
+        share the result object and should treat it as read-only.
+        """
+        key = _read_key(func, args, kwargs)
+        if key is None:
+            return await self._submit(self._readers, func, args, kwargs)
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._state(loop).in_flight
+        task = in_flight.get(key)
+        if task is None:
+            task = loop.create_task(self._submit(self._readers, func, args, kwargs))
+            in_flight[key] = task
+
+            def forget(done: asyncio.Task) -> None:
+                if in_flight.get(key) is done:
+                    del in_flight[key]
+                _mark_retrieved(done)
+
+            task.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+
+        # shield() lets one caller be cancelled without cancelling the
+        # call the other callers are still waiting for.
+        return await asyncio.shield(task)
+
+    async def write(self, func: Callable, *args, **kwargs):
+        """
+        I run a service call that changes data on the single writer
+        thread. Once it finishes, reads that started before it are no
+        longer shared with new callers, so a caller always sees its
+        own writes.
+        """
+        try:
+            return await self._submit(self._writer, func, args, kwargs)
+        finally:
+            self._state(asyncio.get_running_loop()).in_flight.clear()
+
+    def stats(self) -> dict:
+        return {
+            "readers": self.readers,
+            "max_pending": self.max_pending,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """I stop both thread pools; calls that have not started are cancelled."""
+        self._closed = True
+        self._writer.shutdown(wait=wait, cancel_futures=True)
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+
+
+_executor: AsyncExecutor | None = None
+
+
+def get_executor() -> AsyncExecutor:
+    """I return the shared executor, creating it on first use."""
+    global _executor
+    if _executor is None or _executor.closed:
+        _executor = AsyncExecutor()
+    return _executor
+
+
+def shutdown() -> None:
+    """I shut the shared executor down, for example when the gateway stops."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def _reader(func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def call(*args, **kwargs):
+        return await get_executor().read(func, *args, **kwargs)
+    return call
+
+
+def _writer(func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def call(*args, **kwargs):
+        return await get_executor().write(func, *args, **kwargs)
+    return call
+
+
+# ---- Content ----
+add_content = _writer(content_service.add_content)
+add_content_bulk = _writer(content_service.add_content_bulk)
+get_content = _reader(content_service.get_content)
+list_contents = _reader(content_service.list_contents)
+list_contents_page = _reader(content_service.list_contents_page)
+search_content = _reader(content_service.search_content)
+
+# ---- Distributors ----
+add_distributor = _writer(distributor_service.add_distributor)
+add_distributor_bulk = _writer(distributor_service.add_distributor_bulk)
+get_distributor = _reader(distributor_service.get_distributor)
+list_distributors = _reader(distributor_service.list_distributors)
+list_distributors_page = _reader(distributor_service.list_distributors_page)
+
+# ---- Licenses ----
+add_license = _writer(license_service.add_license)
+add_license_bulk = _writer(license_service.add_license_bulk)
+update_license = _writer(license_service.update_license)
+delete_license = _writer(license_service.delete_license)
+get_license = _reader(license_service.get_license)
+list_licenses = _reader(license_service.list_licenses)
+list_licenses_page = _reader(license_service.list_licenses_page)
+list_license_details_page = _reader(license_service.list_license_details_page)
+list_active_licenses = _reader(license_service.list_active_licenses)
+list_licenses_in_window = _reader(license_service.list_licenses_in_window)
+list_expiring_licenses = _reader(license_service.list_expiring_licenses)
@@ -0,0 +1,333 @@
+"""
+I created this module so db/media.db can be backed up while the app is
+running. Copying the file with cp while something writes can produce a
+torn copy; these functions go through SQLite instead.
+
+It has three commands:
+- backup:   sqlite3's online backup API, a batch of pages at a time
+            with a short pause in between, so writers keep their turn
+- snapshot: VACUUM INTO, a compacted copy in one read transaction
+            (smaller file, no free pages, but no progress reports)
+- restore:  copies a backup into a fresh file, or over an existing
+            database, again through the backup API
+
+Every copy is written under a .part name, checked with
+PRAGMA quick_check and only then renamed into place.
+
+Usage from the project root:
+
+    python -m src.services.backup_service backup backups/media-2024-06-01.db
+    python -m src.services.backup_service snapshot backups/compact.db
+    python -m src.services.backup_service restore backups/compact.db --target restored.db
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from src.persistence import db
+
+
+# 1024 pages of 4 KiB is 4 MB per step; each step holds the read lock
+# only for as long as it takes to copy that much.
+BACKUP_PAGES = 1024
+BACKUP_PAUSE = 0.005    # seconds between steps
+# If other connections keep committing, SQLite restarts a paged backup
+# from the first page. After this many restarts I copy the rest in one
+# step, which in WAL mode still does not block writers.
+MAX_RESTARTS = 3
+
+ProgressCallback = Callable[["BackupProgress"], None]
+
+
+class BackupProgress:
+    """
+    I use this small class to report how far a backup has got, so the
+    CLI output and the returned summary come from one place.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.total_pages = 0
+        self.remaining_pages = 0
+        self.page_size = 0
+        self.steps = 0
+        self.restarts = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def copied_pages(self) -> int:
+        return self.total_pages - self.remaining_pages
+
+    @property
+    def fraction(self) -> float:
+        return self.copied_pages / self.total_pages if self.total_pages else 1.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def bytes(self) -> int:
+        return self.total_pages * self.page_size
+
+    def as_dict(self) -> dict:
+        return {
+            "path": str(self.path),
+            "pages": self.total_pages,
+            "bytes": self.bytes,
+            "steps": self.steps,
+            "restarts": self.restarts,
+            "seconds": self.seconds,
+            "mb_per_second": self.bytes / 1e6 / self.seconds if self.seconds else 0.0,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.fraction:6.1%} | {self.copied_pages:,}/{self.total_pages:,} pages | "
+            f"{self.elapsed:.1f}s | restarts {self.restarts}"
+        )
+
+
+class _Restarted(Exception):
+    # Raised from the progress callback to abandon a paged backup that
+    # keeps being restarted by writers.
+    pass
+
+
+def _part_path(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def _check_destination(path: Path) -> None:
+    if path.exists():
+        raise ValueError(f"{path} already exists; pick a new file.")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _part_path(path).unlink(missing_ok=True)   # left over from a failed run
+
+
+def _quick_check(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    try:
+        (result,) = conn.execute("PRAGMA quick_check").fetchone()
+    finally:
+        conn.close()
+    if result != "ok":
+        raise sqlite3.DatabaseError(f"{path} failed PRAGMA quick_check: {result}")
+
+
+def _copy(
+    source: sqlite3.Connection,
+    dest: sqlite3.Connection,
+    progress: BackupProgress,
+    pages: int,
+    pause: float,
+    on_progress: ProgressCallback | None,
+) -> None:
+    progress.page_size = source.execute("PRAGMA page_size").fetchone()[0]
+    paged = pages > 0
+
+    def step(status: int, remaining: int, total: int) -> None:
+        # The backup API restarts from the first page when another
+        # connection changes the source; remaining stops going down then.
+        if progress.steps and remaining >= progress.remaining_pages:
+            progress.restarts += 1
+            if paged and progress.restarts >= MAX_RESTARTS:
+                raise _Restarted
+        progress.steps += 1
+        progress.total_pages = total
+        progress.remaining_pages = remaining
+        if on_progress is not None:
+            on_progress(progress)
+        # sqlite3 only sleeps when the source is busy, so the pause that
+        # lets writers in between steps happens here.
+        if remaining and pause:
+            time.sleep(pause)
+
+    try:
+        source.backup(dest, pages=pages, progress=step)
+    except _Restarted:
+        paged = False
+        source.backup(dest, pages=-1, progress=step)
+
+
+def backup_database(
+    dest: Path,
+    pages: int = BACKUP_PAGES,
+    pause: float = BACKUP_PAUSE,
+    on_progress: ProgressCallback | None = None,
+) -> dict:
+    """
+    I wrote this function to take an online backup of the database at
+    db.DB_PATH into `dest`, which must not exist yet.
+
+    It:
+    - copies `pages` pages per step (-1 copies everything in one step)
+      and sleeps `pause` seconds between steps
+    - calls on_progress(BackupProgress) after every step
+    - checks the copy and renames it into place
+    - returns a summary with pages, bytes, seconds and MB/s
+    """
+    if pages == 0 or pages < -1:
+        raise ValueError("pages must be a positive integer or -1.")
+    if pause < 0:
+        raise ValueError("pause must be zero or more seconds.")
+
+    dest = Path(dest)
+    _check_destination(dest)
+    part = _part_path(dest)
+    progress = BackupProgress(dest)
+
+    source = db.get_connection()
+    target = sqlite3.connect(part)
+    try:
+        _copy(source, target, progress, pages, pause, on_progress)
+    except BaseException:
+        target.close()
+        part.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+
+    _quick_check(part)
+    os.replace(part, dest)
+    progress.seconds = progress.elapsed
+    return progress.as_dict()
+
+
+def snapshot_database(dest: Path) -> dict:
+    """
+    I wrote this function to write a compacted copy of the database
+    with VACUUM INTO. It runs in a single read transaction, so it sees
+    one consistent state and (in WAL mode) never blocks writers, but it
+    cannot report progress along the way.
+    """
+    dest = Path(dest)
+    _check_destination(dest)
+    part = _part_path(dest)
+    started = time.perf_counter()
+
+    source = db.get_connection()
+    try:
+        source.execute("VACUUM INTO ?", (str(part),))
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+
+    _quick_check(part)
+    os.replace(part, dest)
+    seconds = time.perf_counter() - started
+    size = dest.stat().st_size
+    return {
+        "path": str(dest),
+        "bytes": size,
+        "seconds": seconds,
+        "mb_per_second": size / 1e6 / seconds if seconds else 0.0,
+    }
+
+
+def restore_database(
+    backup: Path,
+    target: Path | None = None,
+    overwrite: bool = False,
+    on_progress: ProgressCallback | None = None,
+) -> dict:
+    """
+    I wrote this function to bring a backup back.
+
+    `target` defaults to db.DB_PATH. A fresh file is written under a
+    .part name and renamed once checked. Replacing an existing database
+    needs overwrite=True and goes through the backup API as a single
+    transaction, so other connections see either the old or the
+    restored data, never a mix; the shared pool is closed afterwards so
+    it reconnects to the restored schema.
+    """
+    backup = Path(backup)
+    target = Path(db.DB_PATH if target is None else target)
+    if not backup.exists():
+        raise ValueError(f"Backup {backup} does not exist.")
+    _quick_check(backup)
+
+    replacing = target.exists()
+    if replacing and not overwrite:
+        raise ValueError(f"{target} already exists; pass overwrite=True to replace it.")
+
+    if not replacing:
+        target.parent.mkdir(parents=True, exist_ok=True)
+    destination = target if replacing else _part_path(target)
+    progress = BackupProgress(target)
+
+    source = sqlite3.connect(backup)
+    dest = sqlite3.connect(destination)
+    try:
+        _copy(source, dest, progress, -1, 0, on_progress)
+    finally:
+        source.close()
+        dest.close()
+
+    if not replacing:
+        _quick_check(destination)
+        os.replace(destination, target)
+    if target.resolve() == Path(db.DB_PATH).resolve():
+        db.close_pool()
+    progress.seconds = progress.elapsed
+    return progress.as_dict()
+
+
+def _print_progress(every: float) -> ProgressCallback:
+    # I only print when another `every` of the copy is done, so a
+    # multi-GB backup prints a few dozen lines, not one per step.
+    next_mark = [0.0]
+
+    def report(progress: BackupProgress) -> None:
+        if progress.fraction >= next_mark[0] or not progress.remaining_pages:
+            print(progress, file=sys.stderr)
+            next_mark[0] = progress.fraction + every
+
+    return report
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Back up, snapshot or restore the licensing database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backup = commands.add_parser("backup", help="online backup in page batches")
+    backup.add_argument("dest", type=Path)
+    backup.add_argument("--pages", type=int, default=BACKUP_PAGES, help="pages per step, -1 for all")
+    backup.add_argument("--pause", type=float, default=BACKUP_PAUSE, help="seconds between steps")
+
+    snapshot = commands.add_parser("snapshot", help="compacted copy with VACUUM INTO")
+    snapshot.add_argument("dest", type=Path)
+
+    restore = commands.add_parser("restore", help="restore a backup")
+    restore.add_argument("backup", type=Path)
+    restore.add_argument("--target", type=Path, default=None, help="defaults to db/media.db")
+    restore.add_argument("--overwrite", action="store_true", help="replace an existing database")
+
+    args = parser.parse_args(argv)
+    report = _print_progress(0.05)
+
+    if args.command == "backup":
+        summary = backup_database(args.dest, args.pages, args.pause, report)
+    elif args.command == "snapshot":
+        summary = snapshot_database(args.dest)
+    else:
+        summary = restore_database(args.backup, args.target, args.overwrite, report)
+
+    print(
+        f"Done in {summary['seconds']:.1f}s: {summary['bytes'] / 1e6:,.1f} MB "
+        f"at {summary['mb_per_second']:.1f} MB/s -> {summary['path']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
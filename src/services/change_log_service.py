@@ -0,0 +1,229 @@
+"""
+I created this module so downstream systems (search, caches, partner
+feeds) can follow changes to the catalog instead of re-reading whole
+tables.
+
+Triggers append every insert, update and delete on content,
+distributor and license_xref to the change log, with a sequence number
+that only goes up. A consumer:
+- starts from a full export (its manifest records change_seq) or 0
+- asks for the changes after the last seq it handled, a batch at a time
+- applies inserts and updates as upserts (compaction may drop the
+  insert before an update) and deletes as deletes
+- commits the last seq it handled, under its own name
+
+Two housekeeping jobs keep the log small:
+- compact_change_log() keeps only the latest change per row
+- apply_retention() drops changes older than N days, but by default
+  not ones a registered consumer has not read yet. A consumer whose
+  position was dropped anyway gets ChangeLogGapError and must start
+  again from a full export.
+
+License changes are logged by triggers on the main database's
+license_xref, so reading them is refused while licenses are sharded;
+content and distributor changes can still be read on their own.
+
+Usage from the project root:
+
+    python -m src.services.change_log_service tail --after 0
+    python -m src.services.change_log_service compact
+    python -m src.services.change_log_service retain --days 30
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, List, NamedTuple
+
+from src.models.change import Change
+from src.persistence import change_log_repo
+from src.persistence.change_log_repo import CHANGE_TABLES
+from src.persistence.db import init_db
+from src.persistence.sharding import require_unsharded
+
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 10_000
+DEFAULT_RETENTION_DAYS = 30
+
+
+class ChangeLogGapError(ValueError):
+    """Raised when changes after the requested seq were already purged."""
+
+
+class ChangeBatch(NamedTuple):
+    changes: List[Change]
+    # Where to continue from: the seq of the last change returned, or
+    # the seq that was asked for if there was nothing new.
+    last_seq: int
+    has_more: bool
+
+
+def _check_tables(tables: Iterable[str] | None) -> List[str] | None:
+    if tables is None:
+        return None
+    tables = list(tables)
+    unknown = [table for table in tables if table not in CHANGE_TABLES]
+    if unknown or not tables:
+        raise ValueError(f"Choose tables from: {', '.join(CHANGE_TABLES)}.")
+    return tables
+
+
+def _check_license_changes(tables: List[str] | None) -> None:
+    if tables is None or "license_xref" in tables:
+        require_unsharded("The license change log")
+
+
+def read_changes(
+    after_seq: int = 0,
+    limit: int = DEFAULT_BATCH_SIZE,
+    tables: Iterable[str] | None = None,
+) -> ChangeBatch:
+    """
+    I wrote this function as the core of the consumer API: it returns
+    the next batch of up to `limit` changes after `after_seq`, oldest
+    first, optionally for some tables only.
+    """
+    if after_seq < 0:
+        raise ValueError("after_seq must be zero or a positive integer.")
+    if not 0 < limit <= MAX_BATCH_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_BATCH_SIZE}.")
+    tables = _check_tables(tables)
+    _check_license_changes(tables)
+
+    # SQLite has one writer at a time, so seqs become visible in order
+    # and nothing can appear later below a seq already read.
+    # One more than asked for tells me whether another batch is waiting.
+    changes = change_log_repo.list_changes_after(after_seq, limit + 1, tables)
+    purged_through, _ = change_log_repo.get_log_bounds()
+    # Checked after the read: retention running in between would
+    # otherwise hide the gap.
+    if after_seq < purged_through:
+        raise ChangeLogGapError(
+            f"Changes up to {purged_through} were purged; seq {after_seq} is too old. "
+            "Start again from a full export."
+        )
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return ChangeBatch(changes, changes[-1].seq if changes else after_seq, has_more)
+
+
+def iter_changes(
+    after_seq: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    tables: Iterable[str] | None = None,
+) -> Iterator[Change]:
+    """I yield every change after `after_seq` until the log is caught up, one batch at a time."""
+    while True:
+        batch = read_changes(after_seq, batch_size, tables)
+        yield from batch.changes
+        if not batch.has_more:
+            return
+        after_seq = batch.last_seq
+
+
+def consume(
+    consumer: str,
+    handler: Callable[[List[Change]], None],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    tables: Iterable[str] | None = None,
+) -> int:
+    """
+    I wrote this function to run one sync pass for a named consumer.
+
+    It:
+    - reads from the consumer's committed seq (0 the first time, which
+      also registers the consumer)
+    - hands each batch to handler(changes)
+    - commits the batch's last seq only after the handler returns, so
+      a crash means the batch is delivered again (at least once)
+    - returns how many changes were handled
+    """
+    if not consumer or not consumer.strip():
+        raise ValueError("Consumer name is required.")
+    consumer = consumer.strip()
+    _check_license_changes(_check_tables(tables))
+
+    after_seq = change_log_repo.get_consumer_offset(consumer)
+    if after_seq is None:
+        # Registering straight away makes retention wait for this
+        # consumer even before it has handled anything.
+        after_seq = 0
+        change_log_repo.set_consumer_offset(consumer, after_seq)
+    handled = 0
+    while True:
+        batch = read_changes(after_seq, batch_size, tables)
+        if batch.changes:
+            handler(batch.changes)
+            handled += len(batch.changes)
+        if batch.last_seq != after_seq:
+            change_log_repo.set_consumer_offset(consumer, batch.last_seq)
+            after_seq = batch.last_seq
+        if not batch.has_more:
+            return handled
+
+
+def get_consumer_offsets() -> dict[str, int]:
+    return change_log_repo.list_consumer_offsets()
+
+
+def remove_consumer(consumer: str) -> bool:
+    """I forget a consumer that is gone for good, so retention stops waiting for it."""
+    return change_log_repo.delete_consumer(consumer)
+
+
+def compact_change_log() -> int:
+    """I keep only the latest change per row and return how many changes I removed."""
+    return change_log_repo.compact_changes()
+
+
+def apply_retention(max_age_days: float = DEFAULT_RETENTION_DAYS, keep_unread: bool = True) -> int:
+    """
+    I delete changes older than max_age_days and return how many went.
+    With keep_unread, nothing a registered consumer has not committed
+    yet is deleted, however old it is.
+    """
+    if max_age_days < 0:
+        raise ValueError("max_age_days must be zero or more.")
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    older_than = cutoff.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+    max_seq = None
+    if keep_unread:
+        offsets = change_log_repo.list_consumer_offsets()
+        if offsets:
+            max_seq = min(offsets.values())
+    return change_log_repo.purge_changes(older_than, max_seq)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Read and maintain the catalog change log.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    tail = commands.add_parser("tail", help="print changes after a seq")
+    tail.add_argument("--after", type=int, default=0)
+    tail.add_argument("--tables", nargs="+", choices=CHANGE_TABLES, default=None)
+
+    commands.add_parser("compact", help="keep only the latest change per row")
+
+    retain = commands.add_parser("retain", help="drop old changes")
+    retain.add_argument("--days", type=float, default=DEFAULT_RETENTION_DAYS)
+    retain.add_argument("--drop-unread", action="store_true", help="also drop changes consumers have not read")
+
+    args = parser.parse_args(argv)
+    init_db()
+
+    if args.command == "tail":
+        for change in iter_changes(args.after, tables=args.tables):
+            print(f"{change} {change.data or ''}")
+    elif args.command == "compact":
+        print(f"Removed {compact_change_log():,} superseded change(s).")
+    else:
+        print(f"Removed {apply_retention(args.days, not args.drop_unread):,} old change(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
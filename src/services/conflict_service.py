@@ -0,0 +1,141 @@
+"""
+I created this module to find licenses whose date windows overlap for
+the same content item.
+
+There are two ways in:
+- find_conflicts() audits a whole catalog with a sort-and-sweep, which
+  costs O(n log n) plus one step per overlapping pair it reports
+- find_conflicting_licenses() checks one new or changed license against
+  the existing rows for its content item only, through an index
+
+Missing start or end dates mean the window is open on that side.
+"""
+
+import heapq
+from itertools import groupby
+from typing import Iterable, Iterator, List
+
+from src.models.license_xref import LicenseXref
+from src.persistence.sharding import license_store
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, from_epoch_day, to_epoch_day
+
+
+class LicenseConflict:
+    """
+    I use this class to describe one overlapping pair: the two licenses
+    and the first and last day they are both active.
+    """
+
+    def __init__(self, first: LicenseXref, second: LicenseXref, overlap_start: int, overlap_end: int):
+        self.first = first
+        self.second = second
+        self.overlap_start = overlap_start
+        self.overlap_end = overlap_end
+
+    def _day_text(self, day: int) -> str:
+        if day in (OPEN_START_DAY, OPEN_END_DAY):
+            return "open"
+        return from_epoch_day(day).isoformat()
+
+    def __str__(self) -> str:
+        return (
+            f"Content {self.first.content_id}: license {self.first.id} overlaps "
+            f"license {self.second.id} from {self._day_text(self.overlap_start)} "
+            f"to {self._day_text(self.overlap_end)}"
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LicenseConflict(first={self.first.id!r}, second={self.second.id!r}, "
+            f"overlap_start={self.overlap_start!r}, overlap_end={self.overlap_end!r})"
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "content_id": self.first.content_id,
+            "first_license_id": self.first.id,
+            "second_license_id": self.second.id,
+            "overlap_start": self._day_text(self.overlap_start),
+            "overlap_end": self._day_text(self.overlap_end),
+        }
+
+
+def _window(lic: LicenseXref) -> tuple[int, int]:
+    return (
+        to_epoch_day(lic.start_date, OPEN_START_DAY),
+        to_epoch_day(lic.end_date, OPEN_END_DAY),
+    )
+
+
+def _sweep(group: Iterable[LicenseXref]) -> Iterator[LicenseConflict]:
+    # group is sorted by start day. I keep the licenses that are still
+    # "open" in a min-heap on end day: before adding the next license I
+    # drop every window that ended before it starts, and whatever is left
+    # overlaps the new one.
+    active: list[tuple[int, int, LicenseXref]] = []
+    for lic in group:
+        start, end = _window(lic)
+        if end < start:
+            continue   # an inverted legacy window is empty, so it overlaps nothing
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for other_end, _, other in active:
+            yield LicenseConflict(other, lic, start, min(end, other_end))
+        heapq.heappush(active, (end, lic.id, lic))
+
+
+def find_conflicts(
+    licenses: Iterable[LicenseXref] | None = None,
+    same_distributor: bool = True,
+) -> Iterator[LicenseConflict]:
+    """
+    I wrote this generator to audit a catalog for overlapping licenses.
+
+    With no argument it streams license_xref in (content, distributor,
+    start) order straight off an index, so only one content item's
+    windows are in memory at a time. Any other iterable of LicenseXref
+    is sorted first.
+
+    same_distributor=True (the default) only reports overlaps between
+    licenses held by the same distributor; False reports every overlap
+    on the same content item.
+    """
+    if same_distributor:
+        def group_key(lic):
+            return lic.content_id, lic.distributor_id
+    else:
+        def group_key(lic):
+            return lic.content_id
+
+    if licenses is None:
+        # The stream is ordered by content first, so grouping by content
+        # alone still works; it is only in start order within a group when
+        # the group is a (content, distributor) pair.
+        ordered = license_store().iter_licenses_by_window()
+        presorted = same_distributor
+    else:
+        ordered = sorted(licenses, key=group_key)
+        presorted = False
+
+    for _, group in groupby(ordered, key=group_key):
+        if not presorted:
+            group = sorted(group, key=lambda lic: (_window(lic)[0], lic.id))
+        yield from _sweep(group)
+
+
+def find_conflicting_licenses(
+    content_id: int,
+    distributor_id: int | None,
+    start_date: str | None,
+    end_date: str | None,
+    exclude_id: int | None = None,
+) -> List[LicenseXref]:
+    """
+    I wrote this function for add_license() and update_license(). It
+    returns the existing licenses that would overlap the given window
+    on the same content item (and distributor, unless None). exclude_id
+    skips the license being updated.
+    """
+    return license_store().list_overlapping_licenses(
+        content_id, distributor_id, start_date, end_date, exclude_id
+    )
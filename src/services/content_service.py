@@ -11,13 +11,25 @@ This lets me:
 - keep SQL out of the UI
 """
 
-from typing import List, Optional
+import re
+from typing import Iterable, Iterator, List, Optional
 
 from src.models.content import Content
 from src.persistence import content_repo
+from src.persistence.db import FETCH_BATCH_SIZE
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page
+from src.persistence.sharding import sharding_enabled
+from src.utils import clean_text
 
 
-def add_content(
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+# A search word, optionally ending in "*" to ask for a prefix match.
+_SEARCH_WORD = re.compile(r"(\w+)(\*?)")
+
+
+def build_content(
     title: str,
     genre: str | None = None,
     content_type: str | None = None,
@@ -25,34 +37,74 @@ def add_content(
     notes: str | None = None,
 ) -> Content:
     """
-    I wrote this function so the UI layer can add new Content
-    without knowing anything about SQL or the database.
+    I pulled the validation rules out of add_content() into this
+    function so the single and bulk paths always agree.
 
     It:
     - validates that the title is not empty
-    - builds a Content object (with a temporary id)
-    - calls content_repo.create_content()
-    - returns the saved Content (with real id from SQLite)
+    - trims the optional text fields (ValueError if one is not text)
+    - returns a Content object with a temporary id of 0
     """
-    cleaned_title = title.strip()
+    cleaned_title = clean_text(title, "Title")
     if not cleaned_title:
         # I raise ValueError here so the UI can catch it
         # and display a friendly message to the user.
         raise ValueError("Title is required for content.")
 
-    new_content = Content(
+    if release_year is not None and (isinstance(release_year, bool) or not isinstance(release_year, int)):
+        raise ValueError(f"Release year must be a whole number, got {release_year!r}.")
+
+    return Content(
         id=0,  # temporary; real id will come from the database
         title=cleaned_title,
-        genre=genre.strip() if genre else None,
-        content_type=content_type.strip() if content_type else None,
+        genre=clean_text(genre, "Genre"),
+        content_type=clean_text(content_type, "Content type"),
         release_year=release_year,
-        notes=notes.strip() if notes else None,
+        notes=clean_text(notes, "Notes"),
     )
 
+
+def add_content(
+    title: str,
+    genre: str | None = None,
+    content_type: str | None = None,
+    release_year: int | None = None,
+    notes: str | None = None,
+) -> Content:
+    """
+    I wrote this function so the UI layer can add new Content
+    without knowing anything about SQL or the database.
+
+    It:
+    - validates the fields with build_content()
+    - calls content_repo.create_content()
+    - returns the saved Content (with real id from SQLite)
+    """
+    new_content = build_content(title, genre, content_type, release_year, notes)
+
     saved_content = content_repo.create_content(new_content)
     return saved_content
 
 
+def add_content_bulk(
+    contents: Iterable[Content],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so big catalogs can be loaded in one
+    transaction instead of one commit per title.
+
+    Every item goes through the same rules as add_content(). A
+    ValueError stops the load and rolls back the chunk in progress.
+    It returns the new ids in input order.
+    """
+    cleaned = (
+        build_content(c.title, c.genre, c.content_type, c.release_year, c.notes)
+        for c in contents
+    )
+    return content_repo.create_many_content(cleaned, chunk_size)
+
+
 def get_content(content_id: int) -> Optional[Content]:
     """
     I wrote this function so the UI can ask for a single Content
@@ -78,3 +130,75 @@ def list_contents() -> List[Content]:
     sorting, filtering, or formatting logic here later.
     """
     return content_repo.list_all_content()
+
+
+def iter_contents(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Content]:
+    """
+    I wrote this function for callers that walk the whole catalog
+    (reports, exports) so they get one Content at a time instead of
+    a list of everything.
+    """
+    return content_repo.iter_all_content(batch_size)
+
+
+def list_contents_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    genre: str | None = None,
+    content_type: str | None = None,
+) -> Page[Content]:
+    """
+    I wrote this function so the menu (or an API) can page through
+    content with keyset pagination. Pass the next_token or prev_token
+    of the previous Page to move forward or back; the same filters
+    must be passed on every call.
+    """
+    filters = {"genre": genre, "content_type": content_type}
+    return content_repo.list_content_page(token, limit, filters)
+
+
+def build_search_query(text: str, prefix_last: bool = True) -> str:
+    """
+    I wrote this helper to turn what a user types into a safe FTS5
+    query, so quotes, dashes or words like NOT never reach FTS5 as
+    syntax.
+
+    It:
+    - keeps only the words (letters and digits), each one quoted
+    - requires every word to match (FTS5 ANDs them)
+    - turns "word*" into a prefix match
+    - with prefix_last=True also treats the last word as a prefix, so
+      "star wa" finds "Star Wars" while the user is still typing
+    """
+    words = _SEARCH_WORD.findall(text or "")
+    if not words:
+        raise ValueError("Search text must contain at least one letter or digit.")
+
+    parts = []
+    for position, (word, star) in enumerate(words):
+        is_last = position == len(words) - 1
+        wildcard = "*" if star or (prefix_last and is_last) else ""
+        parts.append(f'"{word}"{wildcard}')
+    return " ".join(parts)
+
+
+def search_content(
+    text: str,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    prefix_last: bool = True,
+) -> List[Content]:
+    """
+    I wrote this function so the rights team can find titles by what
+    they remember instead of by id. It searches title, notes, genre and
+    the terms of each title's licenses, and returns the best matches
+    first (ranked with bm25, title hits weighted highest).
+
+    While licenses are sharded the terms index in the main database no
+    longer follows them, so only title, notes and genre are searched.
+    """
+    if limit <= 0 or limit > MAX_SEARCH_LIMIT:
+        raise ValueError(f"Search limit must be between 1 and {MAX_SEARCH_LIMIT}.")
+
+    return content_repo.search_content(
+        build_search_query(text, prefix_last), limit, include_terms=not sharding_enabled()
+    )
@@ -11,50 +11,84 @@ This lets me:
 - keep SQL out of the UI
 """
 
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 from src.models.distributor import Distributor
 from src.persistence import distributor_repo
+from src.persistence.db import FETCH_BATCH_SIZE
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page
+from src.utils import clean_text
 
 
-def add_distributor(
+def build_distributor(
     name: str,
     contact_email: str | None = None,
     region: str | None = None,
 ) -> Distributor:
     """
-    I wrote this function so the UI can add new distributors
-    without talking to the repository or SQL directly.
+    I pulled the validation rules out of add_distributor() into this
+    function so the single and bulk paths always agree.
 
     It:
     - validates that the name is not empty
     - does a simple check on the email (if provided)
-    - builds a Distributor object (with a temporary id)
-    - calls distributor_repo.create_distributor()
-    - returns the saved Distributor (with real id from SQLite)
+    - returns a Distributor object with a temporary id of 0
     """
-    cleaned_name = name.strip()
+    cleaned_name = clean_text(name, "Distributor name")
     if not cleaned_name:
         raise ValueError("Distributor name is required.")
 
-    cleaned_email = contact_email.strip() if contact_email else None
+    cleaned_email = clean_text(contact_email, "Contact email")
     if cleaned_email and "@" not in cleaned_email:
         # Simple validation so obviously bad emails can be caught
         raise ValueError("Contact email must contain '@' if provided.")
 
-    cleaned_region = region.strip() if region else None
+    cleaned_region = clean_text(region, "Region")
 
-    new_distributor = Distributor(
+    return Distributor(
         id=0,  # temporary; real id will come from the database
         name=cleaned_name,
         contact_email=cleaned_email,
         region=cleaned_region,
     )
 
+
+def add_distributor(
+    name: str,
+    contact_email: str | None = None,
+    region: str | None = None,
+) -> Distributor:
+    """
+    I wrote this function so the UI can add new distributors
+    without talking to the repository or SQL directly.
+
+    It:
+    - validates the fields with build_distributor()
+    - calls distributor_repo.create_distributor()
+    - returns the saved Distributor (with real id from SQLite)
+    """
+    new_distributor = build_distributor(name, contact_email, region)
+
     saved_distributor = distributor_repo.create_distributor(new_distributor)
     return saved_distributor
 
 
+def add_distributor_bulk(
+    distributors: Iterable[Distributor],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so many distributors can be loaded in one
+    transaction. Every item goes through the same rules as
+    add_distributor(), and the new ids come back in input order.
+    """
+    cleaned = (
+        build_distributor(d.name, d.contact_email, d.region)
+        for d in distributors
+    )
+    return distributor_repo.create_many_distributors(cleaned, chunk_size)
+
+
 def get_distributor(distributor_id: int) -> Optional[Distributor]:
     """
     I wrote this function so the UI can ask for a single Distributor
@@ -77,3 +111,24 @@ def list_distributors() -> List[Distributor]:
     or filtering logic here later.
     """
     return distributor_repo.list_all_distributors()
+
+
+def iter_distributors(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Distributor]:
+    """
+    I wrote this function so callers can walk every distributor one
+    at a time instead of building a list of all of them.
+    """
+    return distributor_repo.iter_all_distributors(batch_size)
+
+
+def list_distributors_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    region: str | None = None,
+) -> Page[Distributor]:
+    """
+    I wrote this function so distributors can be shown one page at a
+    time, optionally only for one region. Pass the tokens of the
+    previous Page to move forward or back.
+    """
+    return distributor_repo.list_distributors_page(token, limit, {"region": region})
@@ -0,0 +1,257 @@
+"""
+I created this module to dump the whole catalog (content, distributors
+and licenses) to files for partners and the warehouse, without ever
+holding a table in memory.
+
+The pipeline is:
+- one read connection per table, all on the same snapshot
+  (db.snapshot_connections), so the files agree with each other even
+  while the app keeps writing
+- the tables are dumped in parallel threads, fetchmany() batch by batch,
+  straight from cursor tuples (no model objects)
+- each batch is encoded as JSONL or CSV in one go and written through a
+  large file buffer, optionally gzip-compressed
+- a manifest.json lists every file with its row count, size (on disk
+  and uncompressed) and SHA-256, plus the change-log seq the snapshot
+  was taken at
+
+Files are named after the import kinds (content.jsonl, licenses.csv.gz,
+...) and keep the original ids. A dump is not a backup, though:
+import_service gives every row a new id, so licenses only point at the
+right content and distributors if the ids line up with no gaps. Use
+backup_service to copy the database itself. Each file is written under
+a .part name and renamed once complete.
+
+Usage from the project root:
+
+    python -m src.services.export_service dumps/2024-06-01 --format csv --gzip
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, List
+
+from src.persistence import db
+from src.persistence.sharding import require_unsharded
+
+
+# Export kind -> (table, columns). The columns follow the models'
+# to_dict() keys, which is also what the import expects.
+EXPORT_TABLES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "content": ("content", ("id", "title", "genre", "content_type", "release_year", "notes")),
+    "distributors": ("distributor", ("id", "name", "contact_email", "region")),
+    "licenses": (
+        "license_xref",
+        ("id", "content_id", "distributor_id", "start_date", "end_date", "terms"),
+    ),
+}
+FORMATS = ("jsonl", "csv")
+DEFAULT_BATCH_SIZE = 5_000
+WRITE_BUFFER_SIZE = 1 << 20   # bytes
+GZIP_LEVEL = 6
+MANIFEST_NAME = "manifest.json"
+
+
+class _ChecksumWriter:
+    # I sit between the (optional) gzip layer and the file so the
+    # checksum and size cover exactly the bytes that end up on disk.
+    def __init__(self, raw: io.BufferedWriter):
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._raw.write(data)
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+
+def _jsonl_encoder(columns: tuple[str, ...]) -> Callable[[List[tuple]], bytes]:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def encode(rows: List[tuple]) -> bytes:
+        return "".join([dumps(dict(zip(columns, row))) + "\n" for row in rows]).encode("utf-8")
+
+    return encode
+
+
+def _csv_encoder(columns: tuple[str, ...]) -> Callable[[List[tuple]], bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def encode(rows: Iterable[tuple]) -> bytes:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    return encode
+
+
+def export_file_name(kind: str, fmt: str, compress: bool) -> str:
+    return f"{kind}.{fmt}" + (".gz" if compress else "")
+
+
+def _dump_table(
+    conn: sqlite3.Connection,
+    kind: str,
+    path: Path,
+    fmt: str,
+    compress: bool,
+    gzip_level: int,
+    batch_size: int,
+) -> dict:
+    table, columns = EXPORT_TABLES[kind]
+    encode = _jsonl_encoder(columns) if fmt == "jsonl" else _csv_encoder(columns)
+    part = path.with_name(path.name + ".part")
+    started = time.perf_counter()
+    rows = raw_bytes = 0
+
+    cursor = conn.cursor()
+    cursor.row_factory = None   # plain tuples are all the encoders need
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+
+    with open(part, "wb", buffering=WRITE_BUFFER_SIZE) as raw:
+        sink = _ChecksumWriter(raw)
+        # mtime=0 keeps the gzip header, and so the checksum, the same
+        # for the same data.
+        out = gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=gzip_level, mtime=0) if compress else sink
+        try:
+            if fmt == "csv":
+                raw_bytes += out.write(encode([columns]))
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                raw_bytes += out.write(encode(batch))
+                rows += len(batch)
+        finally:
+            if compress:
+                out.close()
+
+    os.replace(part, path)
+    return {
+        "file": path.name,
+        "table": table,
+        "rows": rows,
+        "bytes": sink.bytes,
+        "raw_bytes": raw_bytes,
+        "sha256": sink.sha256.hexdigest(),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def export_catalog(
+    out_dir: Path,
+    fmt: str = "jsonl",
+    compress: bool = False,
+    kinds: Iterable[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    gzip_level: int = GZIP_LEVEL,
+) -> dict:
+    """
+    I wrote this function to dump the catalog into `out_dir`.
+
+    It:
+    - exports every kind in EXPORT_TABLES (or just `kinds`) as JSONL or
+      CSV, gzip-compressed if `compress` is set
+    - reads all tables from one consistent snapshot, in parallel
+    - writes manifest.json last and returns it as a dictionary
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}. Choose one of: {', '.join(FORMATS)}.")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer.")
+    kinds = list(EXPORT_TABLES if kinds is None else kinds)
+    unknown = [kind for kind in kinds if kind not in EXPORT_TABLES]
+    if unknown or not kinds:
+        raise ValueError(f"Choose export kinds from: {', '.join(EXPORT_TABLES)}.")
+    if "licenses" in kinds:
+        # One snapshot cannot span the shard files.
+        require_unsharded("Exporting licenses")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    with db.snapshot_connections(len(kinds)) as conns:
+        # The last change-log seq in this snapshot: a consumer loading
+        # the dump continues from here (see change_log_service).
+        (change_seq,) = conns[0].execute(
+            "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'change_log'), 0)"
+        ).fetchone()
+        with ThreadPoolExecutor(len(kinds), thread_name_prefix="media-export") as pool:
+            futures = {
+                kind: pool.submit(
+                    _dump_table, conn, kind, out_dir / export_file_name(kind, fmt, compress),
+                    fmt, compress, gzip_level, batch_size,
+                )
+                for kind, conn in zip(kinds, conns)
+            }
+            files = {kind: future.result() for kind, future in futures.items()}
+
+    seconds = time.perf_counter() - started
+    total_rows = sum(entry["rows"] for entry in files.values())
+    total_bytes = sum(entry["bytes"] for entry in files.values())
+    raw_bytes = sum(entry["raw_bytes"] for entry in files.values())
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "format": fmt,
+        "compressed": compress,
+        "change_seq": change_seq,
+        "files": files,
+        "rows": total_rows,
+        "bytes": total_bytes,
+        "raw_bytes": raw_bytes,
+        "seconds": seconds,
+        "rows_per_second": total_rows / seconds if seconds else 0.0,
+        # Throughput counts uncompressed bytes, so gzip and plain runs compare.
+        "mb_per_second": raw_bytes / 1e6 / seconds if seconds else 0.0,
+    }
+
+    manifest_path = out_dir / MANIFEST_NAME
+    part = manifest_path.with_name(MANIFEST_NAME + ".part")
+    part.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(part, manifest_path)
+    return manifest
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Dump the licensing catalog to JSONL/CSV files.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress every file")
+    parser.add_argument("--gzip-level", type=int, default=GZIP_LEVEL)
+    parser.add_argument("--kinds", nargs="+", choices=sorted(EXPORT_TABLES), default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db.init_db()
+    manifest = export_catalog(
+        args.out_dir, args.format, args.gzip, args.kinds, args.batch_size, args.gzip_level
+    )
+    for kind, entry in manifest["files"].items():
+        print(f"{entry['file']:<22} {entry['rows']:>12,} rows {entry['bytes'] / 1e6:>10.1f} MB")
+    print(
+        f"Done in {manifest['seconds']:.1f}s: {manifest['rows']:,} rows, "
+        f"{manifest['mb_per_second']:.1f} MB/s -> {args.out_dir / MANIFEST_NAME}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+I created this module to load catalog and rights feeds from CSV or
+JSONL files without going through the interactive menu.
+
+The pipeline is:
+- read_records() streams one record at a time from the file
+- each record is mapped onto a model with its from_dict() method
+- the same rules as the add_* service functions validate it
+- valid rows are inserted in chunks with the repos' create_many_* functions
+- invalid rows are written to a rejects file with the reason
+
+Only one chunk is held in memory at a time, so memory use does not grow
+with the size of the file.
+
+Usage from the project root:
+
+    python -m src.services.import_service content catalog.csv
+    python -m src.services.import_service licenses rights.jsonl --chunk-size 10000
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, TextIO, Tuple
+
+from src.models.content import Content
+from src.models.distributor import Distributor
+from src.models.license_xref import LicenseXref
+from src.persistence import content_repo, distributor_repo
+from src.persistence.db import init_db
+from src.persistence.sharding import license_store
+from src.services import content_service, distributor_service, license_service
+
+
+DEFAULT_CHUNK_SIZE = 5_000
+PROGRESS_EVERY = 50_000
+
+# Columns that arrive as text in a CSV file but are integers in the model.
+_INT_FIELDS = {
+    "content": ("release_year",),
+    "distributors": (),
+    "licenses": ("content_id", "distributor_id"),
+}
+
+
+class ImportStats:
+    """
+    I use this small class to keep running totals while an import runs,
+    so the progress output and the final summary come from one place.
+    """
+
+    def __init__(self) -> None:
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.read / elapsed if elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"read {self.read:,} | inserted {self.inserted:,} | "
+            f"rejected {self.rejected:,} | {self.rows_per_second:,.0f} rows/s"
+        )
+
+
+def _open_text(path: Path) -> TextIO:
+    # I let .gz feeds through transparently since partners often send them.
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _feed_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    if suffixes and suffixes[-1] == ".csv":
+        return "csv"
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path.name}; use .csv or .jsonl.")
+
+
+def read_records(path: Path) -> Iterator[Tuple[int, dict]]:
+    """
+    I wrote this generator to stream a CSV or JSONL feed one record at
+    a time. It yields (line_number, record) pairs so rejects can point
+    back at the exact line in the source file.
+
+    Records that cannot even be parsed are yielded as an
+    {"_parse_error": ...} dict so they end up in the rejects file too.
+    """
+    path = Path(path)
+    fmt = _feed_format(path)
+
+    with _open_text(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {"_parse_error": str(e), "_raw": line.rstrip("\n")}
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, {"_parse_error": "expected a JSON object", "_raw": line.rstrip("\n")}
+                    continue
+                yield line_number, record
+
+
+def _normalize(record: dict, int_fields: Tuple[str, ...]) -> dict:
+    if "_parse_error" in record:
+        raise ValueError(record["_parse_error"])
+
+    data = {}
+    for key, value in record.items():
+        if key is None:
+            raise ValueError("Row has more values than the header has columns.")
+        if isinstance(value, str):
+            value = value.strip() or None
+        data[key.strip()] = value
+
+    for field in int_fields:
+        if data.get(field) is not None:
+            try:
+                data[field] = int(data[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be a whole number, got {data[field]!r}.") from None
+
+    # Ids are always assigned by the database, so any id in the feed is ignored.
+    data["id"] = 0
+    return data
+
+
+def _to_content(data: dict) -> Content:
+    c = Content.from_dict(data)
+    return content_service.build_content(c.title, c.genre, c.content_type, c.release_year, c.notes)
+
+
+def _to_distributor(data: dict) -> Distributor:
+    d = Distributor.from_dict(data)
+    return distributor_service.build_distributor(d.name, d.contact_email, d.region)
+
+
+def _to_license(data: dict) -> LicenseXref:
+    lic = LicenseXref.from_dict(data)
+    return license_service.build_license(
+        lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms
+    )
+
+
+def _check_license_chunk(chunk: List[Tuple[int, dict, LicenseXref]]):
+    # The reference and overlap checks need the database, so I run them
+    # for the whole chunk at once (one query per table plus one overlap
+    # query) and throw the results away afterwards to keep memory flat.
+    results = license_service.validate_license_batch([lic for _, _, lic in chunk])
+    accepted, rejected = [], []
+    for (line_number, record, lic), result in zip(chunk, results):
+        if isinstance(result, ValueError):
+            rejected.append((line_number, record, str(result)))
+        else:
+            accepted.append((line_number, record, lic))
+    return accepted, rejected
+
+
+def _create_many_licenses(licenses, chunk_size: int | None) -> List[int]:
+    # Looked up per call, so a load goes to the shards when sharding is on.
+    return license_store().create_many_licenses(licenses, chunk_size)
+
+
+# kind -> (record to validated model, bulk insert, optional chunk-level check)
+_PIPELINES: dict[str, Tuple[Callable, Callable, Callable | None]] = {
+    "content": (_to_content, content_repo.create_many_content, None),
+    "distributors": (_to_distributor, distributor_repo.create_many_distributors, None),
+    "licenses": (_to_license, _create_many_licenses, _check_license_chunk),
+}
+
+
+def _write_reject(rejects: TextIO, line_number: int, record: dict, error: str) -> None:
+    rejects.write(json.dumps({"line": line_number, "error": error, "record": record}, default=str))
+    rejects.write("\n")
+
+
+def import_file(
+    kind: str,
+    path: Path,
+    rejects_path: Path | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Callable[[ImportStats], None] | None = None,
+    progress_every: int = PROGRESS_EVERY,
+) -> ImportStats:
+    """
+    I wrote this function to run the whole import pipeline for one file.
+
+    It:
+    - streams records from `path` with read_records()
+    - maps and validates each one for the given kind
+      ("content", "distributors" or "licenses")
+    - inserts valid rows chunk_size at a time, one transaction per chunk
+    - appends invalid rows to `rejects_path` as JSONL
+      (defaults to <path>.rejects.jsonl)
+    - calls `progress` every progress_every rows and returns the final stats
+    """
+    if kind not in _PIPELINES:
+        raise ValueError(f"Unknown import kind {kind!r}. Choose one of: {', '.join(_PIPELINES)}.")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    path = Path(path)
+    if rejects_path is None:
+        rejects_path = path.with_name(path.name + ".rejects.jsonl")
+
+    to_model, insert_many, check_chunk = _PIPELINES[kind]
+    int_fields = _INT_FIELDS[kind]
+    stats = ImportStats()
+    chunk: List[Tuple[int, dict, object]] = []
+
+    def flush() -> None:
+        accepted = chunk
+        if check_chunk is not None:
+            accepted, rejected = check_chunk(chunk)
+            for line_number, record, error in rejected:
+                _write_reject(rejects, line_number, record, error)
+            stats.rejected += len(rejected)
+        if accepted:
+            insert_many((model for _, _, model in accepted), None)
+            stats.inserted += len(accepted)
+        chunk.clear()
+
+    with open(rejects_path, "w", encoding="utf-8") as rejects:
+        for line_number, record in read_records(path):
+            stats.read += 1
+            try:
+                model = to_model(_normalize(record, int_fields))
+            except (KeyError, TypeError, ValueError) as e:
+                message = f"missing column {e}" if isinstance(e, KeyError) else str(e)
+                _write_reject(rejects, line_number, record, message)
+                stats.rejected += 1
+            else:
+                chunk.append((line_number, record, model))
+                if len(chunk) >= chunk_size:
+                    flush()
+
+            if progress is not None and stats.read % progress_every == 0:
+                progress(stats)
+
+        if chunk:
+            flush()
+
+    return stats
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a CSV/JSONL feed into the licensing database.")
+    parser.add_argument("kind", choices=sorted(_PIPELINES))
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--rejects", type=Path, default=None, help="where to write rejected rows")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    init_db()
+    stats = import_file(
+        args.kind,
+        args.path,
+        rejects_path=args.rejects,
+        chunk_size=args.chunk_size,
+        progress=lambda s: print(s, file=sys.stderr),
+    )
+    print(f"Done in {stats.elapsed:.1f}s: {stats}")
+    return 0 if stats.rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+I created this module for the dashboard counts:
+- licenses per distributor
+- distinct distributors per title
+- licenses active today (or on a given day) per title
+
+They are read from summary tables that triggers keep current on every
+insert, update and delete of license_xref, so each call costs one
+primary-key lookup however many licenses there are. The active count
+is maintained for one day; asking for another day counts that title's
+active licenses on the spot, without writing anything.
+
+Rolling the maintained day over is a maintenance step, for example
+from a daily cron job; it only recounts titles with a window starting
+or ending since the last roll-over:
+
+    python -m src.services.license_counts_service advance
+
+The summaries live next to license_xref in the main database, so
+none of this is available while licenses are sharded.
+
+The rebuild/verify command recomputes everything from license_xref:
+
+    python -m src.services.license_counts_service verify
+    python -m src.services.license_counts_service rebuild
+"""
+
+import argparse
+import sys
+from datetime import date
+from typing import List
+
+from src.persistence import license_counts_repo
+from src.persistence.db import init_db
+from src.persistence.sharding import require_unsharded
+from src.utils import parse_date, to_epoch_day
+
+
+def count_licenses_for_distributor(distributor_id: int) -> int:
+    """I return how many licenses the distributor holds."""
+    if distributor_id <= 0:
+        raise ValueError("Distributor id must be a positive integer.")
+    require_unsharded("License counts")
+    return license_counts_repo.get_distributor_license_count(distributor_id)
+
+
+def get_content_license_counts(content_id: int, on_date: str | None = None) -> dict:
+    """
+    I return the licenses, distinct distributors and active licenses
+    of one title; "active" means on on_date ("YYYY-MM-DD", today if
+    not given).
+    """
+    if content_id <= 0:
+        raise ValueError("Content id must be a positive integer.")
+    require_unsharded("License counts")
+
+    day = to_epoch_day(parse_date(on_date, "Date") or date.today(), 0)
+    licenses, distributors, active = license_counts_repo.get_content_license_counts(content_id, day)
+    return {"licenses": licenses, "distributors": distributors, "active_licenses": active}
+
+
+def count_distributors_for_content(content_id: int) -> int:
+    """I return how many different distributors license the title."""
+    return get_content_license_counts(content_id)["distributors"]
+
+
+def count_active_licenses_for_content(content_id: int, on_date: str | None = None) -> int:
+    """I return how many of the title's licenses are active on on_date (today if not given)."""
+    return get_content_license_counts(content_id, on_date)["active_licenses"]
+
+
+def verify_license_counts() -> List[dict]:
+    """
+    I recompute the summaries from scratch and return every key whose
+    maintained row differs (an empty list means they all match).
+    """
+    require_unsharded("License counts")
+    return license_counts_repo.diff_license_counts()
+
+
+def advance_active_day(on_date: str | None = None) -> int:
+    """
+    I roll the maintained active counts over to on_date (today if not
+    given) and return how many titles were recounted.
+    """
+    require_unsharded("License counts")
+    day = to_epoch_day(parse_date(on_date, "Date") or date.today(), 0)
+    return license_counts_repo.advance_active_day(day)
+
+
+def rebuild_license_counts() -> None:
+    """I recompute the summaries from scratch, counting active licenses as of today."""
+    require_unsharded("License counts")
+    license_counts_repo.rebuild_license_counts(to_epoch_day(date.today(), 0))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify, rebuild or advance the license count summaries.")
+    parser.add_argument("command", choices=("verify", "rebuild", "advance"))
+    args = parser.parse_args(argv)
+
+    init_db()
+    if args.command == "advance":
+        recounted = advance_active_day()
+        print(f"Moved the active counts to today; {recounted} title(s) recounted.")
+        return 0
+    if args.command == "rebuild":
+        rebuild_license_counts()
+        print("Rebuilt the license count summaries.")
+
+    differences = verify_license_counts()
+    for diff in differences:
+        print(f"{diff['table']} {diff['key']}: maintained {diff['maintained']}, expected {diff['expected']}")
+    print(f"{len(differences)} difference(s) found.")
+    return 0 if not differences else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+I created this module for reporting questions that look at every
+license at once, such as "licenses per distributor", "titles with no
+active licenses" or "expirations by month".
+
+Instead of a List[LicenseXref], LicenseFrame keeps one integer array per
+column:
+- id, content_id, distributor_id
+- start_day and end_day as epoch days (open ends use the sentinels in
+  src/utils.py)
+
+Terms are text and rarely needed for counting, so they are only loaded
+on request. The arrays are NumPy arrays when NumPy is installed and
+stdlib array("q") columns otherwise; the methods give the same answers
+either way.
+"""
+
+from array import array
+from collections import Counter
+from itertools import compress, islice
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.persistence.sharding import license_store
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, from_epoch_day, to_epoch_day
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array module is the fallback.
+    np = None
+
+
+COLUMNS = ("id", "content_id", "distributor_id", "start_day", "end_day")
+LOAD_BATCH_SIZE = 10_000
+TERMS_BATCH_SIZE = 50_000
+
+
+def _day(value) -> int:
+    return value if isinstance(value, int) else to_epoch_day(value, OPEN_START_DAY)
+
+
+class LicenseFrame:
+    """
+    I wrote this class as a read-only, column-oriented snapshot of
+    license_xref.
+
+    Masks (from the mask_* methods) are NumPy bool arrays or lists of
+    bools, depending on the backend, and are passed back into filter().
+    """
+
+    def __init__(self, columns: Dict[str, Sequence[int]], use_numpy: bool | None = None):
+        if use_numpy is None:
+            use_numpy = np is not None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed; use use_numpy=False.")
+        if set(columns) != set(COLUMNS):
+            raise ValueError(f"LicenseFrame needs exactly these columns: {', '.join(COLUMNS)}.")
+
+        self.use_numpy = use_numpy
+        self._columns = {}
+        for name in COLUMNS:
+            values = columns[name]
+            if use_numpy:
+                if isinstance(values, array) and values.typecode == "q":
+                    values = np.frombuffer(values, dtype=np.int64)  # no copy
+                else:
+                    values = np.asarray(values, dtype=np.int64)
+            elif not (isinstance(values, array) and values.typecode == "q"):
+                values = array("q", values)
+            self._columns[name] = values
+
+        lengths = {len(v) for v in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All LicenseFrame columns must have the same length.")
+        self._terms: List[Optional[str]] | None = None
+
+    # ------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------
+    @classmethod
+    def load(cls, batch_size: int = LOAD_BATCH_SIZE, use_numpy: bool | None = None) -> "LicenseFrame":
+        """
+        I load the snapshot in one streaming pass over license_xref.
+        Rows go straight from the cursor into the column arrays, so no
+        LicenseXref objects are ever created.
+        """
+        columns = {name: array("q") for name in COLUMNS}
+        appends = [columns[name].append for name in COLUMNS]
+        add_id, add_content, add_distributor, add_start, add_end = appends
+
+        for license_id, content_id, distributor_id, start_day, end_day in (
+            license_store().iter_license_columns(batch_size)
+        ):
+            add_id(license_id)
+            add_content(content_id)
+            add_distributor(distributor_id)
+            add_start(start_day)
+            add_end(end_day)
+
+        return cls(columns, use_numpy)
+
+    def __len__(self) -> int:
+        return len(self._columns["id"])
+
+    def __repr__(self) -> str:
+        backend = "numpy" if self.use_numpy else "array"
+        return f"LicenseFrame(rows={len(self)}, backend={backend!r})"
+
+    def column(self, name: str):
+        """I return one column (a NumPy array or an array("q"))."""
+        return self._columns[name]
+
+    # ------------------------------------------------------------
+    # Masks and filtering
+    # ------------------------------------------------------------
+    def mask_equals(self, name: str, value: int):
+        values = self._columns[name]
+        if self.use_numpy:
+            return values == value
+        return [v == value for v in values]
+
+    def mask_isin(self, name: str, wanted: Iterable[int]):
+        values = self._columns[name]
+        if self.use_numpy:
+            return np.isin(values, np.fromiter(wanted, dtype=np.int64))
+        wanted = set(wanted)
+        return [v in wanted for v in values]
+
+    def mask_active_on(self, day):
+        """Mask of licenses whose window contains `day`."""
+        return self.mask_overlapping(day, day)
+
+    def mask_overlapping(self, window_start, window_end):
+        """Mask of licenses whose window overlaps [window_start, window_end]."""
+        first = _day(window_start)
+        last = window_end if isinstance(window_end, int) else to_epoch_day(window_end, OPEN_END_DAY)
+        starts, ends = self._columns["start_day"], self._columns["end_day"]
+        if self.use_numpy:
+            return (starts <= last) & (ends >= first)
+        return [s <= last and e >= first for s, e in zip(starts, ends)]
+
+    def filter(self, mask) -> "LicenseFrame":
+        """I return a new frame with only the rows where mask is true."""
+        if self.use_numpy:
+            mask = np.asarray(mask, dtype=bool)
+            columns = {name: values[mask] for name, values in self._columns.items()}
+        else:
+            columns = {
+                name: array("q", compress(values, mask))
+                for name, values in self._columns.items()
+            }
+        frame = LicenseFrame(columns, self.use_numpy)
+        if self._terms is not None:
+            frame._terms = list(compress(self._terms, mask))
+        return frame
+
+    def active_on(self, day) -> "LicenseFrame":
+        """Shortcut for filter(mask_active_on(day))."""
+        return self.filter(self.mask_active_on(day))
+
+    # ------------------------------------------------------------
+    # Aggregates and joins
+    # ------------------------------------------------------------
+    def count_by(self, name: str) -> Dict[int, int]:
+        """I return {value: number of rows} for one column, e.g. licenses per distributor."""
+        values = self._columns[name]
+        if self.use_numpy:
+            keys, counts = np.unique(values, return_counts=True)
+            return dict(zip(keys.tolist(), counts.tolist()))
+        return dict(Counter(values))
+
+    def count_by_end_month(self) -> Dict[str, int]:
+        """
+        I return {"YYYY-MM": number of licenses ending that month}, in
+        month order. Licenses without an end date are left out.
+        """
+        ends = self._columns["end_day"]
+        months: Counter = Counter()
+        if self.use_numpy:
+            closed = ends[ends != OPEN_END_DAY]
+            keys, counts = np.unique(
+                closed.astype("datetime64[D]").astype("datetime64[M]"), return_counts=True
+            )
+            months.update(dict(zip((str(k) for k in keys), counts.tolist())))
+        else:
+            # Far fewer distinct days than rows, so I only convert each day once.
+            for day, count in Counter(ends).items():
+                if day != OPEN_END_DAY:
+                    months[from_epoch_day(day).strftime("%Y-%m")] += count
+        return dict(sorted(months.items()))
+
+    def unique(self, name: str) -> set:
+        values = self._columns[name]
+        if self.use_numpy:
+            return set(np.unique(values).tolist())
+        return set(values)
+
+    def missing(self, name: str, ids: Iterable[int]) -> List[int]:
+        """
+        I return the ids that never appear in the column, sorted. For
+        example frame.active_on(d).missing("content_id", all_content_ids)
+        lists the titles with zero active licenses on day d.
+        """
+        values = self._columns[name]
+        if self.use_numpy:
+            wanted = np.fromiter(ids, dtype=np.int64)
+            return np.setdiff1d(wanted, values).tolist()
+        return sorted(set(ids) - set(values))
+
+    def lookup(self, name: str, mapping: Dict[int, object], default=None) -> list:
+        """
+        I join one id column against {id: value} and return the values
+        aligned with the rows, e.g. each license's distributor region.
+        """
+        values = self._columns[name]
+        if self.use_numpy and mapping:
+            keys = np.fromiter(mapping.keys(), dtype=np.int64, count=len(mapping))
+            order = np.argsort(keys)
+            keys = keys[order]
+            found_values = list(mapping.values())
+            positions = np.searchsorted(keys, values)
+            positions[positions == len(keys)] = 0
+            hit = keys[positions] == values
+            return [
+                found_values[order[p]] if h else default
+                for p, h in zip(positions.tolist(), hit.tolist())
+            ]
+        get = mapping.get
+        return [get(v, default) for v in values]
+
+    # ------------------------------------------------------------
+    # Lazy terms
+    # ------------------------------------------------------------
+    def terms(self) -> List[Optional[str]]:
+        """
+        I load the terms text for every row the first time it is asked
+        for, TERMS_BATCH_SIZE ids per query, and keep it afterwards.
+        """
+        if self._terms is None:
+            ids = self._columns["id"]
+            ids = ids.tolist() if self.use_numpy else ids
+            loaded: Dict[int, Optional[str]] = {}
+            iterator = iter(ids)
+            while True:
+                batch = list(islice(iterator, TERMS_BATCH_SIZE))
+                if not batch:
+                    break
+                loaded.update(license_store().get_terms(batch))
+            self._terms = [loaded.get(i) for i in ids]
+        return self._terms
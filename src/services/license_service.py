@@ -3,18 +3,70 @@ I created this module to hold the business logic for LicenseXref.
 
 The service layer sits between:
 - the command-line UI (main.py)
-- the database layer (license_repo, content_repo, distributor_repo)
+- the database layer (license_repo, content_repo, distributor_repo;
+  sharded_license_repo instead of license_repo when licenses are sharded)
 
 This lets me:
 - validate that content and distributor ids are real
+- stop a distributor from holding two overlapping licenses for one title
 - keep SQL out of the UI
 - keep the license rules in one place
 """
 
-from typing import List, Optional
+from datetime import date, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
 
+from src.models.license_detail import LicenseDetail
 from src.models.license_xref import LicenseXref
 from src.persistence import license_repo, content_repo, distributor_repo
+from src.persistence.db import FETCH_BATCH_SIZE
+from src.persistence.pagination import DEFAULT_PAGE_SIZE, Page
+from src.persistence.sharding import license_store
+from src.services import conflict_service
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, clean_text, parse_date, to_epoch_day
+
+# (content_id, distributor_id) -> windows accepted in this batch but not
+# inserted yet, as (start_day, end_day) pairs.
+PendingWindows = dict[tuple[int, int], list[tuple[int, int]]]
+
+# How many licenses of a bulk load are validated and written together.
+REFERENCE_BATCH_SIZE = 1_000
+
+
+def build_license(
+    content_id: int,
+    distributor_id: int,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    terms: str | None = None,
+) -> LicenseXref:
+    """
+    I pulled the field rules out of add_license() into this function
+    so the single and bulk paths always agree. It does not touch the
+    database; the existence checks are done by the callers.
+
+    Dates must be "YYYY-MM-DD" (or empty for an open-ended window) and
+    are stored in that exact form so they sort and compare correctly.
+    """
+    if content_id <= 0 or distributor_id <= 0:
+        raise ValueError("Content id and distributor id must be positive integers.")
+
+    start = parse_date(start_date, "Start date")
+    end = parse_date(end_date, "End date")
+    if start and end and end < start:
+        raise ValueError("End date cannot be before start date.")
+
+    return LicenseXref(
+        id=0,  # temporary; real id will come from the database
+        content_id=content_id,
+        distributor_id=distributor_id,
+        start_date=start.isoformat() if start else None,
+        end_date=end.isoformat() if end else None,
+        terms=clean_text(terms, "Terms"),
+    )
+
+
 def add_license(
     content_id: int,
     distributor_id: int,
@@ -31,33 +83,226 @@ def add_license(
     - verifies that the content exists
     - verifies that the distributor exists
     - builds a LicenseXref object (with a temporary id)
-    - calls license_repo.create_license()
+    - inserts it only if the window does not overlap another license
+      for the same content and distributor; the check and the insert
+      share one write transaction, so two writers cannot both pass it
     - returns the saved LicenseXref (with real id from SQLite)
     """
-    if content_id <= 0 or distributor_id <= 0:
-        raise ValueError("Content id and distributor id must be positive integers.")
+    new_license = build_license(content_id, distributor_id, start_date, end_date, terms)
 
-    # I make sure the content exists before creating the license
-    content = content_repo.get_content_by_id(content_id)
-    if content is None:
+    # I make sure the content and distributor exist before creating the
+    # license. One query answers both without loading either record.
+    has_content, has_distributor = license_repo.references_exist(content_id, distributor_id)
+    if not has_content:
         raise ValueError(f"No content found with id {content_id}.")
-
-    # I make sure the distributor exists before creating the license
-    distributor = distributor_repo.get_distributor_by_id(distributor_id)
-    if distributor is None:
+    if not has_distributor:
         raise ValueError(f"No distributor found with id {distributor_id}.")
 
-    new_license = LicenseXref(
-        id=0,  # temporary; real id will come from the database
-        content_id=content_id,
-        distributor_id=distributor_id,
-        start_date=start_date,
-        end_date=end_date,
-        terms=terms.strip() if terms else None,
+    saved_license, conflicts = license_store().create_license_if_no_overlap(new_license)
+    if conflicts:
+        _raise_overlap(new_license, [c.id for c in conflicts])
+    return saved_license
+
+
+def _raise_overlap(lic: LicenseXref, conflict_ids: List[int]) -> None:
+    ids = ", ".join(str(i) for i in conflict_ids)
+    raise ValueError(
+        f"License window overlaps existing license(s) {ids} for content "
+        f"{lic.content_id} and distributor {lic.distributor_id}."
     )
 
-    saved_license = license_repo.create_license(new_license)
-    return saved_license
+
+def _check_no_overlap(lic: LicenseXref) -> None:
+    # I only look at this title's licenses for the same distributor, so
+    # the check stays cheap no matter how big license_xref gets.
+    conflicts = conflict_service.find_conflicting_licenses(
+        lic.content_id,
+        lic.distributor_id,
+        lic.start_date,
+        lic.end_date,
+        exclude_id=lic.id or None,
+    )
+    if conflicts:
+        _raise_overlap(lic, [c.id for c in conflicts])
+
+
+def _claim_window(lic: LicenseXref, pending: PendingWindows) -> None:
+    # Two licenses of the same batch must not overlap each other either.
+    start = to_epoch_day(lic.start_date, OPEN_START_DAY)
+    end = to_epoch_day(lic.end_date, OPEN_END_DAY)
+    windows = pending.setdefault((lic.content_id, lic.distributor_id), [])
+    if any(s <= end and start <= e for s, e in windows):
+        raise ValueError(
+            f"License window overlaps another license in this batch for content "
+            f"{lic.content_id} and distributor {lic.distributor_id}."
+        )
+    windows.append((start, end))
+
+
+def validate_license(
+    lic: LicenseXref,
+    known_content: set[int] | None = None,
+    known_distributors: set[int] | None = None,
+    pending: PendingWindows | None = None,
+    check_overlap: bool = True,
+    complete_references: bool = False,
+) -> LicenseXref:
+    """
+    I wrote this function so bulk loaders (and update_license) can run
+    the add_license() rules on one LicenseXref without inserting it.
+
+    The optional sets remember ids that were already confirmed, so a
+    deal with thousands of rows for the same title only looks it up once.
+    `pending` collects the windows of a batch that is not inserted yet,
+    so two rows of the same batch cannot overlap each other either.
+    check_overlap=False leaves the check against the database to the
+    caller. complete_references=True says the known_* sets hold every
+    existing id (from prefetch_references()), so a missing id is
+    rejected without another lookup.
+    It returns the cleaned LicenseXref (keeping lic.id) or raises ValueError.
+    """
+    cleaned = build_license(
+        lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms
+    )
+    cleaned.id = lic.id
+    if known_content is None:
+        known_content = set()
+    if known_distributors is None:
+        known_distributors = set()
+
+    if cleaned.content_id not in known_content:
+        if complete_references or not content_repo.content_exists(cleaned.content_id):
+            raise ValueError(f"No content found with id {cleaned.content_id}.")
+        known_content.add(cleaned.content_id)
+
+    if cleaned.distributor_id not in known_distributors:
+        if complete_references or not distributor_repo.distributor_exists(cleaned.distributor_id):
+            raise ValueError(f"No distributor found with id {cleaned.distributor_id}.")
+        known_distributors.add(cleaned.distributor_id)
+
+    if check_overlap:
+        _check_no_overlap(cleaned)
+    if pending is not None:
+        _claim_window(cleaned, pending)
+    return cleaned
+
+
+def prefetch_references(licenses: Iterable[LicenseXref]) -> tuple[set[int], set[int]]:
+    """
+    I wrote this function to resolve every content and distributor id a
+    batch of licenses refers to with one set-based query per table.
+
+    It returns (existing content ids, existing distributor ids), ready
+    to pass to validate_license() as its known_* sets, so validating the
+    batch needs no further lookups for ids that exist.
+    """
+    content_ids, distributor_ids = set(), set()
+    for lic in licenses:
+        content_ids.add(lic.content_id)
+        distributor_ids.add(lic.distributor_id)
+
+    return (
+        content_repo.existing_content_ids(content_ids),
+        distributor_repo.existing_distributor_ids(distributor_ids),
+    )
+
+
+def validate_license_batch(
+    licenses: List[LicenseXref],
+    pending: PendingWindows | None = None,
+    check_overlap: bool = True,
+) -> List[LicenseXref | ValueError]:
+    """
+    I wrote this function to run the add_license() rules on a batch
+    with a fixed number of queries: one per table for the references
+    and one set-based overlap check against the database, whatever the
+    batch size. Nothing is written and no connection is held afterwards.
+
+    It returns one entry per license, in input order: the cleaned
+    LicenseXref, or the ValueError that rejected it. Accepted windows
+    are added to `pending`, so later batches of the same load are
+    checked against them too. check_overlap=False skips the query
+    against the database (the licenses are still checked against
+    `pending`), for callers that run it inside their write transaction.
+    """
+    if pending is None:
+        pending = {}
+    known_content, known_distributors = prefetch_references(licenses)
+
+    results: List[LicenseXref | ValueError] = []
+    for lic in licenses:
+        try:
+            results.append(validate_license(
+                lic, known_content, known_distributors, check_overlap=False, complete_references=True
+            ))
+        except ValueError as e:
+            results.append(e)
+
+    cleaned = [r for r in results if isinstance(r, LicenseXref)]
+    overlaps = license_store().find_overlaps_for_batch(cleaned) if check_overlap else {}
+    position = 0
+    for index, result in enumerate(results):
+        if isinstance(result, ValueError):
+            continue
+        try:
+            if position in overlaps:
+                _raise_overlap(result, overlaps[position])
+            _claim_window(result, pending)
+        except ValueError as e:
+            results[index] = e
+        position += 1
+    return results
+
+
+def add_license_bulk(
+    licenses: Iterable[LicenseXref],
+    chunk_size: int | None = None,
+) -> List[int]:
+    """
+    I wrote this function so a whole rights deal can be loaded at once.
+    Every item goes through the same rules as add_license(), and the
+    new ids come back in input order.
+
+    The input is read in batches of REFERENCE_BATCH_SIZE licenses (or
+    chunk_size, if that is smaller), so memory stays flat however long
+    the deal is. Each batch:
+    - is validated with validate_license_batch(), references and
+      overlaps within the batch, before any lock is taken
+    - is checked against the database and inserted in one write
+      transaction, so a concurrent writer cannot sneak an overlapping
+      window in between
+
+    Earlier batches are already committed, so the in-transaction check
+    sees them and only the current batch's windows are kept in memory.
+    The first invalid license raises ValueError; batches that were
+    already written stay written.
+    """
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    batch_size = min(chunk_size or REFERENCE_BATCH_SIZE, REFERENCE_BATCH_SIZE)
+    iterator = iter(licenses)
+    new_ids: List[int] = []
+
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+
+        validated: List[LicenseXref] = []
+        for result in validate_license_batch(batch, {}, check_overlap=False):
+            if isinstance(result, ValueError):
+                raise result
+            validated.append(result)
+
+        ids, overlaps = license_store().create_many_licenses_if_no_overlap(validated)
+        if overlaps:
+            position = min(overlaps)
+            _raise_overlap(validated[position], overlaps[position])
+        new_ids.extend(ids)
+    return new_ids
+
+
 def get_license(license_id: int) -> Optional[LicenseXref]:
     """
     I wrote this function so the UI can ask for a single license
@@ -68,7 +313,7 @@ def get_license(license_id: int) -> Optional[LicenseXref]:
     if license_id <= 0:
         return None
 
-    return license_repo.get_license_by_id(license_id)
+    return license_store().get_license_by_id(license_id)
 
 
 def list_licenses() -> List[LicenseXref]:
@@ -81,16 +326,128 @@ def list_licenses() -> List[LicenseXref]:
     - filtering by distributor
     - filtering by active date range
     """
-    return license_repo.list_all_licenses()
+    return license_store().list_all_licenses()
+
+
+def iter_licenses(batch_size: int = FETCH_BATCH_SIZE) -> Iterator[LicenseXref]:
+    """
+    I wrote this function so reports over millions of licenses can
+    stream them one at a time instead of holding the full list.
+    """
+    return license_store().iter_all_licenses(batch_size)
+
+
+def list_licenses_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    content_id: int | None = None,
+    distributor_id: int | None = None,
+) -> Page[LicenseXref]:
+    """
+    I wrote this function so a UI built on licenses can show page 1
+    without loading every license. It can be narrowed to one content
+    item and/or one distributor; pass the tokens of the previous Page
+    to move forward or back.
+    """
+    filters = {"content_id": content_id, "distributor_id": distributor_id}
+    return license_store().list_licenses_page(token, limit, filters)
+def iter_license_details(
+    content_id: int | None = None,
+    distributor_id: int | None = None,
+    content_type: str | None = None,
+    region: str | None = None,
+    batch_size: int = FETCH_BATCH_SIZE,
+) -> Iterator[LicenseDetail]:
+    """
+    I wrote this function for screens and reports that print licenses
+    with their title and distributor name. Everything comes from one
+    JOIN query that is streamed, so there are no per-license lookups.
+    """
+    filters = {
+        "content_id": content_id,
+        "distributor_id": distributor_id,
+        "content_type": content_type,
+        "region": region,
+    }
+    return license_store().iter_license_details(filters, batch_size)
+
+
+def list_license_details_page(
+    token: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    content_id: int | None = None,
+    distributor_id: int | None = None,
+    content_type: str | None = None,
+    region: str | None = None,
+) -> Page[LicenseDetail]:
+    """
+    I wrote this function as the paged version of iter_license_details(),
+    with the same filters and the same tokens as list_licenses_page().
+    """
+    filters = {
+        "content_id": content_id,
+        "distributor_id": distributor_id,
+        "content_type": content_type,
+        "region": region,
+    }
+    return license_store().list_license_details_page(token, limit, filters)
+
+
+def list_active_licenses(on_date: str | None = None) -> List[LicenseXref]:
+    """
+    I wrote this function to list the licenses that are active on one
+    day ("YYYY-MM-DD", today if not given). Open-ended windows count as
+    active on their open side.
+    """
+    day = parse_date(on_date, "Date") or date.today()
+    return license_store().list_licenses_in_window(day.isoformat(), day.isoformat())
+
+
+def list_licenses_in_window(start_date: str | None, end_date: str | None) -> List[LicenseXref]:
+    """
+    I wrote this function to list licenses that are active at any point
+    between start_date and end_date (inclusive). Either side may be None
+    to leave the range open.
+    """
+    start = parse_date(start_date, "Start date")
+    end = parse_date(end_date, "End date")
+    if start and end and end < start:
+        raise ValueError("End date cannot be before start date.")
+
+    return license_store().list_licenses_in_window(
+        start.isoformat() if start else None,
+        end.isoformat() if end else None,
+    )
+
+
+def list_expiring_licenses(days: int, today: str | None = None) -> List[LicenseXref]:
+    """
+    I wrote this function for the "expiring in the next N days" view.
+    It returns licenses whose end date is between today and today + days,
+    soonest first.
+    """
+    if days < 0:
+        raise ValueError("Days must be zero or a positive number.")
+
+    first = parse_date(today, "Date") or date.today()
+    last = first + timedelta(days=days)
+    return license_store().list_licenses_ending_between(first.isoformat(), last.isoformat())
+
+
 def update_license(license_xref: LicenseXref) -> bool:
     """
     I wrote this function so I can update an existing license record.
 
-    For now it just forwards the call to license_repo.update_license(),
-    but I could later add more validation here (for example, checking
-    that content and distributor ids still exist).
+    It runs the same rules as add_license() (ids exist, valid dates, no
+    overlap with the other licenses for that content and distributor).
+    As in add_license(), the overlap check and the UPDATE run in one
+    write transaction.
     """
-    return license_repo.update_license(license_xref)
+    cleaned = validate_license(license_xref, check_overlap=False)
+    updated, conflicts = license_store().update_license_if_no_overlap(cleaned)
+    if conflicts:
+        _raise_overlap(cleaned, [c.id for c in conflicts])
+    return updated
 
 
 def delete_license(license_id: int) -> bool:
@@ -103,4 +460,4 @@ def delete_license(license_id: int) -> bool:
     if license_id <= 0:
         return False
 
-    return license_repo.delete_license(license_id)
+    return license_store().delete_license(license_id)
@@ -0,0 +1,173 @@
+"""
+I created this module to answer date-window questions about licenses in
+memory, for callers that already have (or can stream) every license and
+want to ask many questions of it, such as a report or an availability
+screen.
+
+LicenseWindowIndex is a centered interval tree over the license windows
+plus two sorted endpoint arrays:
+- "active on D" walks one root-to-leaf path of the tree
+- "overlaps [D1, D2]" is "active on D1" plus "starts in (D1, D2]"
+- "ends in [D1, D2]" is a binary search on the sorted end days
+
+Each of those costs O(log n + k) for k matches. The database has the
+equivalent indexed path in license_repo.list_licenses_in_window().
+
+A window that ends before it starts (old rows were never validated)
+contains no day. It is left out of the index, as it is left out of the
+license_window R*Tree, so it is never active, overlapping or ending.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, List, Tuple
+
+from src.models.license_xref import LicenseXref
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, to_epoch_day
+
+
+DayLike = int | str | date | None
+
+
+def _start_day(value: DayLike) -> int:
+    return value if isinstance(value, int) else to_epoch_day(value, OPEN_START_DAY)
+
+
+def _end_day(value: DayLike) -> int:
+    return value if isinstance(value, int) else to_epoch_day(value, OPEN_END_DAY)
+
+
+class LicenseWindowIndex:
+    """
+    I build this once from (license_id, start_day, end_day) triples and
+    then query it as often as I like. It keeps only ids and epoch days
+    in compact arrays, not LicenseXref objects.
+
+    Query methods take epoch days, date objects or "YYYY-MM-DD" strings
+    and return license ids (in no particular order).
+    """
+
+    def __init__(self, windows: Iterable[Tuple[int, int, int]]):
+        self._ids = array("q")
+        self._starts = array("q")
+        self._ends = array("q")
+        for license_id, start_day, end_day in windows:
+            if end_day < start_day:
+                # Empty; it would also never leave the left partition in _build().
+                continue
+            self._ids.append(license_id)
+            self._starts.append(start_day)
+            self._ends.append(end_day)
+
+        n = len(self._ids)
+        by_start = sorted(range(n), key=self._starts.__getitem__)
+        by_end = sorted(range(n), key=self._ends.__getitem__)
+
+        # Global sorted endpoint arrays for "starts in" / "ends in" ranges.
+        self._sorted_starts = array("q", (self._starts[i] for i in by_start))
+        self._ids_by_start = array("q", (self._ids[i] for i in by_start))
+        self._sorted_ends = array("q", (self._ends[i] for i in by_end))
+        self._ids_by_end = array("q", (self._ids[i] for i in by_end))
+
+        # Tree nodes, stored column-wise. For each node I keep the windows
+        # that contain its center twice: by start ascending, and by end
+        # descending (stored negated so both can use bisect_right).
+        self._centers: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._node_starts: List[array] = []
+        self._node_start_ids: List[array] = []
+        self._node_neg_ends: List[array] = []
+        self._node_end_ids: List[array] = []
+        self._root = self._build(by_start)
+
+    @classmethod
+    def from_licenses(cls, licenses: Iterable[LicenseXref]) -> "LicenseWindowIndex":
+        """I build the index straight from LicenseXref objects (or a stream of them)."""
+        return cls(
+            (
+                lic.id,
+                to_epoch_day(lic.start_date, OPEN_START_DAY),
+                to_epoch_day(lic.end_date, OPEN_END_DAY),
+            )
+            for lic in licenses
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _build(self, members: List[int]) -> int:
+        # members is sorted by start day; partitioning keeps that order,
+        # so the start-sorted list of every node comes for free. Taking the
+        # median start as the center leaves at most about half of the
+        # windows on either side, which keeps the depth at O(log n).
+        if not members:
+            return -1
+
+        starts, ends = self._starts, self._ends
+        center = starts[members[len(members) // 2]]
+
+        left = [i for i in members if ends[i] < center]
+        right = [i for i in members if starts[i] > center]
+        here = [i for i in members if starts[i] <= center <= ends[i]]
+        here_by_end = sorted(here, key=ends.__getitem__, reverse=True)
+
+        node = len(self._centers)
+        self._centers.append(center)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._node_starts.append(array("q", (starts[i] for i in here)))
+        self._node_start_ids.append(array("q", (self._ids[i] for i in here)))
+        self._node_neg_ends.append(array("q", (-ends[i] for i in here_by_end)))
+        self._node_end_ids.append(array("q", (self._ids[i] for i in here_by_end)))
+        del members, here, here_by_end
+
+        self._left[node] = self._build(left)
+        self._right[node] = self._build(right)
+        return node
+
+    def active_on(self, day: DayLike) -> List[int]:
+        """I return the ids of every license whose window contains `day`."""
+        d = _start_day(day) if not isinstance(day, int) else day
+        found: List[int] = []
+        node = self._root
+        while node != -1:
+            center = self._centers[node]
+            if d < center:
+                # Every window here ends at or after center > d, so it
+                # contains d exactly when it starts on or before d.
+                k = bisect_right(self._node_starts[node], d)
+                found.extend(self._node_start_ids[node][:k])
+                node = self._left[node]
+            elif d > center:
+                k = bisect_right(self._node_neg_ends[node], -d)
+                found.extend(self._node_end_ids[node][:k])
+                node = self._right[node]
+            else:
+                found.extend(self._node_start_ids[node])
+                break
+        return found
+
+    def overlapping(self, window_start: DayLike, window_end: DayLike) -> List[int]:
+        """
+        I return the ids of every license whose window overlaps
+        [window_start, window_end]. Windows overlapping the range either
+        contain window_start or start inside (window_start, window_end],
+        and those two groups never share a license.
+        """
+        first, last = _start_day(window_start), _end_day(window_end)
+        if first > last:
+            return []
+        found = self.active_on(first)
+        lo = bisect_right(self._sorted_starts, first)
+        hi = bisect_right(self._sorted_starts, last)
+        found.extend(self._ids_by_start[lo:hi])
+        return found
+
+    def ending_between(self, from_day: DayLike, to_day: DayLike) -> List[int]:
+        """I return the ids of licenses whose end day is in [from_day, to_day], soonest first."""
+        first, last = _start_day(from_day), _end_day(to_day)
+        lo = bisect_left(self._sorted_ends, first)
+        hi = bisect_right(self._sorted_ends, last)
+        return list(self._ids_by_end[lo:hi])
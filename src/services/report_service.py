@@ -0,0 +1,355 @@
+"""
+I created this module for the heavy catalog reports, which spend most
+of their time in Python once the rows are read and so would use only
+one core in a single process:
+- availability: one row per (content, distributor) pair with its
+  licenses, how many are active on a day and how many days of a
+  period they cover
+- expiring: licenses ending in the next N days, per distributor region
+  and 30-day bucket, with the distinct titles and distributors involved
+
+The engine splits the license_xref id space into ranges. Worker
+processes each open their own read-only connection (a mode=ro URI, so
+a bug in a report can never write) to db/media.db. Each range is
+reduced to a partial aggregate in a worker, and the parent merges the
+partials. Ranges are read in separate transactions, so writes committed
+while a report runs can show up in some ranges and not others.
+
+Reports read the main database, so they do not see licenses kept in
+shard files (see src/persistence/sharding.py).
+
+Usage from the project root:
+
+    python -m src.services.report_service availability --workers 4 --out matrix.csv
+    python -m src.services.report_service expiring --days 90 --workers 4
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+from src.persistence import db
+from src.persistence.sharding import require_unsharded
+from src.utils import OPEN_END_DAY, OPEN_START_DAY, from_epoch_day, parse_date, to_epoch_day
+
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Ranges per worker: a few each, so a worker that finishes early picks
+# up another range instead of waiting on the slowest one.
+RANGES_PER_WORKER = 4
+READ_BATCH_SIZE = 5_000
+EXPIRY_BUCKET_DAYS = 30
+
+# The worker's own read-only connection, opened once by _init_worker().
+_worker_conn: sqlite3.Connection | None = None
+
+
+class ReportResult(NamedTuple):
+    rows: List[dict]
+    licenses: int       # licenses the workers looked at
+    ranges: int
+    workers: int
+    seconds: float
+
+
+def _read_only_connection(db_path: Path) -> sqlite3.Connection:
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _init_worker(db_path: Path) -> None:
+    global _worker_conn
+
+    _worker_conn = _read_only_connection(db_path)
+
+
+# ---------------------------------------------------------------------------
+# availability
+# ---------------------------------------------------------------------------
+
+def _availability_partial(conn: sqlite3.Connection, low: int, high: int, params: dict) -> tuple[int, dict]:
+    # (content_id, distributor_id) -> [licenses, active on the day,
+    # days covered in the period, first start day, last end day]
+    on_day, period_start, period_end = params["on_day"], params["period_start"], params["period_end"]
+    pairs: Dict[tuple, list] = {}
+    seen = 0
+
+    cursor = conn.execute(
+        "SELECT content_id, distributor_id, start_date, end_date FROM license_xref WHERE id BETWEEN ? AND ?",
+        (low, high),
+    )
+    while True:
+        rows = cursor.fetchmany(READ_BATCH_SIZE)
+        if not rows:
+            break
+        seen += len(rows)
+        for content_id, distributor_id, start_date, end_date in rows:
+            start, end = to_epoch_day(start_date, OPEN_START_DAY), to_epoch_day(end_date, OPEN_END_DAY)
+            entry = pairs.get((content_id, distributor_id))
+            if entry is None:
+                entry = pairs[(content_id, distributor_id)] = [0, 0, 0, start, end]
+            entry[0] += 1
+            if start <= on_day <= end:
+                entry[1] += 1
+            # One pair's licenses never overlap (the service refuses
+            # that), so summing the overlaps gives the days covered.
+            overlap = min(end, period_end) - max(start, period_start) + 1
+            if overlap > 0:
+                entry[2] += overlap
+            entry[3] = min(entry[3], start)
+            entry[4] = max(entry[4], end)
+    return seen, pairs
+
+
+def _availability_merge(partials: List[dict], params: dict) -> List[dict]:
+    merged: Dict[tuple, list] = {}
+    for pairs in partials:
+        for key, (licenses, active, covered, first, last) in pairs.items():
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [licenses, active, covered, first, last]
+            else:
+                entry[0] += licenses
+                entry[1] += active
+                entry[2] += covered
+                entry[3] = min(entry[3], first)
+                entry[4] = max(entry[4], last)
+
+    period_days = params["period_end"] - params["period_start"] + 1
+    return [
+        {
+            "content_id": content_id,
+            "distributor_id": distributor_id,
+            "licenses": licenses,
+            "active_licenses": active,
+            "covered_days": covered,
+            "coverage": covered / period_days,
+            "first_start": None if first == OPEN_START_DAY else from_epoch_day(first).isoformat(),
+            "last_end": None if last == OPEN_END_DAY else from_epoch_day(last).isoformat(),
+        }
+        for (content_id, distributor_id), (licenses, active, covered, first, last) in sorted(merged.items())
+    ]
+
+
+# ---------------------------------------------------------------------------
+# expiring
+# ---------------------------------------------------------------------------
+
+def _expiring_partial(conn: sqlite3.Connection, low: int, high: int, params: dict) -> tuple[int, dict]:
+    # (region, bucket) -> [licenses, title ids, distributor ids]
+    today = params["today"]
+    buckets: Dict[tuple, list] = {}
+    seen = 0
+
+    cursor = conn.execute(
+        """
+        SELECT l.content_id, l.distributor_id, l.end_date, d.region
+        FROM license_xref AS l
+        LEFT JOIN distributor AS d ON d.id = l.distributor_id
+        WHERE l.id BETWEEN ? AND ? AND l.end_date >= ? AND l.end_date <= ?
+        """,
+        (low, high, params["first"], params["last"]),
+    )
+    while True:
+        rows = cursor.fetchmany(READ_BATCH_SIZE)
+        if not rows:
+            break
+        seen += len(rows)
+        for content_id, distributor_id, end_date, region in rows:
+            days_left = to_epoch_day(end_date, OPEN_END_DAY) - today
+            key = (region or "Unknown", days_left // EXPIRY_BUCKET_DAYS)
+            entry = buckets.get(key)
+            if entry is None:
+                entry = buckets[key] = [0, set(), set()]
+            entry[0] += 1
+            entry[1].add(content_id)
+            entry[2].add(distributor_id)
+    return seen, buckets
+
+
+def _expiring_merge(partials: List[dict], params: dict) -> List[dict]:
+    merged: Dict[tuple, list] = {}
+    for buckets in partials:
+        for key, (licenses, titles, distributors) in buckets.items():
+            entry = merged.setdefault(key, [0, set(), set()])
+            entry[0] += licenses
+            entry[1] |= titles
+            entry[2] |= distributors
+
+    return [
+        {
+            "region": region,
+            "days_from": bucket * EXPIRY_BUCKET_DAYS,
+            "days_to": min((bucket + 1) * EXPIRY_BUCKET_DAYS - 1, params["days"]),
+            "licenses": licenses,
+            "titles": len(titles),
+            "distributors": len(distributors),
+        }
+        for (region, bucket), (licenses, titles, distributors) in sorted(merged.items())
+    ]
+
+
+# name -> (partial aggregate of one id range, merge of all partials)
+REPORTS: Dict[str, tuple[Callable, Callable]] = {
+    "availability": (_availability_partial, _availability_merge),
+    "expiring": (_expiring_partial, _expiring_merge),
+}
+
+
+def _run_range(report: str, low: int, high: int, params: dict) -> tuple[int, dict]:
+    partial, _ = REPORTS[report]
+    return partial(_worker_conn, low, high, params)
+
+
+def split_id_range(first_id: int, last_id: int, parts: int) -> List[tuple[int, int]]:
+    """
+    I cut [first_id, last_id] into up to `parts` inclusive ranges of
+    about the same width. Ids are mostly dense, so equal widths give
+    about equal row counts without counting rows first.
+    """
+    if parts <= 0:
+        raise ValueError("parts must be a positive integer.")
+    span = last_id - first_id + 1
+    if span <= 0:
+        return []
+    width = -(-span // parts)   # ceiling division
+    return [(low, min(low + width - 1, last_id)) for low in range(first_id, last_id + 1, width)]
+
+
+def run_report(report: str, params: dict, workers: int = DEFAULT_WORKERS) -> ReportResult:
+    """
+    I wrote this function as the engine behind every report.
+
+    It:
+    - reads the smallest and largest license id
+    - splits that range into RANGES_PER_WORKER ranges per worker
+    - with more than one worker, hands the ranges to a process pool
+      whose workers each open a read-only connection once
+    - with one worker, runs the same code in this process
+    - merges the partial aggregates into the report rows
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Choose a report from: {', '.join(REPORTS)}.")
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer.")
+    # The workers open the main database file directly.
+    require_unsharded("Reports")
+
+    started = time.perf_counter()
+    db_path = Path(db.DB_PATH)
+    conn = _read_only_connection(db_path)
+    try:
+        first_id, last_id = conn.execute("SELECT MIN(id), MAX(id) FROM license_xref").fetchone()
+    finally:
+        conn.close()
+    ranges = split_id_range(first_id, last_id, workers * RANGES_PER_WORKER) if first_id is not None else []
+
+    partial, merge = REPORTS[report]
+    if workers == 1 or len(ranges) <= 1:
+        conn = _read_only_connection(db_path)
+        try:
+            results = [partial(conn, low, high, params) for low, high in ranges]
+        finally:
+            conn.close()
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+            futures = [pool.submit(_run_range, report, low, high, params) for low, high in ranges]
+            results = [future.result() for future in futures]
+
+    rows = merge([partial for _, partial in results], params)
+    seen = sum(count for count, _ in results)
+    return ReportResult(rows, seen, len(ranges), workers, time.perf_counter() - started)
+
+
+def availability_report(
+    on_date: str | None = None,
+    period_start: str | None = None,
+    period_end: str | None = None,
+    workers: int = DEFAULT_WORKERS,
+) -> ReportResult:
+    """
+    I build the content x distributor availability matrix: one row per
+    pair that has licenses, with the licenses active on on_date (today
+    if not given) and the share of [period_start, period_end] they
+    cover (the calendar year of on_date if not given).
+    """
+    day = parse_date(on_date, "Date") or date.today()
+    start = parse_date(period_start, "Period start") or date(day.year, 1, 1)
+    end = parse_date(period_end, "Period end") or date(day.year, 12, 31)
+    if end < start:
+        raise ValueError("Period end cannot be before period start.")
+
+    params = {
+        "on_day": to_epoch_day(day, 0),
+        "period_start": to_epoch_day(start, 0),
+        "period_end": to_epoch_day(end, 0),
+    }
+    return run_report("availability", params, workers)
+
+
+def expiring_report(days: int = 90, today: str | None = None, workers: int = DEFAULT_WORKERS) -> ReportResult:
+    """
+    I summarise the licenses ending in the next `days` days per
+    distributor region and 30-day bucket, with how many distinct titles
+    and distributors each bucket touches.
+    """
+    if days < 0:
+        raise ValueError("Days must be zero or a positive number.")
+
+    first = parse_date(today, "Date") or date.today()
+    last = from_epoch_day(to_epoch_day(first, 0) + days)
+    params = {"today": to_epoch_day(first, 0), "days": days, "first": first.isoformat(), "last": last.isoformat()}
+    return run_report("expiring", params, workers)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a catalog report on several processes.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--out", type=Path, default=None, help="write the rows as CSV instead of printing them")
+    reports = parser.add_subparsers(dest="report", required=True)
+
+    availability = reports.add_parser("availability", help="content x distributor availability matrix")
+    availability.add_argument("--on", default=None, help="YYYY-MM-DD, defaults to today")
+    availability.add_argument("--from", dest="period_start", default=None)
+    availability.add_argument("--to", dest="period_end", default=None)
+
+    expiring = reports.add_parser("expiring", help="expiring rights per region")
+    expiring.add_argument("--days", type=int, default=90)
+    expiring.add_argument("--today", default=None)
+
+    args = parser.parse_args(argv)
+    db.init_db()
+
+    if args.report == "availability":
+        result = availability_report(args.on, args.period_start, args.period_end, args.workers)
+    else:
+        result = expiring_report(args.days, args.today, args.workers)
+
+    if args.out is not None:
+        with open(args.out, "w", newline="", encoding="utf-8") as handle:
+            if result.rows:
+                writer = csv.DictWriter(handle, fieldnames=list(result.rows[0]))
+                writer.writeheader()
+                writer.writerows(result.rows)
+    else:
+        for row in result.rows:
+            print(row)
+    print(
+        f"{len(result.rows):,} row(s) from {result.licenses:,} license(s) in {result.seconds:.2f}s "
+        f"({result.workers} worker(s), {result.ranges} range(s))",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+I created this module to set up and maintain the sharded license store
+(see src/persistence/sharding.py).
+
+It has three commands:
+- create:    makes the shard files and layout.json; --copy-existing
+             also copies the licenses already in the main database
+             (ids kept), which is how an existing catalog is sharded
+- status:    prints the layout and how many licenses each shard holds
+- rebalance: moves every license to a new layout (another shard count,
+             strategy or set of range boundaries)
+
+A rebalance writes the new layout's rows into new files (the next
+generation), switches layout.json over in one rename and only then
+deletes the old files, so a failure part-way leaves the old layout in
+use. It holds the write lock on every old shard while it copies, so
+run it in a quiet moment: writers wait until it is done, and processes
+other than this one must be restarted to pick up the new layout.
+
+Usage from the project root (with MEDIA_LICENSE_SHARDS=db/shards for
+the app itself):
+
+    python -m src.services.shard_service create --shards 4 --copy-existing
+    python -m src.services.shard_service status
+    python -m src.services.shard_service rebalance --shards 8 --strategy range
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+from src.persistence import db, license_repo, sharded_license_repo, sharding
+from src.persistence.sharding import ShardLayout
+
+
+# Rows buffered per destination shard before they are written.
+COPY_BATCH_SIZE = 5_000
+
+_INSERT_SQL = """
+    INSERT INTO license_xref (id, content_id, distributor_id, start_date, end_date, terms)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def plan_range_boundaries(content_counts: Iterable[tuple[int, int]], shards: int) -> List[int]:
+    """
+    I pick range boundaries that give every shard about the same number
+    of licenses. content_counts is (content_id, licenses) in content_id
+    order. One title is never split, so a very large title can leave a
+    shard heavier than the rest; shards left over at the end get
+    boundaries above the highest content_id and take the new titles.
+    """
+    if shards <= 0:
+        raise ValueError("shards must be a positive integer.")
+
+    content_counts = list(content_counts)
+    total = sum(count for _, count in content_counts)
+    boundaries: List[int] = []
+    running = 0
+    for content_id, count in content_counts:
+        if len(boundaries) == shards - 1:
+            break
+        if running and running >= total * (len(boundaries) + 1) / shards:
+            boundaries.append(content_id)
+        running += count
+
+    last = max(boundaries[-1:] + [content_id for content_id, _ in content_counts[-1:]] + [0])
+    while len(boundaries) < shards - 1:
+        last += 1
+        boundaries.append(last)
+    return boundaries
+
+
+def _copy_rows(rows: Iterable[tuple], layout: ShardLayout, paths: List[Path]) -> List[int]:
+    """
+    I write (id, content_id, ...) rows to the shard each one belongs to
+    in `layout`, one transaction per shard, and return the row counts.
+    Nothing is committed unless every row was written.
+    """
+    targets = [sqlite3.connect(path) for path in paths]
+    buffers: List[List[tuple]] = [[] for _ in paths]
+    counts = [0] * len(paths)
+    try:
+        for conn in targets:
+            conn.execute("BEGIN IMMEDIATE")
+        for row in rows:
+            number = layout.shard_for(row[1])
+            buffers[number].append(row)
+            if len(buffers[number]) >= COPY_BATCH_SIZE:
+                targets[number].executemany(_INSERT_SQL, buffers[number])
+                counts[number] += len(buffers[number])
+                buffers[number].clear()
+        for number, buffer in enumerate(buffers):
+            targets[number].executemany(_INSERT_SQL, buffer)
+            counts[number] += len(buffer)
+        for conn in targets:
+            conn.commit()
+    finally:
+        for conn in targets:
+            conn.close()
+    return counts
+
+
+def create_shards(
+    directory: Path,
+    shards: int,
+    strategy: str = "hash",
+    boundaries: List[int] | None = None,
+    copy_existing: bool = False,
+) -> dict:
+    """
+    I wrote this function to set up a shard directory.
+
+    It:
+    - refuses a directory that already has a layout
+    - refuses to start empty shards while the main database still has
+      licenses (they would silently drop out of every read); pass
+      copy_existing to take them along
+    - plans range boundaries from the main database's licenses when
+      strategy is "range" and none are given
+    - creates and migrates the shard files
+    - with copy_existing, copies every license of the main database to
+      its shard and records its id in license_shard_ids
+    - writes layout.json last, so a failed run leaves no usable layout
+    """
+    directory = Path(directory)
+    if (directory / sharding.LAYOUT_FILE).exists():
+        raise ValueError(f"{directory} already has a shard layout; use rebalance to change it.")
+    if not copy_existing:
+        with db.connection() as conn:
+            has_licenses = conn.execute("SELECT 1 FROM license_xref LIMIT 1").fetchone() is not None
+        if has_licenses:
+            raise ValueError("The main database already has licenses; use --copy-existing to shard them.")
+    if strategy == "range" and boundaries is None:
+        with db.connection() as conn:
+            counts = conn.execute(
+                "SELECT content_id, COUNT(*) FROM license_xref GROUP BY content_id ORDER BY content_id"
+            ).fetchall()
+        boundaries = plan_range_boundaries([tuple(row) for row in counts], shards)
+
+    layout = ShardLayout(strategy, sharding.shard_file_names(shards, 1), boundaries)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = sharding.shard_paths(layout, directory)
+    for path in paths:
+        path.unlink(missing_ok=True)   # left over from a failed run
+    sharding.migrate_shard_files(directory, layout)
+
+    counts = [0] * layout.count
+    if copy_existing:
+        rows = (
+            (lic.id, lic.content_id, lic.distributor_id, lic.start_date, lic.end_date, lic.terms)
+            for lic in license_repo.iter_all_licenses()
+        )
+        counts = _copy_rows(rows, layout, paths)
+        with db.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO license_shard_ids (id, content_id) SELECT id, content_id FROM license_xref"
+            )
+    db.close_pool()
+
+    sharding.save_layout(directory, layout)
+    return {"layout": layout, "licenses": counts}
+
+
+def get_shard_status() -> dict:
+    """I return the active layout and the number of licenses on each shard."""
+    return {"layout": sharding.get_layout(), "licenses": sharded_license_repo.count_licenses_per_shard()}
+
+
+def rebalance_shards(
+    shards: int,
+    strategy: str | None = None,
+    boundaries: List[int] | None = None,
+    keep_old: bool = False,
+) -> dict:
+    """
+    I wrote this function to move the active shard store to a new
+    layout (strategy defaults to the current one).
+
+    It:
+    - plans balanced range boundaries from the current licenses if a
+      range layout is asked for without boundaries
+    - takes the write lock on every old shard, so nothing changes
+      while the rows are copied
+    - copies every row into the new generation's files
+    - checks that the row count did not change
+    - switches layout.json over, then deletes the old files (unless
+      keep_old)
+    - returns the new layout, per-shard counts and seconds taken
+    """
+    started = time.perf_counter()
+    directory = sharding.get_shard_directory()
+    old = sharding.get_layout()
+    strategy = strategy or old.strategy
+    if strategy == "range" and boundaries is None:
+        boundaries = plan_range_boundaries(sharded_license_repo.count_licenses_per_content(), shards)
+
+    generation = old.generation + 1
+    new = ShardLayout(strategy, sharding.shard_file_names(shards, generation), boundaries, generation)
+    old_paths = sharding.shard_paths(old, directory)
+    new_paths = sharding.shard_paths(new, directory)
+    for path in new_paths:
+        path.unlink(missing_ok=True)   # left over from a failed run
+    sharding.migrate_shard_files(directory, new)
+
+    sources = [sqlite3.connect(path, timeout=db.POOL_TIMEOUT) for path in old_paths]
+    try:
+        expected = 0
+        for conn in sources:
+            conn.execute("BEGIN IMMEDIATE")
+            expected += conn.execute("SELECT COUNT(*) FROM license_xref").fetchone()[0]
+
+        def rows() -> Iterable[tuple]:
+            for conn in sources:
+                yield from conn.execute(
+                    "SELECT id, content_id, distributor_id, start_date, end_date, terms FROM license_xref"
+                )
+
+        counts = _copy_rows(rows(), new, new_paths)
+        if sum(counts) != expected:
+            raise sqlite3.IntegrityError(f"Copied {sum(counts)} licenses but the old shards hold {expected}.")
+
+        sharding.set_layout(new)
+        db.close_pool()
+    except BaseException:
+        db.close_pool()
+        for path in new_paths:
+            path.unlink(missing_ok=True)
+        raise
+    finally:
+        for conn in sources:
+            conn.close()
+
+    if not keep_old:
+        for path in old_paths:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    return {"layout": new, "licenses": counts, "seconds": time.perf_counter() - started}
+
+
+def _print_status(summary: dict) -> None:
+    layout = summary["layout"]
+    print(layout)
+    for name, count in zip(layout.files, summary["licenses"]):
+        print(f"  {name}: {count:,} license(s)")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Create, inspect or rebalance the license shards.")
+    parser.add_argument("--dir", type=Path, default=sharding.SHARDS_DIR, help="shard directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("create", "make the shard files"), ("rebalance", "move to a new layout")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--shards", type=int, required=True)
+        command.add_argument("--strategy", choices=sharding.STRATEGIES, default="hash" if name == "create" else None)
+        command.add_argument("--boundaries", type=int, nargs="+", default=None, help="range only; planned if omitted")
+    commands.choices["create"].add_argument("--copy-existing", action="store_true")
+    commands.choices["rebalance"].add_argument("--keep-old", action="store_true", help="keep the old shard files")
+    commands.add_parser("status", help="show the layout and rows per shard")
+
+    args = parser.parse_args(argv)
+    db.init_db()
+
+    if args.command == "create":
+        summary = create_shards(args.dir, args.shards, args.strategy, args.boundaries, args.copy_existing)
+    else:
+        sharding.enable_sharding(args.dir)
+        if args.command == "rebalance":
+            summary = rebalance_shards(args.shards, args.strategy, args.boundaries, args.keep_old)
+            print(f"Rebalanced in {summary['seconds']:.1f}s.")
+        else:
+            summary = get_shard_status()
+    _print_status(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
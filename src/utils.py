@@ -0,0 +1,103 @@
+"""
+I keep small helpers here that more than one layer needs.
+
+clean_text() trims the free-text fields of the build_* functions.
+
+The rest is date handling for license windows. Dates are stored
+as ISO "YYYY-MM-DD" text in SQLite; for range queries I turn them into
+whole days since 1970-01-01 ("epoch days") so they can be compared as
+integers. A missing start or end date means the window is open on that
+side, which I represent with the OPEN_START_DAY / OPEN_END_DAY sentinels.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+
+
+EPOCH = date(1970, 1, 1)
+
+# Sentinels for open-ended windows. They lie outside the range of any real
+# "YYYY-MM-DD" date (0001-01-01 is -719162, 9999-12-31 is 2932896) and fit
+# in a 32-bit integer, which the license_window R*Tree stores.
+OPEN_START_DAY = -1_000_000
+OPEN_END_DAY = 3_000_000
+
+# The start of every date form SQLite's julianday() reads.
+_ISO_DAY = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
+def clean_text(value, field: str) -> str | None:
+    """
+    I trim a free-text field and return None when it is empty. JSON
+    bodies and JSONL imports can carry numbers or lists here, so any
+    other type raises ValueError with the field name instead of failing
+    on .strip() later.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be text, got {value!r}.")
+    return value.strip() or None
+
+
+def parse_date(value: str | None, field: str = "date") -> date | None:
+    """
+    I turn a "YYYY-MM-DD" string into a date, or return None for an
+    empty value. Anything else raises ValueError with the field name.
+    """
+    if value is None or not str(value).strip():
+        return None
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{field} must be a date in YYYY-MM-DD format, got {value!r}.") from None
+
+
+def _sqlite_day(text: str) -> date | None:
+    # I read stored text the way julianday(text, 'start of day') does:
+    # day 01-31 in any month (SQLite rolls "2020-02-30" over into March),
+    # and an optional time whose UTC offset can move the day.
+    match = _ISO_DAY.match(text)
+    if match is None:
+        return None
+    year, month, day = map(int, match.groups())
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    rest = text[10:].rstrip()
+    try:
+        value = date(year, month, 1) + timedelta(days=day - 1)
+        if rest:
+            moment = datetime.fromisoformat("2000-01-01" + rest.replace("Z", "+00:00"))
+            if moment.tzinfo is not None:
+                value += moment.astimezone(timezone.utc).date() - date(2000, 1, 1)
+    except ValueError:
+        return None
+    return value
+
+
+def to_epoch_day(value: str | date | None, open_default: int) -> int:
+    """
+    I convert a date (or stored date text) into epoch days. None becomes
+    open_default, which callers set to OPEN_START_DAY or OPEN_END_DAY.
+
+    Old rows can hold free text, so I follow the same rule as the SQL
+    side (julianday(value, 'start of day') in the license_window
+    triggers): "YYYY-MM-DD", optionally with a time and UTC offset, is
+    read as that day, and anything else counts as open-ended too, so a
+    stray '01/02/2020' never makes the SQL and Python paths disagree
+    (or a report fail). New input is checked with parse_date() first.
+    """
+    if value is None:
+        return open_default
+    if isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        value = _sqlite_day(str(value))
+        if value is None:
+            return open_default
+    return (value - EPOCH).days
+
+
+def from_epoch_day(day: int) -> date:
+    """I reverse to_epoch_day() for a real (not open-ended) day."""
+    return EPOCH + timedelta(days=day)
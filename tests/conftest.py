@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures.
+
+Every test that touches the database gets its own SQLite file under
+pytest's tmp_path, so the real db/media.db is never modified.
+"""
+
+import pytest
+
+from src.persistence import db
+from src.services import content_service, distributor_service
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test.db")
+    db.init_db()
+    yield db.DB_PATH
+    db.close_pool()
+
+
+@pytest.fixture
+def catalog(temp_db):
+    # Two titles and one distributor, for the license tests.
+    content_service.add_content("Arrival")
+    content_service.add_content("Heat")
+    distributor_service.add_distributor("Acme")
+    return temp_db
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from src.models.content import Content
+from src.persistence import content_repo
+from src.services import async_service, content_service
+
+
+def test_async_facade_shares_reads_and_sees_its_writes(temp_db):
+    executor = async_service.AsyncExecutor(readers=2, max_pending=2, max_waiting=4)
+
+    async def scenario():
+        created = await executor.write(content_service.add_content, "Arrival")
+        same = await asyncio.gather(*(executor.read(content_service.get_content, created.id) for _ in range(3)))
+        assert [c.title for c in same] == ["Arrival"] * 3
+
+        await executor.write(content_repo.update_content, Content(created.id, "Arrival (2016)"))
+        assert (await executor.read(content_service.get_content, created.id)).title == "Arrival (2016)"
+
+        # Two calls run, four wait, the seventh is turned away.
+        calls = [asyncio.ensure_future(executor.read(content_service.list_contents_page, None, n)) for n in range(1, 8)]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        assert sum(isinstance(r, async_service.ExecutorBusyError) for r in results) == 1
+
+        cancelled = asyncio.ensure_future(executor.read(content_service.list_contents))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert executor.stats()["coalesced"] >= 1
@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+
+from src.models.content import Content
+from src.persistence import content_repo
+from src.services import backup_service, content_service
+
+
+def test_backup_snapshot_and_restore(temp_db, tmp_path):
+    content_service.add_content_bulk([Content(None, f"Film {i}", notes="x" * 2_000) for i in range(200)])
+    seen = []
+
+    def write_during_backup(progress):
+        seen.append(progress.fraction)
+        if len(seen) <= 5:   # commits from another connection restart the copy
+            content_service.add_content(f"Late {len(seen)}")
+
+    summary = backup_service.backup_database(tmp_path / "b.db", pages=5, pause=0, on_progress=write_during_backup)
+    assert summary["restarts"] >= backup_service.MAX_RESTARTS and seen[-1] == 1.0
+    with pytest.raises(ValueError):
+        backup_service.backup_database(tmp_path / "b.db")
+
+    snapshot = backup_service.snapshot_database(tmp_path / "s.db")
+    assert snapshot["bytes"] > 0
+
+    restored = tmp_path / "restored.db"
+    backup_service.restore_database(tmp_path / "b.db", restored)
+    conn = sqlite3.connect(restored)
+    assert conn.execute("SELECT COUNT(*) FROM content").fetchone()[0] >= 200 + backup_service.MAX_RESTARTS
+    conn.close()
+
+    content_repo.delete_content(1)
+    with pytest.raises(ValueError):
+        backup_service.restore_database(tmp_path / "s.db")
+    backup_service.restore_database(tmp_path / "s.db", overwrite=True)
+    assert content_service.get_content(1).title == "Film 0"
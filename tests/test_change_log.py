@@ -0,0 +1,39 @@
+import pytest
+
+from src.models.content import Content
+from src.persistence import content_repo
+from src.services import change_log_service as changes
+from src.services import content_service
+
+
+def test_change_log_feeds_consumers_and_compacts(temp_db):
+    heat = content_service.add_content("Heat")
+    content_service.add_content("Arrival")
+    content_repo.update_content(Content(heat.id, "Heat (1995)"))
+    content_repo.delete_content(2)
+
+    batch = changes.read_changes(0, limit=3)
+    assert [(c.op, c.row_id) for c in batch.changes] == [("insert", 1), ("insert", 2), ("update", 1)]
+    assert batch.has_more and batch.changes[2].data["title"] == "Heat (1995)"
+    assert [c.op for c in changes.iter_changes(batch.last_seq, batch_size=1)] == ["delete"]
+
+    seen = []
+    assert changes.consume("search", seen.extend, batch_size=2) == 4
+    content_service.add_content("Ghost")
+    assert changes.consume("search", seen.extend) == 1
+    assert [c.seq for c in seen] == [1, 2, 3, 4, 5]
+    assert changes.get_consumer_offsets() == {"search": 5}
+
+    # Only the latest change per row survives ("Ghost" reused id 2).
+    assert changes.compact_change_log() == 3
+    assert [(c.seq, c.op) for c in changes.iter_changes()] == [(3, "update"), (5, "insert")]
+
+    # Retention waits for the slowest consumer.
+    changes.consume("feed", lambda batch: None, tables=["distributor"])
+    assert changes.apply_retention(0) == 0
+    changes.remove_consumer("feed")
+    assert changes.apply_retention(0) == 2
+    with pytest.raises(changes.ChangeLogGapError):
+        changes.read_changes(2)
+    content_service.add_content("Tenet")
+    assert [c.seq for c in changes.read_changes(5).changes] == [6]
@@ -0,0 +1,230 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.models.content import Content
+from src.persistence import content_repo, db
+from src.services import content_service, import_service
+
+
+def test_add_and_get_content_round_trip(temp_db):
+    saved = content_service.add_content("  Arrival ", genre="Sci-Fi", release_year=2016)
+
+    loaded = content_service.get_content(saved.id)
+
+    assert loaded is not None
+    assert loaded.to_dict() == saved.to_dict()
+    assert loaded.title == "Arrival"
+
+
+def test_repo_calls_reuse_pooled_connection(temp_db):
+    content_service.add_content("Heat")
+
+    content_repo.get_content_by_id(1)
+    content_repo.list_all_content()
+    content_repo.get_content_by_id(1)
+
+    assert db.get_pool().size == 1
+
+
+def test_connection_rolls_back_on_error(temp_db):
+    with pytest.raises(RuntimeError):
+        with db.connection() as conn:
+            conn.execute("INSERT INTO content (title) VALUES ('Ghost')")
+            raise RuntimeError("boom")
+
+    assert content_repo.list_all_content() == []
+
+
+def test_pool_replaces_broken_connection(temp_db):
+    pool = db.get_pool()
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+
+    replacement = pool.acquire()
+    try:
+        assert replacement is not conn
+        assert replacement.execute("SELECT 1").fetchone()[0] == 1
+    finally:
+        pool.release(replacement)
+
+
+def test_closed_pool_refuses_new_borrowers(temp_db):
+    pool = db.get_pool()
+    pool.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+
+
+def test_connections_use_active_profile(temp_db):
+    db.set_profile("durable")
+    try:
+        with db.connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    finally:
+        db.set_profile(db.DEFAULT_PROFILE)
+
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        db.set_profile("turbo")
+
+
+def test_add_content_bulk_returns_ids_in_order(temp_db):
+    content_service.add_content("Existing")
+    items = [Content(id=0, title=f" Title {i} ", genre="Drama") for i in range(5)]
+
+    ids = content_service.add_content_bulk(items, chunk_size=2)
+
+    assert ids == [2, 3, 4, 5, 6]
+    assert content_service.get_content(4).title == "Title 2"
+
+
+def test_add_content_bulk_rolls_back_chunk_on_invalid_row(temp_db):
+    items = [Content(id=0, title="Good"), Content(id=0, title="   ")]
+
+    with pytest.raises(ValueError):
+        content_service.add_content_bulk(items)
+
+    assert content_service.list_contents() == []
+
+
+def test_import_content_csv_writes_rejects(temp_db, tmp_path):
+    feed = tmp_path / "catalog.csv"
+    feed.write_text(
+        "title,genre,release_year\n"
+        "Arrival,Sci-Fi,2016\n"
+        ",Drama,2001\n"
+        "Heat,Crime,not-a-year\n"
+        "Alien,Horror,\n",
+        encoding="utf-8",
+    )
+    rejects = tmp_path / "rejects.jsonl"
+
+    stats = import_service.import_file("content", feed, rejects_path=rejects, chunk_size=1)
+
+    assert (stats.read, stats.inserted, stats.rejected) == (4, 2, 2)
+    assert [c.title for c in content_service.list_contents()] == ["Arrival", "Alien"]
+    assert [json.loads(line)["line"] for line in rejects.read_text().splitlines()] == [3, 4]
+
+
+def test_import_rejects_non_text_fields_instead_of_failing(temp_db, tmp_path):
+    from src import server
+
+    feed = tmp_path / "catalog.jsonl"
+    records = [{"title": "Arrival"}, {"title": 123}, {"title": "Heat", "genre": 5}, {"title": "Alien", "notes": ["x"]}]
+    feed.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    rejects = tmp_path / "rejects.jsonl"
+
+    stats = import_service.import_file("content", feed, rejects_path=rejects)
+
+    assert (stats.read, stats.inserted, stats.rejected) == (4, 1, 3)
+    assert [json.loads(line)["error"] for line in rejects.read_text().splitlines()] == [
+        "Title must be text, got 123.", "Genre must be text, got 5.", "Notes must be text, got ['x'].",
+    ]
+    # The HTTP server maps ValueError to 400.
+    with pytest.raises(ValueError, match="must be text"):
+        server.create_content(None, {}, {"title": 123})
+
+
+def test_get_content_is_cached_and_invalidated_by_writes(temp_db):
+    saved = content_service.add_content("Arrival")
+    cache = content_repo._cache
+    cache.reset_stats()
+
+    first = content_repo.get_content_by_id(saved.id)
+    first.title = "changed by caller"
+    second = content_repo.get_content_by_id(saved.id)
+    assert second.title == "Arrival"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    second.title = "Arrival (Director's Cut)"
+    content_repo.update_content(second)
+    assert content_repo.get_content_by_id(saved.id).title == "Arrival (Director's Cut)"
+
+    content_repo.delete_content(saved.id)
+    assert content_repo.get_content_by_id(saved.id) is None
+
+
+def test_cache_notices_writes_from_other_connections(temp_db, monkeypatch):
+    monkeypatch.setattr(content_repo._cache, "sync_interval", 0)
+    saved = content_service.add_content("Heat")
+    assert content_repo.get_content_by_id(saved.id).title == "Heat"
+
+    # Another worker process would write through its own connection.
+    other = db.get_connection()
+    with other:
+        other.execute("UPDATE content SET title = 'Heat (1995)' WHERE id = ?", (saved.id,))
+    other.close()
+
+    assert content_repo.get_content_by_id(saved.id).title == "Heat (1995)"
+
+
+def test_cache_probes_once_per_interval_and_drops_only_changed_rows(temp_db, monkeypatch):
+    content_service.add_content_bulk(Content(id=0, title=f"T{i}") for i in range(1, 4))
+    cache = content_repo._cache
+    monkeypatch.setattr(cache, "sync_interval", 60)
+    for content_id in (1, 2, 3):
+        content_repo.get_content_by_id(content_id)
+
+    probes = []
+    data_version = db.data_version
+    monkeypatch.setattr(db, "data_version", lambda: probes.append(1) or data_version())
+    other = db.get_connection()
+    with other:
+        other.execute("UPDATE content SET title = 'T2 (new)' WHERE id = 2")
+    other.close()
+
+    # Inside the interval lookups trust the cache and run no probe at all.
+    assert content_repo.get_content_by_id(2).title == "T2"
+    assert probes == []
+
+    monkeypatch.setattr(cache, "sync_interval", 0)
+    cache.reset_stats()
+    assert [content_repo.get_content_by_id(i).title for i in (1, 2, 3)] == ["T1", "T2 (new)", "T3"]
+    assert (cache.hits, cache.misses, cache.invalidations) == (2, 1, 1)
+    assert len(probes) == 3
+
+
+def test_cache_evicts_least_recently_used(temp_db, monkeypatch):
+    monkeypatch.setattr(content_repo._cache, "max_size", 2)
+    content_service.add_content_bulk(Content(id=0, title=f"T{i}") for i in range(3))
+    content_repo._cache.reset_stats()
+
+    for content_id in (1, 2, 1, 3, 1, 2):
+        content_repo.get_content_by_id(content_id)
+
+    stats = content_repo._cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 4, 2)
+
+
+def test_search_content_ranks_and_tracks_changes(temp_db):
+    wars = content_service.add_content("Star Wars", "Sci-Fi", notes="Space opera")
+    trek = content_service.add_content("Trek", "Sci-Fi", notes="A star map")
+    amelie = content_service.add_content("Amélie", "Comedy")
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO license_xref (content_id, distributor_id, terms) VALUES (?, 1, 'Festival only')",
+            (amelie.id,),
+        )
+
+    assert [c.id for c in content_service.search_content("star")] == [wars.id, trek.id]
+    assert [c.id for c in content_service.search_content("star wa")] == [wars.id]
+    assert [c.id for c in content_service.search_content("amelie")] == [amelie.id]
+    assert [c.id for c in content_service.search_content("festival")] == [amelie.id]
+    assert content_service.search_content('"NOT" OR (') == []
+
+    content_repo.update_content(Content(wars.id, "Dune", "Sci-Fi"))
+    content_repo.delete_content(trek.id)
+    assert content_service.search_content("star") == []
+    assert [c.title for c in content_service.search_content("dun")] == ["Dune"]
+
+    with pytest.raises(ValueError):
+        content_service.search_content("  -- ")
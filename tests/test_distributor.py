@@ -0,0 +1,40 @@
+import pytest
+
+from src.models.distributor import Distributor
+from src.persistence import db
+from src.services import distributor_service
+
+
+def test_add_distributor_validates_email(temp_db):
+    with pytest.raises(ValueError):
+        distributor_service.add_distributor("Acme", contact_email="not-an-email")
+
+
+def test_add_distributor_bulk_applies_same_rules(temp_db):
+    ids = distributor_service.add_distributor_bulk(
+        [Distributor(id=0, name=" Acme ", region=" EU "), Distributor(id=0, name="Globex")]
+    )
+
+    assert ids == [1, 2]
+    assert distributor_service.get_distributor(1).to_dict() == {
+        "id": 1,
+        "name": "Acme",
+        "contact_email": None,
+        "region": "EU",
+    }
+
+    with pytest.raises(ValueError):
+        distributor_service.add_distributor_bulk([Distributor(id=0, name="X", contact_email="bad")])
+
+
+def test_iter_distributors_streams_in_id_order_and_releases_connection(temp_db):
+    distributor_service.add_distributor_bulk(Distributor(id=0, name=f"D{i}") for i in range(7))
+
+    names = [d.name for d in distributor_service.iter_distributors(batch_size=3)]
+
+    assert names == [f"D{i}" for i in range(7)]
+
+    stream = distributor_service.iter_distributors(batch_size=2)
+    next(stream)
+    stream.close()
+    assert db.get_pool().size == db.get_pool()._idle.qsize()
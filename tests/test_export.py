@@ -0,0 +1,33 @@
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from src.persistence import db
+from src.services import content_service, export_service, license_service
+
+
+def test_export_catalog_writes_consistent_files_and_manifest(catalog, tmp_path):
+    license_service.add_license(1, 1, "2025-01-01", None, "SVOD, \"HD\"")
+
+    # A commit after the snapshot started is not seen by its readers.
+    with db.snapshot_connections(2) as (first, second):
+        content_service.add_content("Late arrival")
+        assert first.execute("SELECT COUNT(*) FROM content").fetchone()[0] == 2
+        assert second.execute("SELECT COUNT(*) FROM license_xref").fetchone()[0] == 1
+
+    manifest = export_service.export_catalog(tmp_path / "dump", fmt="csv", compress=True)
+    entry = manifest["files"]["licenses"]
+    data = (tmp_path / "dump" / entry["file"]).read_bytes()
+    assert (entry["rows"], entry["bytes"]) == (1, len(data))
+    assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+    assert gzip.decompress(data).decode().splitlines()[1] == '1,1,1,2025-01-01,,"SVOD, ""HD"""'
+    assert manifest["files"]["content"]["rows"] == 3
+    assert json.loads((tmp_path / "dump" / "manifest.json").read_text())["rows"] == 5
+
+    export_service.export_catalog(tmp_path / "jsonl", kinds=["content"])
+    lines = (tmp_path / "jsonl" / "content.jsonl").read_text().splitlines()
+    assert json.loads(lines[2])["title"] == "Late arrival"
+    with pytest.raises(ValueError):
+        export_service.export_catalog(tmp_path / "bad", fmt="xml")
@@ -0,0 +1,61 @@
+import sqlite3
+
+from src.persistence import db, license_counts_repo
+from src.services import distributor_service, license_service
+from src.services import license_counts_service as counts
+from src.utils import to_epoch_day
+
+
+def test_license_counts_follow_writes_and_days(catalog):
+    distributor_service.add_distributor("Globex")
+    first = license_service.add_license(1, 1, "2020-01-01", "2020-12-31")
+    license_service.add_license(1, 1, "2021-01-01", None)
+    second = license_service.add_license(1, 2, "2020-06-01", "2020-06-30")
+    license_service.add_license(2, 2, None, "2020-03-31")
+
+    assert counts.get_content_license_counts(1, "2020-06-15") == {
+        "licenses": 3, "distributors": 2, "active_licenses": 2,
+    }
+    assert counts.count_active_licenses_for_content(1, "2022-01-01") == 1
+    assert counts.count_active_licenses_for_content(2, "2020-01-01") == 1
+    assert counts.count_licenses_for_distributor(2) == 2
+
+    license_service.delete_license(second.id)
+    first.distributor_id = 2
+    license_service.update_license(first)
+    assert counts.count_distributors_for_content(1) == 2
+    assert counts.count_licenses_for_distributor(1) == 1
+    assert counts.count_active_licenses_for_content(1, "2020-06-15") == 1
+    assert counts.count_licenses_for_distributor(99) == 0
+    assert counts.verify_license_counts() == []
+
+    with db.connection() as conn:
+        conn.execute("UPDATE distributor_license_counts SET licenses = 7 WHERE distributor_id = 2")
+    assert [(d["table"], d["key"], d["maintained"], d["expected"]) for d in counts.verify_license_counts()] == [
+        ("distributor_license_counts", {"distributor_id": 2}, (7,), (2,)),
+    ]
+    counts.rebuild_license_counts()
+    assert counts.verify_license_counts() == []
+
+
+def test_license_counts_for_another_day_do_not_write(catalog):
+    license_service.add_license(1, 1, "2020-01-01", "2020-12-31")
+    license_service.add_license(1, 1, "2021-01-01", None)
+    counts.advance_active_day("2020-06-15")
+    day = license_counts_repo.get_active_day()
+
+    # Another writer holds the lock; reads for any day still answer at once.
+    writer = sqlite3.connect(catalog, timeout=0)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert counts.count_active_licenses_for_content(1, "2022-01-01") == 1
+        assert counts.count_active_licenses_for_content(1, "2019-01-01") == 0
+        assert counts.count_active_licenses_for_content(1, "2020-06-15") == 1
+    finally:
+        writer.rollback()
+        writer.close()
+    assert license_counts_repo.get_active_day() == day == to_epoch_day("2020-06-15", 0)
+
+    assert counts.advance_active_day("2022-01-01") == 1
+    assert counts.count_active_licenses_for_content(1, "2022-01-01") == 1
+    assert counts.verify_license_counts() == []
@@ -0,0 +1,404 @@
+import pytest
+
+from src.models.license_xref import LicenseXref
+from src.persistence import content_repo, db, distributor_repo, license_repo, migrations
+from src.services import conflict_service, distributor_service, import_service, license_service
+from src.services.license_frame import LicenseFrame
+from src.services.license_windows import LicenseWindowIndex
+
+
+def test_add_license_requires_existing_references(catalog):
+    with pytest.raises(ValueError):
+        license_service.add_license(99, 1)
+    with pytest.raises(ValueError):
+        license_service.add_license(1, 99)
+
+    saved = license_service.add_license(1, 1, "2025-01-01", "2025-12-31", " SVOD ")
+    assert license_service.get_license(saved.id).terms == "SVOD"
+
+
+def test_add_license_bulk(catalog):
+    ids = license_service.add_license_bulk(
+        LicenseXref(id=0, content_id=c, distributor_id=1, start_date=f"202{y}-01-01", end_date=f"202{y}-12-31")
+        for c, y in ((1, 1), (2, 1), (1, 2))
+    )
+
+    assert ids == [1, 2, 3]
+    assert [lic.content_id for lic in license_service.list_licenses()] == [1, 2, 1]
+
+    with pytest.raises(ValueError):
+        license_service.add_license_bulk([LicenseXref(id=0, content_id=3, distributor_id=1)])
+    assert len(license_service.list_licenses()) == 3
+
+
+def test_add_license_bulk_validates_before_writing_with_one_connection(catalog, monkeypatch):
+    license_service.add_license(1, 1, "2025-01-01", "2025-06-30")
+    monkeypatch.setattr(db, "POOL_SIZE", 1)
+    db.close_pool()   # the next borrower opens a pool of one connection
+
+    ids = license_service.add_license_bulk(
+        (LicenseXref(0, c, 1, f"202{y}-01-01", f"202{y}-06-30") for c, y in ((2, 5), (1, 6), (2, 6))),
+        chunk_size=2,
+    )
+    assert ids == [2, 3, 4]
+
+    batch = [LicenseXref(0, 1, 1, "2025-06-01", None), LicenseXref(0, 2, 1, "2027-01-01", None)]
+    assert license_repo.find_overlaps_for_batch(batch) == {0: [1, 3]}
+    with pytest.raises(ValueError, match=r"license\(s\) 1, 3"):
+        license_service.add_license_bulk(batch)
+    assert len(license_service.list_licenses()) == 4
+
+
+def test_add_license_bulk_checks_each_batch_inside_its_write(catalog, monkeypatch):
+    monkeypatch.setattr(license_service, "REFERENCE_BATCH_SIZE", 2)
+    read = []
+
+    def deal():
+        for y in (5, 6, 7, 5, 8):
+            read.append(y)
+            yield LicenseXref(0, 1, 1, f"202{y}-01-01", f"202{y}-12-31")
+
+    # The clash with 2025 sits in the second batch, so the third is never read.
+    with pytest.raises(ValueError, match=r"license\(s\) 1"):
+        license_service.add_license_bulk(deal())
+    assert read == [5, 6, 7, 5]
+    assert [lic.id for lic in license_service.list_licenses()] == [1, 2]
+
+    # A writer that gets in after validation is still caught by the write.
+    validate = license_service.validate_license_batch
+
+    def validate_then_race(batch, pending, check_overlap=True):
+        results = validate(batch, pending, check_overlap)
+        license_repo.create_license(LicenseXref(0, 2, 1, "2030-01-01", None))
+        return results
+
+    monkeypatch.setattr(license_service, "validate_license_batch", validate_then_race)
+    with pytest.raises(ValueError, match=r"license\(s\) 3"):
+        license_service.add_license_bulk([LicenseXref(0, 2, 1, "2031-01-01", None)])
+    assert [lic.id for lic in license_service.list_licenses()] == [1, 2, 3]
+
+
+def test_import_licenses_jsonl_rejects_unknown_references(catalog, tmp_path):
+    feed = tmp_path / "rights.jsonl"
+    feed.write_text(
+        '{"content_id": 1, "distributor_id": 1, "start_date": "2025-01-01"}\n'
+        '{"content_id": 7, "distributor_id": 1}\n'
+        "not json\n"
+        '{"content_id": "2", "distributor_id": "1", "terms": "AVOD"}\n',
+        encoding="utf-8",
+    )
+
+    stats = import_service.import_file("licenses", feed)
+
+    assert (stats.inserted, stats.rejected) == (2, 2)
+    assert [lic.content_id for lic in license_service.list_licenses()] == [1, 2]
+    assert (tmp_path / "rights.jsonl.rejects.jsonl").read_text().count("\n") == 2
+
+
+def test_license_pages_move_both_ways_with_filter(catalog):
+    license_service.add_license_bulk(
+        LicenseXref(id=0, content_id=1 + i % 2, distributor_id=1, start_date=f"20{10 + i}-01-01", end_date=f"20{10 + i}-12-31")
+        for i in range(9)
+    )
+
+    first = license_service.list_licenses_page(limit=2, content_id=1)
+    assert [lic.id for lic in first] == [1, 3]
+    assert first.prev_token is None
+
+    second = license_service.list_licenses_page(first.next_token, limit=2, content_id=1)
+    third = license_service.list_licenses_page(second.next_token, limit=2, content_id=1)
+    assert [lic.id for lic in third] == [9]
+    assert third.next_token is None
+
+    back = license_service.list_licenses_page(third.prev_token, limit=2, content_id=1)
+    assert [lic.id for lic in back] == [5, 7]
+    assert back.next_token is not None and back.prev_token is not None
+
+
+def test_invalid_page_token_is_rejected(catalog):
+    with pytest.raises(ValueError):
+        license_service.list_licenses_page("garbage!")
+
+
+def _traced_statements(action) -> list[str]:
+    # The pool hands back the most recently used connection, so tracing
+    # that one connection sees every statement the repos run.
+    pool = db.get_pool()
+    conn = pool.acquire()
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    pool.release(conn)
+    try:
+        action()
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+
+def test_by_id_reads_build_slotted_models_like_the_row_path(catalog):
+    from src.models.content import Content
+    from src.models.distributor import Distributor
+
+    license_service.add_license(1, 1, "2025-01-01", None, "SVOD")
+    for model_cls, table, select_by_id in (
+        (Content, "content", content_repo._select_content_by_id),
+        (Distributor, "distributor", distributor_repo._select_distributor_by_id),
+        (LicenseXref, "license_xref", license_repo._select_license_by_id),
+    ):
+        with db.connection() as conn:
+            row = conn.execute(f"SELECT * FROM {table} WHERE id = 1").fetchone()
+        model = select_by_id(1)
+
+        assert type(model) is model_cls
+        assert model.to_dict() == model_cls.from_dict(dict(row)).to_dict()
+        assert select_by_id(99) is None
+        assert not hasattr(model, "__dict__")
+        with pytest.raises(AttributeError):
+            model.unexpected = 1
+
+
+def test_repo_queries_use_an_index(catalog):
+    def exercise_repos():
+        license_service.add_license(1, 1, "2025-01-01", "2025-06-30")
+        content_repo.get_content_by_id(1)
+        distributor_repo.get_distributor_by_id(1)
+        license_repo.get_license_by_id(1)
+        license_repo.update_license(license_repo.get_license_by_id(1))
+        content_repo.list_content_page(filters={"genre": "Drama", "content_type": "Movie"})
+        distributor_repo.list_distributors_page(filters={"region": "EU"})
+        page = license_repo.list_licenses_page(limit=1, filters={"content_id": 1})
+        license_repo.list_licenses_page(limit=1, filters={"distributor_id": 1})
+        license_repo.list_licenses_page(page.next_token, filters={"content_id": 1, "distributor_id": 1})
+        license_repo.list_licenses_in_window("2025-02-01", "2025-03-01")
+        license_repo.list_licenses_ending_between("2025-01-01", "2025-12-31")
+        detail_page = license_repo.list_license_details_page(limit=1, filters={"region": "EU"})
+        license_repo.list_license_details_page(detail_page.next_token, filters={"content_id": 1})
+        list(license_repo.iter_license_details({"content_type": "Movie"}))
+        content_repo.existing_content_ids([1, 2, 3])
+        distributor_repo.existing_distributor_ids([1, 5])
+        license_repo.find_overlaps_for_batch([LicenseXref(0, 1, 1, "2025-03-01", None)])
+        license_repo.delete_license(99)
+
+    statements = [
+        sql for sql in _traced_statements(exercise_repos)
+        # Trigger bodies show up as "-- TRIGGER name" comments; skip them.
+        if " WHERE " in sql.upper().replace("\n", " ") and not sql.startswith("--")
+    ]
+    assert statements
+
+    for sql in statements:
+        for detail in db.explain_query_plan(sql):
+            full_scan = detail.startswith("SCAN") and "USING" not in detail
+            allowed = "VIRTUAL TABLE INDEX" in detail or detail == "SCAN CONSTANT ROW"
+            assert not full_scan or allowed, (sql, detail)
+
+
+def test_init_db_only_applies_new_migrations(temp_db):
+    with db.connection() as conn:
+        version = migrations.current_version(conn)
+
+    assert version == len(migrations.discover_migrations())
+    assert migrations.migrate() == []
+
+
+def test_window_queries_match_in_memory_index(catalog):
+    windows = [
+        ("2024-01-01", "2024-12-31"),
+        ("2024-06-01", None),
+        (None, "2024-03-31"),
+        ("2025-01-01", "2025-01-31"),
+        (None, None),
+    ]
+    for distributor_id, (start, end) in enumerate(windows, start=1):
+        if distributor_id > 1:
+            distributor_service.add_distributor(f"Distributor {distributor_id}")
+        license_service.add_license(1, distributor_id, start, end)
+    index = LicenseWindowIndex.from_licenses(license_service.iter_licenses())
+
+    def ids(licenses):
+        return [lic.id for lic in licenses]
+
+    for day in ("2023-12-31", "2024-03-31", "2024-07-04", "2025-01-15"):
+        assert ids(license_service.list_active_licenses(day)) == sorted(index.active_on(day))
+
+    assert ids(license_service.list_licenses_in_window("2024-04-01", "2024-05-31")) == [1, 5]
+    assert sorted(index.overlapping("2024-04-01", "2024-05-31")) == [1, 5]
+    assert ids(license_service.list_expiring_licenses(30, today="2024-12-15")) == [1]
+    assert index.ending_between("2024-12-15", "2025-01-14") == [1]
+
+
+def test_inverted_legacy_windows_are_empty(catalog):
+    assert LicenseWindowIndex([(1, 10, 5)]).active_on(7) == []
+
+    # Old rows were never validated, so one can end before it starts.
+    license_service.add_license(1, 1, "2024-01-01", "2024-12-31")
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date) VALUES (1, 1, ?, ?)",
+            ("2024-09-01", "2024-03-01"),
+        )
+        assert conn.execute("SELECT COUNT(*) FROM license_window").fetchone()[0] == 1
+        conn.execute("UPDATE license_xref SET terms = 'legacy', end_date = '2024-02-01' WHERE id = 2")
+    index = LicenseWindowIndex.from_licenses(license_service.iter_licenses())
+
+    assert len(index) == 1
+    assert sorted(index.active_on("2024-06-01")) == [lic.id for lic in license_service.list_active_licenses("2024-06-01")] == [1]
+    assert index.overlapping("2024-01-01", "2024-12-31") == [1]
+    assert list(conflict_service.find_conflicts()) == []
+
+
+def test_overlap_checks_read_legacy_dates_like_the_windows(catalog):
+    # SQLite cannot read '2020-1-5', so that window is open at the start.
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date) VALUES (1, 1, ?, ?)",
+            ("2020-1-5", "2020-12-31"),
+        )
+    earlier = LicenseXref(id=0, content_id=1, distributor_id=1, start_date="2019-01-01", end_date="2019-06-30")
+    index = LicenseWindowIndex.from_licenses(license_service.iter_licenses())
+
+    assert index.overlapping("2019-01-01", "2019-06-30") == [1]
+    assert [lic.id for lic in license_repo.list_overlapping_licenses(1, 1, "2019-01-01", "2019-06-30")] == [1]
+    assert license_repo.find_overlaps_for_batch([earlier]) == {0: [1]}
+    with pytest.raises(ValueError, match="overlaps"):
+        license_service.add_license(1, 1, "2019-01-01", "2019-06-30")
+
+
+def test_license_dates_are_validated(catalog):
+    with pytest.raises(ValueError):
+        license_service.add_license(1, 1, "01/02/2025")
+    with pytest.raises(ValueError):
+        license_service.add_license(1, 1, "2025-02-01", "2025-01-01")
+
+
+def test_overlapping_license_for_same_distributor_is_rejected(catalog):
+    distributor_service.add_distributor("Globex")
+    first = license_service.add_license(1, 1, "2025-01-01", "2025-06-30")
+    license_service.add_license(1, 2, "2025-03-01", "2025-09-30")  # other distributor
+    license_service.add_license(1, 1, "2025-07-01", None)
+
+    with pytest.raises(ValueError, match="overlaps"):
+        license_service.add_license(1, 1, "2025-06-30", "2025-06-30")
+    with pytest.raises(ValueError, match="this batch"):
+        license_service.add_license_bulk(
+            LicenseXref(id=0, content_id=2, distributor_id=1, start_date=d) for d in ("2025-01-01", "2026-01-01")
+        )
+
+    first.end_date = "2025-05-31"
+    assert license_service.update_license(first)
+    first.end_date = "2025-07-01"
+    with pytest.raises(ValueError):
+        license_service.update_license(first)
+
+
+def test_find_conflicts_sweeps_whole_catalog(catalog):
+    distributor_service.add_distributor("Globex")
+    rows = [
+        (1, 1, "2025-01-01", "2025-03-31"),
+        (1, 1, "2025-04-01", "2025-06-30"),
+        (1, 2, "2025-02-01", None),
+        (2, 1, None, "2025-12-31"),
+    ]
+    license_repo.create_many_licenses(LicenseXref(0, c, d, s, e) for c, d, s, e in rows)
+    # Bypasses the service checks, as an old import might have done.
+    license_repo.create_license(LicenseXref(0, 1, 1, "2025-03-15", "2025-04-15"))
+
+    same = [(c.first.id, c.second.id) for c in conflict_service.find_conflicts()]
+    assert same == [(1, 5), (5, 2)]
+
+    any_distributor = {
+        frozenset((c.first.id, c.second.id))
+        for c in conflict_service.find_conflicts(same_distributor=False)
+    }
+    assert any_distributor == {frozenset(p) for p in [(1, 5), (5, 2), (1, 3), (3, 5), (2, 3)]}
+    assert str(next(conflict_service.find_conflicts())).endswith("from 2025-03-15 to 2025-03-31")
+
+
+def test_unparseable_legacy_dates_are_open_ended_everywhere(catalog):
+    from src.utils import OPEN_START_DAY, to_epoch_day
+
+    # An old import stored a US-style date the app would now reject.
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date) VALUES (1, 1, ?, ?)",
+            ("01/02/2020", "2020-06-30"),
+        )
+        window = tuple(conn.execute("SELECT start_day, end_day FROM license_window").fetchone())
+    legacy = license_repo.create_license(LicenseXref(0, 1, 1, "2019-01-01", "2019-12-31"))
+
+    assert window == (OPEN_START_DAY, to_epoch_day("2020-06-30", 0))
+    assert [(c.first.id, c.second.id) for c in conflict_service.find_conflicts()] == [(1, legacy.id)]
+    assert LicenseWindowIndex.from_licenses(license_service.iter_licenses()).active_on("2010-01-01") == [1]
+    with pytest.raises(ValueError, match="overlaps"):
+        license_service.add_license(1, 1, "2000-01-01", "2000-12-31")
+
+
+def test_prefetch_references_resolves_ids_in_bulk(catalog):
+    licenses = [LicenseXref(0, c, d) for c, d in ((1, 1), (2, 1), (3, 1), (1, 4))]
+
+    known_content, known_distributors = license_service.prefetch_references(licenses)
+
+    assert known_content == {1, 2}
+    assert known_distributors == {1}
+    assert content_repo.content_exists(2) and not distributor_repo.distributor_exists(4)
+
+
+def test_license_frame_answers_catalog_questions(catalog):
+    distributor_service.add_distributor("Globex")
+    license_service.add_license_bulk(
+        LicenseXref(id=0, content_id=c, distributor_id=d, start_date=s, end_date=e, terms=f"T{i}")
+        for i, (c, d, s, e) in enumerate([
+            (1, 1, "2025-01-01", "2025-03-31"),
+            (1, 2, "2025-01-01", None),
+            (1, 1, "2025-06-01", "2025-06-30"),
+            (2, 2, "2024-01-01", "2024-03-15"),
+        ])
+    )
+
+    frame = LicenseFrame.load(batch_size=2, use_numpy=False)
+    active = frame.active_on("2025-02-01")
+
+    assert len(frame) == 4 and frame.count_by("distributor_id") == {1: 2, 2: 2}
+    assert active.unique("content_id") == {1}
+    assert active.missing("content_id", [1, 2]) == [2]
+    assert frame.count_by_end_month() == {"2024-03": 1, "2025-03": 1, "2025-06": 1}
+    assert frame.filter(frame.mask_equals("content_id", 2)).terms() == ["T3"]
+    assert frame.lookup("distributor_id", {1: "Acme"}) == ["Acme", None, "Acme", None]
+
+
+def test_license_details_join_titles_and_distributors(catalog):
+    distributor_service.add_distributor("Globex", region="EU")
+    license_service.add_license_bulk(
+        LicenseXref(id=0, content_id=c, distributor_id=d, start_date="2025-01-01", end_date="2025-12-31")
+        for c, d in ((1, 1), (2, 2), (1, 2))
+    )
+    content_repo.delete_content(2)
+
+    details = list(license_service.iter_license_details(batch_size=1))
+    assert [(x.content_title, x.distributor_name) for x in details] == [
+        ("Arrival", "Acme"), (None, "Globex"), ("Arrival", "Globex"),
+    ]
+
+    first = license_service.list_license_details_page(limit=1, region="EU")
+    second = license_service.list_license_details_page(first.next_token, limit=1, region="EU")
+    assert [x.id for x in first] == [2] and [x.id for x in second] == [3]
+    assert second.next_token is None and second.prev_token is not None
+    assert str(second.items[0]) == "License 3: Arrival -> Globex [EU], 2025-01-01 to 2025-12-31"
+
+
+def test_sql_epoch_days_match_python_before_1970(catalog):
+    from src.utils import OPEN_END_DAY, to_epoch_day
+
+    with db.connection() as conn:
+        conn.execute(
+            "INSERT INTO license_xref (content_id, distributor_id, start_date, end_date) VALUES (1, 1, ?, ?)",
+            ("1965-06-01", "1969-12-31 12:00"),
+        )
+        for value in ("1969-12-31", "1969-12-31 12:00", "1965-06-01", "1900-03-01", "2024-02-29"):
+            (day,) = conn.execute(
+                "SELECT CAST(julianday(?, 'start of day') - 2440587.5 AS INTEGER)", (value,)
+            ).fetchone()
+            assert day == to_epoch_day(value[:10], OPEN_END_DAY)
+        window = tuple(conn.execute("SELECT start_day, end_day FROM license_window").fetchone())
+
+    assert window == (to_epoch_day("1965-06-01", OPEN_END_DAY), -1)
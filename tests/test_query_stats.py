@@ -0,0 +1,34 @@
+import pytest
+
+from src.models.content import Content
+from src.persistence import content_repo, db
+from src.services import content_service
+
+
+def test_query_stats_count_statements_and_log_slow_ones(temp_db):
+    content_service.add_content_bulk([Content(None, f"Film {i}") for i in range(3)])
+    db.reset_query_stats()
+    db.enable_query_stats(slow_ms=0)
+    try:
+        content_repo.list_all_content()
+        content_repo.list_all_content()
+        content_repo.content_exists(2)
+    finally:
+        db.disable_query_stats()
+
+    stats = {s["sql"]: s for s in db.query_stats()}
+    listing = next(s for sql, s in stats.items() if sql.startswith("SELECT id, title") and "ORDER BY id" in sql)
+    assert listing["calls"] == 2
+    assert listing["rows"] == 6
+    assert sum(listing["histogram"].values()) == 2
+    assert db.query_stats(top=1, order_by="calls")[0]["calls"] == 2
+
+    plans = [entry["plan"] for entry in db.slow_queries() if "WHERE id = ?" in entry["sql"]]
+    assert plans and "INTEGER PRIMARY KEY" in plans[0][0]
+
+    # Once turned off, connections are plain again and nothing is counted.
+    db.reset_query_stats()
+    content_repo.list_all_content()
+    assert db.query_stats() == [] and db.slow_queries() == []
+    with pytest.raises(ValueError):
+        db.query_stats(order_by="speed")
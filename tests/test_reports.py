@@ -0,0 +1,29 @@
+from src.models.license_xref import LicenseXref
+from src.services import distributor_service, license_service, report_service
+
+
+def test_parallel_reports_match_single_process(catalog):
+    distributor_service.add_distributor("Globex", region="EMEA")
+    license_service.add_license_bulk(
+        LicenseXref(None, c, d, start, end)
+        for c, d, start, end in (
+            (1, 1, "2025-01-01", "2025-03-31"),
+            (1, 1, "2025-07-01", None),
+            (2, 1, "2024-01-01", "2025-01-15"),
+            (2, 2, "2025-02-01", "2025-02-20"),
+            (1, 2, None, "2025-03-10"),
+        )
+    )
+
+    single = report_service.availability_report("2025-02-10", workers=1)
+    parallel = report_service.availability_report("2025-02-10", workers=2)
+    assert single.rows == parallel.rows and parallel.licenses == 5
+    pair = next(row for row in single.rows if (row["content_id"], row["distributor_id"]) == (1, 1))
+    assert (pair["licenses"], pair["active_licenses"], pair["covered_days"]) == (2, 1, 90 + 184)
+    assert pair["last_end"] is None
+
+    expiring = report_service.expiring_report(60, today="2025-01-10", workers=2)
+    assert expiring.rows == report_service.expiring_report(60, today="2025-01-10", workers=1).rows
+    assert [(r["region"], r["days_from"], r["licenses"], r["titles"]) for r in expiring.rows] == [
+        ("EMEA", 30, 2, 2), ("Unknown", 0, 1, 1),
+    ]
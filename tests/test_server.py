@@ -0,0 +1,53 @@
+import http.client
+import json
+import threading
+from datetime import date
+
+from src import server
+from src.persistence import db
+from src.services import license_service
+
+
+def test_http_server_serves_json_with_etags(catalog, monkeypatch):
+    monkeypatch.setattr(db, "POOL_SIZE", db.POOL_SIZE)  # make_server() resizes the pool
+    srv = server.make_server(port=0, workers=2)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection(*srv.server_address[:2], timeout=5)
+
+    def call(method, path, body=None, headers=None):
+        conn.request(method, path, body=None if body is None else json.dumps(body), headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, response.getheader("ETag"), json.loads(data) if data else None
+
+    try:
+        status, _, created = call("POST", "/licenses", {"content_id": 1, "distributor_id": 1, "terms": "SVOD"})
+        assert status == 201 and created["terms"] == "SVOD"
+
+        status, etag, page = call("GET", "/licenses?content_id=1")
+        assert status == 200 and [item["id"] for item in page["items"]] == [created["id"]]
+        assert call("GET", "/licenses?content_id=1", headers={"If-None-Match": etag})[:2] == (304, etag)
+        for header, expected in ((f'"other", W/{etag}', 304), ("*", 304), (etag[2:-1], 200), (f'"x{etag[1:]}', 200)):
+            assert call("GET", "/licenses?content_id=1", headers={"If-None-Match": header})[0] == expected
+
+        today_tag = server.list_etag("/licenses/active")
+        assert server.list_etag("/licenses/active") == today_tag
+        with monkeypatch.context() as patch:
+            patch.setattr(server, "date", type("Tomorrow", (), {"today": staticmethod(lambda: date(2030, 1, 1))}))
+            assert server.list_etag("/licenses/active") != today_tag
+
+        update = {"content_id": 1, "distributor_id": 1, "terms": "AVOD"}
+        status, _, updated = call("PUT", f"/licenses/{created['id']}", update)
+        assert status == 200 and updated["terms"] == "AVOD"
+        with monkeypatch.context() as patch:
+            patch.setattr(license_service, "get_license", lambda license_id: None)   # deleted in between
+            assert call("PUT", f"/licenses/{created['id']}", update)[0] == 404
+
+        assert call("DELETE", f"/licenses/{created['id']}")[0] == 204
+        assert call("GET", "/licenses?content_id=1", headers={"If-None-Match": etag})[0] == 200
+        assert call("POST", "/licenses", {"content_id": 9, "distributor_id": 1})[0] == 400
+        assert call("GET", "/content/99")[0] == 404
+    finally:
+        conn.close()
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,100 @@
+import pytest
+
+from src import server
+from src.models.license_xref import LicenseXref
+from src.persistence import db, sharding
+from src.services import (
+    change_log_service,
+    content_service,
+    export_service,
+    license_counts_service,
+    license_service,
+    report_service,
+    shard_service,
+)
+from src.services.license_frame import LicenseFrame
+
+
+def test_sharded_licenses_route_merge_and_rebalance(catalog, tmp_path):
+    content_service.add_content("Ronin")
+    license_service.add_license(1, 1, "2025-01-01", "2025-06-30")
+    with pytest.raises(ValueError, match="copy-existing"):
+        shard_service.create_shards(tmp_path / "empty", 2)
+    shard_service.create_shards(tmp_path / "shards", 2, copy_existing=True)
+    sharding.enable_sharding(tmp_path / "shards")
+    try:
+        ids = license_service.add_license_bulk(
+            LicenseXref(None, c, 1, f"202{y}-01-01", f"202{y}-03-31") for c, y in ((2, 5), (3, 5), (2, 6))
+        )
+        assert ids == [2, 3, 4]
+        assert shard_service.get_shard_status()["licenses"] == [2, 2]
+        assert [lic.id for lic in license_service.list_licenses()] == [1, 2, 3, 4]
+        with pytest.raises(ValueError):
+            license_service.add_license(2, 1, "2025-03-01", "2025-04-30")
+        with pytest.raises(ValueError, match=r"license\(s\) 2, 4"):
+            license_service.add_license_bulk([LicenseXref(None, 3, 1, "2027-01-01", None), LicenseXref(None, 2, 1, "2025-02-01", None)])
+        assert shard_service.get_shard_status()["licenses"] == [2, 2]
+        with db.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM license_shard_ids").fetchone()[0] == 4
+
+        first = license_service.list_licenses_page(limit=3)
+        assert [lic.id for lic in first] == [1, 2, 3] and first.prev_token is None
+        second = license_service.list_licenses_page(first.next_token, limit=3)
+        assert [lic.id for lic in second] == [4] and second.next_token is None
+        back = license_service.list_licenses_page(second.prev_token, limit=3)
+        assert [lic.id for lic in back] == [1, 2, 3]
+
+        clash = license_service.get_license(3)
+        clash.content_id = 1
+        with pytest.raises(ValueError, match="overlaps"):
+            license_service.update_license(clash)
+        assert license_service.get_license(3).content_id == 3
+
+        moved = license_service.get_license(4)
+        moved.content_id = 1
+        assert license_service.update_license(moved)
+        assert license_service.get_license(4).content_id == 1
+        assert license_service.delete_license(2)
+        assert license_service.get_license(2) is None
+
+        summary = shard_service.rebalance_shards(3, "range")
+        assert sum(summary["licenses"]) == 3
+        assert not (tmp_path / "shards" / "licenses-g1-00.db").exists()
+        assert [lic.id for lic in license_service.list_licenses_in_window("2025-02-01", "2025-02-01")] == [1, 3]
+        assert [lic.id for lic in license_service.iter_licenses()] == [1, 3, 4]
+    finally:
+        sharding.disable_sharding()
+
+
+def test_main_database_features_refuse_or_follow_shards(catalog, tmp_path):
+    license_service.add_license(1, 1, "2025-01-01", "2025-06-30", "streaming only")
+    shard_service.create_shards(tmp_path / "shards", 2, copy_existing=True)
+    sharding.enable_sharding(tmp_path / "shards")
+    try:
+        license_service.add_license(2, 1, "2025-01-01", None, "streaming and broadcast")
+
+        for refused in (
+            lambda: license_counts_service.get_content_license_counts(1),
+            lambda: license_counts_service.rebuild_license_counts(),
+            lambda: change_log_service.read_changes(),
+            lambda: change_log_service.consume("feed", lambda changes: None, tables=["license_xref"]),
+            lambda: export_service.export_catalog(tmp_path / "export"),
+            lambda: report_service.availability_report("2025-03-01", workers=1),
+        ):
+            with pytest.raises(ValueError, match="not available while licenses are sharded"):
+                refused()
+        assert change_log_service.get_consumer_offsets() == {}
+        assert change_log_service.read_changes(tables=["content"]).changes
+        assert export_service.export_catalog(tmp_path / "export", kinds=["content"])["rows"] == 2
+
+        assert content_service.search_content("streaming") == []
+        assert [c.title for c in content_service.search_content("heat")] == ["Heat"]
+
+        frame = LicenseFrame.load()
+        assert list(frame.column("id")) == [1, 2]
+        assert frame.terms() == ["streaming only", "streaming and broadcast"]
+
+        assert server.list_etag("/licenses?limit=5") is None
+        assert server.list_etag("/content") is not None
+    finally:
+        sharding.disable_sharding()